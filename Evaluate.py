@@ -9,6 +9,7 @@ import os
 import Writer.Interface.Wrapper
 import Writer.Config
 import Writer.PrintUtils
+import Writer.Schemas
 
 
 
@@ -60,8 +61,7 @@ Please give your response in JSON format, indicating the ratings for each story:
     
 Do not respond with anything except JSON. Do not include any other fields except those shown above.
     """))
-    Messages = _Client.SafeGenerateText(Logger, Messages, Args.Model, _Format="json")
-    JSON = json.loads(_Client.GetLastMessageText(Messages))
+    Messages, JSON = _Client.SafeGenerateJSON(Logger, Messages, Args.Model, _Schema=Writer.Schemas.OUTLINE_EVALUATION)
     Report = ""
     Report += f"Winner of Plot: {JSON['Plot']}\n"
     Report += f"Winner of Chapters: {JSON['Chapters']}\n"
@@ -134,8 +134,7 @@ Remember, chapter A and B are two separate renditions of similar stories. They d
 Emphasize Chapter A and B as you rate the result.
     """))
     
-    Messages = _Client.SafeGenerateText(Logger, Messages, Args.Model, _Format="json")
-    JSON = json.loads(_Client.GetLastMessageText(Messages).replace('“','"').replace('”','"'))
+    Messages, JSON = _Client.SafeGenerateJSON(Logger, Messages, Args.Model, _Schema=Writer.Schemas.CHAPTER_EVALUATION)
     Report = ""
     Report += f"Winner of Plot: {JSON['Plot']}\n"
     Report += f"Winner of Style: {JSON['Style']}\n"
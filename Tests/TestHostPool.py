@@ -0,0 +1,43 @@
+#!/bin/python3
+
+# Unit tests for Writer/Interface/HostPool.py
+# Usage: python Tests/TestHostPool.py (or python -m unittest discover -s Tests -p "Test*.py")
+
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import Writer.Interface.HostPool
+
+
+class HostPoolTest(unittest.TestCase):
+
+    def test_FailingHostIsEjectedFromPool(self):
+        async def Run():
+            Pool = Writer.Interface.HostPool.HostPool(["a", "b"], _MaxFailures=2)
+            for _ in range(2):
+                Host = await Pool.Acquire(["a"])
+                self.assertEqual(Host, "a")
+                Pool.Release(Host, ConnectionError())
+            self.assertTrue(Pool.IsEjected("a"))
+            self.assertEqual(await Pool.Acquire(["a"]), "b")
+
+        asyncio.run(Run())
+
+    def test_LoneHostIsNeverEjected(self):
+        async def Run():
+            Pool = Writer.Interface.HostPool.HostPool(["a"], _MaxFailures=2)
+            for _ in range(5):
+                Host = await Pool.Acquire()
+                Pool.Release(Host, ConnectionError())
+            self.assertFalse(Pool.IsEjected("a"))
+            self.assertEqual(Pool.GetWaitTime("a"), 0)
+
+        asyncio.run(Run())
+
+
+if __name__ == "__main__":
+    unittest.main()
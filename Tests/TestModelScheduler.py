@@ -0,0 +1,98 @@
+#!/bin/python3
+
+# Unit tests for Writer/Interface/ModelScheduler.py
+# Usage: python Tests/TestModelScheduler.py (or python -m unittest discover -s Tests -p "Test*.py")
+
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import Writer.Interface.ModelScheduler
+
+
+async def ListNothing(_Host: str):
+    return []
+
+
+def MakeScheduler(_Capacity: int = 1):
+    return Writer.Interface.ModelScheduler.ModelScheduler(lambda _Host: _Capacity, ListNothing, _RefreshSeconds=3600)
+
+
+class ModelSchedulerTest(unittest.TestCase):
+
+    def test_WaiterGetsSlotOnRelease(self):
+        async def Run():
+            Scheduler = MakeScheduler()
+            await Scheduler.Acquire("h", "a")
+            Waiting = asyncio.create_task(Scheduler.Acquire("h", "b"))
+            await asyncio.sleep(0)
+            self.assertFalse(Waiting.done())
+
+            Scheduler.Release("h", "a")
+            await asyncio.wait_for(Waiting, 1)
+            self.assertEqual(Scheduler.Hosts["h"].Running, {"a": 0, "b": 1})
+
+        asyncio.run(Run())
+
+    def test_CancelledWaiterDoesNotLeakSlot(self):
+        async def Run():
+            Scheduler = MakeScheduler()
+            await Scheduler.Acquire("h", "a")
+            Waiting = asyncio.create_task(Scheduler.Acquire("h", "b"))
+            await asyncio.sleep(0)
+
+            # Release before the cancelled waiter has had a chance to take itself off the queue
+            Waiting.cancel()
+            Scheduler.Release("h", "a")
+            with self.assertRaises(asyncio.CancelledError):
+                await Waiting
+
+            State = Scheduler.Hosts["h"]
+            self.assertEqual(State.GetInFlight(), 0)
+            self.assertEqual(State.Waiters, [])
+            await asyncio.wait_for(Scheduler.Acquire("h", "c"), 1)
+            self.assertEqual(State.GetInFlight(), 1)
+
+        asyncio.run(Run())
+
+    def test_CancelledWaiterSkippedForNextWaiter(self):
+        async def Run():
+            Scheduler = MakeScheduler()
+            await Scheduler.Acquire("h", "a")
+            Cancelled = asyncio.create_task(Scheduler.Acquire("h", "b"))
+            Next = asyncio.create_task(Scheduler.Acquire("h", "c"))
+            await asyncio.sleep(0)
+
+            Cancelled.cancel()
+            Scheduler.Release("h", "a")
+            await asyncio.wait_for(Next, 1)
+            self.assertEqual(Scheduler.Hosts["h"].Running.get("b", 0), 0)
+            self.assertEqual(Scheduler.Hosts["h"].Running["c"], 1)
+
+        asyncio.run(Run())
+
+    def test_WarmModelGoesFirst(self):
+        async def Run():
+            Scheduler = MakeScheduler()
+            await Scheduler.Acquire("h", "a")
+            Cold = asyncio.create_task(Scheduler.Acquire("h", "b"))
+            await asyncio.sleep(0)
+            Warm = asyncio.create_task(Scheduler.Acquire("h", "a"))
+            await asyncio.sleep(0)
+
+            Scheduler.Release("h", "a")
+            await asyncio.wait_for(Warm, 1)
+            self.assertFalse(Cold.done())
+            self.assertEqual(Scheduler.ReloadsAvoided, 1)
+
+            Scheduler.Release("h", "a")
+            await asyncio.wait_for(Cold, 1)
+
+        asyncio.run(Run())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+#!/bin/python3
+
+# Unit tests for Writer/Interface/OutputSinks.py
+# Usage: python Tests/TestOutputSinks.py (or python -m unittest discover -s Tests -p "Test*.py")
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import Writer.Interface.OutputSinks
+
+
+class TerminalSinkTest(unittest.TestCase):
+
+    def test_ConcurrentStreamsDoNotInterleave(self):
+        Output = io.StringIO()
+        with contextlib.redirect_stdout(Output):
+            Sink = Writer.Interface.OutputSinks.TerminalSink(_FlushChars=1)
+            A = Sink.Open("A")
+            B = Sink.Open("B")
+            C = Sink.Open("C")
+            A.Write("a1 ")
+            B.Write("b1 ")
+            A.Write("a2 ")
+            C.Write("c1 ")
+            B.Write("b2 ")
+            C.End()
+            A.Write("a3")
+            B.Write("b3")
+            A.End()
+            B.End()
+            Sink.Close()
+        self.assertEqual(Output.getvalue(), "a1 a2 a3\nc1 \nb1 b2 b3\n")
+
+    def test_LiveStreamFlushesAsItGoes(self):
+        Output = io.StringIO()
+        with contextlib.redirect_stdout(Output):
+            Sink = Writer.Interface.OutputSinks.TerminalSink(_FlushChars=4)
+            A = Sink.Open("A")
+            A.Write("abcd")
+            self.assertEqual(Output.getvalue(), "abcd")
+            A.Write("e")
+            self.assertEqual(Output.getvalue(), "abcd")
+            A.End()
+        self.assertEqual(Output.getvalue(), "abcde\n")
+
+
+class FileTeeSinkTest(unittest.TestCase):
+
+    def test_ResponsesWrittenWholeWithHeader(self):
+        with tempfile.TemporaryDirectory() as Directory:
+            Path = os.path.join(Directory, "tee.txt")
+            Sink = Writer.Interface.OutputSinks.FileTeeSink(Path)
+            A = Sink.Open("ScrubChapter.RunTask")
+            B = Sink.Open("TranslateChapter.RunTask")
+            A.Write("one ")
+            B.Write("uno ")
+            A.Write("two")
+            B.Write("dos")
+            B.End()
+            A.End()
+            Sink.Close()
+            with open(Path, encoding="utf-8") as f:
+                Text = f.read()
+        self.assertEqual(Text, "### TranslateChapter.RunTask\n\nuno dos\n\n### ScrubChapter.RunTask\n\none two\n\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+#!/bin/python3
+
+# Unit tests for Writer/Interface/RetryPolicy.py
+# Usage: python Tests/TestRetryPolicy.py (or python -m unittest discover -s Tests -p "Test*.py")
+
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import Writer.Interface.RetryPolicy
+import Writer.Interface.OpenAICompatible
+
+
+class RetryPolicyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.Policy = Writer.Interface.RetryPolicy.RetryPolicy(_MaxAttempts=3, _BaseDelay=0)
+
+    def test_TransportErrorsAreRetried(self):
+        import httpx
+        import requests
+
+        for Error in (
+            ConnectionResetError(),
+            TimeoutError(),
+            httpx.RemoteProtocolError("dropped"),
+            requests.ConnectionError(),
+            requests.exceptions.ChunkedEncodingError(),
+            Writer.Interface.OpenAICompatible.APIError("error event mid-stream"),
+        ):
+            self.assertTrue(self.Policy.IsRetryable(Error), repr(Error))
+
+    def test_StatusCodes(self):
+        for Status in (408, 409, 425, 429, 500, 503, 524):
+            self.assertTrue(self.Policy.IsRetryable(Writer.Interface.OpenAICompatible.APIError("", Status)), Status)
+        for Status in (400, 401, 404, 422):
+            self.assertFalse(self.Policy.IsRetryable(Writer.Interface.OpenAICompatible.APIError("", Status)), Status)
+
+    def test_BugsAreNotRetried(self):
+        for Error in (KeyError("x"), TypeError(), AttributeError(), ValueError(), Exception()):
+            self.assertFalse(self.Policy.IsRetryable(Error), repr(Error))
+
+        Attempts: list = []
+
+        async def Attempt():
+            Attempts.append(1)
+            raise KeyError("choices")
+
+        with self.assertRaises(KeyError):
+            asyncio.run(self.Policy.Run(Attempt))
+        self.assertEqual(len(Attempts), 1)
+
+    def test_RetriesUntilExhausted(self):
+        Attempts: list = []
+
+        async def Attempt():
+            Attempts.append(1)
+            raise ConnectionResetError()
+
+        Stats: dict = {}
+        with self.assertRaises(Writer.Interface.RetryPolicy.RetriesExhaustedError):
+            asyncio.run(self.Policy.Run(Attempt, None, Stats))
+        self.assertEqual(len(Attempts), 3)
+        self.assertEqual(Stats["Retries"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,29 @@
+#!/bin/python3
+
+# Unit tests for Writer/Schemas.py
+# Usage: python Tests/TestSchemas.py (or python -m unittest discover -s Tests -p "Test*.py")
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import Writer.Schemas
+
+
+class SchemasTest(unittest.TestCase):
+
+    def test_RootsAreObjects(self):
+        # OpenAI-style structured outputs reject schemas with anything but an object at the root
+        for Title, Schema in Writer.Schemas.SCHEMAS.items():
+            self.assertEqual(Schema.get("type"), "object", Title)
+
+    def test_SceneList(self):
+        Writer.Schemas.Validate({"Scenes": ["one", "two"]}, Writer.Schemas.SCENE_LIST)
+        with self.assertRaises(Writer.Schemas.SchemaError):
+            Writer.Schemas.Validate(["one", "two"], Writer.Schemas.SCENE_LIST)
+
+
+if __name__ == "__main__":
+    unittest.main()
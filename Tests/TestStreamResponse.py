@@ -0,0 +1,60 @@
+#!/bin/python3
+
+# Unit tests for Interface.StreamResponse in Writer/Interface/Wrapper.py
+# Usage: python Tests/TestStreamResponse.py (or python -m unittest discover -s Tests -p "Test*.py")
+
+import os
+import sys
+import json
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import Writer.Config
+import Writer.Schemas
+from Writer.Interface.MockProvider import MockProvider
+from Writer.Interface.Wrapper import Interface
+
+
+async def TrailingStream(_JSON: str, _Trailing: str):
+    """
+    An OpenAI-style stream that keeps talking after the JSON, then ends with the usage.
+    """
+    yield {"choices": [{"delta": {"content": _JSON}}]}
+    for i in range(0, len(_Trailing), 10):
+        yield {"choices": [{"delta": {"content": _Trailing[i : i + 10]}}]}
+    yield {"choices": [], "usage": {"prompt_tokens": 12, "completion_tokens": 34}}
+
+
+class StreamResponseTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.Interface = Interface()
+
+    def Stream(self, _Stream):
+        Validators = self.Interface.GetStreamValidators(Writer.Schemas.SCENE_LIST, None, ["Scenes"])
+        return self.Interface.RunSync(self.Interface.StreamResponse(_Stream, "mock", None, Validators))
+
+    def test_JSONResponseKeepsUsage(self):
+        Provider = MockProvider(0, 0, _Scenes=2)
+        Messages = [{"role": "user", "content": "List the scenes."}]
+        Message, Usage = self.Stream(Provider.Chat(Messages, Writer.Schemas.SCENE_LIST, 0))
+        self.assertEqual(len(json.loads(Message["content"])["Scenes"]), 2)
+        self.assertIn("prompt_eval_count", Usage)
+        self.assertIn("eval_count", Usage)
+
+    def test_ShortTrailingTextIgnored(self):
+        Message, Usage = self.Stream(TrailingStream('{"Scenes": ["a"]}', "\nHope that helps!"))
+        self.assertEqual(json.loads(Message["content"]), {"Scenes": ["a"]})
+        self.assertEqual(Usage["prompt_eval_count"], 12)
+
+    def test_LongTrailingTextClosesStream(self):
+        Trailing = "and more " * Writer.Config.STREAM_TRAILING_CHARS
+        Message, Usage = self.Stream(TrailingStream('{"Scenes": ["a"]}', Trailing))
+        self.assertEqual(json.loads(Message["content"]), {"Scenes": ["a"]})
+        self.assertNotIn("prompt_eval_count", Usage)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+#!/bin/python3
+
+# Unit tests for Writer/Interface/StreamValidators.py
+# Usage: python Tests/TestStreamValidators.py (or python -m unittest discover -s Tests -p "Test*.py")
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import Writer.JSONRepair
+from Writer.Interface.StreamValidators import JSONValidator
+
+
+def Stream(_Validator: JSONValidator, _Text: str, _ChunkSize: int = 3):
+    """
+    Feeds `_Text` through `_Validator` in small chunks, returning (Problem, FinishedText).
+    """
+    Total: int = 0
+    Fed: str = ""
+    for i in range(0, len(_Text), _ChunkSize):
+        Chunk = _Text[i : i + _ChunkSize]
+        Total += len(Chunk)
+        Fed += Chunk
+        Problem = _Validator.Feed(Chunk, Total)
+        if Problem is not None:
+            return Problem, None
+        if _Validator.Complete:
+            break
+    return None, _Validator.Finish(Fed)
+
+
+class JSONValidatorTest(unittest.TestCase):
+
+    def AssertRepairable(self, _Text: str, _Expected, _RequiredAttribs: list = ["Title"]):
+        Problem, Finished = Stream(JSONValidator(_RequiredAttribs), _Text)
+        self.assertIsNone(Problem, _Text)
+        self.assertEqual(Writer.JSONRepair.ParseJSON(Finished, "{[")[0], _Expected)
+
+    def test_ValidJSON(self):
+        self.AssertRepairable('{"Title": "A", "Tags": [1, 2.5, true, null]}', {"Title": "A", "Tags": [1, 2.5, True, None]})
+
+    def test_SingleQuotes(self):
+        self.AssertRepairable("{'Title': 'The Keeper\\'s Light'}", {"Title": "The Keeper's Light"})
+
+    def test_SmartQuotes(self):
+        self.AssertRepairable("{“Title”: “A”}", {"Title": "A"})
+
+    def test_PythonLiterals(self):
+        self.AssertRepairable("{'Title': 'A', 'Done': True, 'Next': None}", {"Title": "A", "Done": True, "Next": None})
+
+    def test_ChattyPrefix(self):
+        self.AssertRepairable('Sure! Here is the JSON you asked for:\n```json\n{"Title": "A"}\n```', {"Title": "A"})
+
+    def test_QuotesInsideStrings(self):
+        self.AssertRepairable('{"Title": "The "Last" Light", "Summary": "x"}', {"Title": 'The "Last" Light', "Summary": "x"})
+
+    def test_TrailingCommaAndNewlines(self):
+        self.AssertRepairable('{"Title": "line one\nline two",}', {"Title": "line one\nline two"})
+
+    def test_StopsAtEndOfValue(self):
+        Validator = JSONValidator(["Title"])
+        Problem, Finished = Stream(Validator, '{"Title": "A"} and some chatter after', 1)
+        self.assertIsNone(Problem)
+        self.assertTrue(Validator.Complete)
+        self.assertEqual(Finished, '{"Title": "A"}')
+
+    def test_MismatchedBrackets(self):
+        Problem, _ = Stream(JSONValidator([]), '{"Title": ["A"}')
+        self.assertIn("mismatched", Problem)
+
+    def test_MissingRequiredAttribute(self):
+        Problem, _ = Stream(JSONValidator(["Title", "Summary"]), "{'Title': 'A'}")
+        self.assertIn("Summary", Problem)
+
+    def test_SingleQuotedKeyCountsAsPresent(self):
+        Problem, _ = Stream(JSONValidator(["Title"]), "{'Title': 'A', 'Other': {'Title2': 1}}")
+        self.assertIsNone(Problem)
+
+    def test_NoJSON(self):
+        Problem, _ = Stream(JSONValidator([], _MaxHeadChars=50), "I'm sorry, " * 20)
+        self.assertIn("no JSON", Problem)
+
+    def test_ListWhenObjectRequired(self):
+        Problem, _ = Stream(JSONValidator(["Title"]), '["A"]')
+        self.assertIsNotNone(Problem)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,213 @@
+#!/bin/python3
+
+# Measures the pipeline's own overhead by running Write.py end to end against the mock provider, so the
+# numbers reflect our code (call counts, prompt growth, memory, logging) rather than model speed.
+# Usage:
+#   python Tools/Benchmark.py                                          (full matrix, writes Benchmark.json)
+#   python Tools/Benchmark.py -Sizes 3,20 -Output Quick.json          (smaller matrix)
+#   python Tools/Benchmark.py -Baseline Benchmark.json -Output New.json (exits with 1 if anything regressed)
+
+import argparse
+import datetime
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+RootDir = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+
+MODEL_FLAGS = [
+    "-InitialOutlineModel",
+    "-ChapterOutlineModel",
+    "-ChapterS1Model",
+    "-ChapterS2Model",
+    "-ChapterS3Model",
+    "-ChapterS4Model",
+    "-ChapterRevisionModel",
+    "-RevisionModel",
+    "-EvalModel",
+    "-InfoModel",
+    "-ScrubModel",
+    "-CheckerModel",
+    "-TranslatorModel",
+]
+
+# Metrics counted by the pipeline itself are compared with -Tolerance, ones at the mercy of the machine with -TimeTolerance
+COUNTED_METRICS = ["Calls", "PromptBytes", "MaxPromptBytes", "LogBytes"]
+TIMED_METRICS = ["WallTime", "PeakRSSBytes"]
+# Changes smaller than this are noise on any machine, however large they are relative to a short run
+NOISE_FLOORS = {"WallTime": 1.0, "PeakRSSBytes": 4 * 1024 * 1024}
+
+
+Parser = argparse.ArgumentParser()
+Parser.add_argument("-Sizes", default="3,20,60", type=str, help="Comma separated chapter counts to benchmark")
+Parser.add_argument("-Words", default=400, type=int, help="Words in each mock text response")
+Parser.add_argument("-Prompt", default=os.path.join(RootDir, "ExamplePrompts", "Example1", "Prompt.txt"), type=str, help="Prompt file to write from")
+Parser.add_argument("-Output", default="Benchmark.json", type=str, help="Where to write the results as JSON")
+Parser.add_argument("-Baseline", default="", type=str, help="Earlier results to compare against")
+Parser.add_argument("-Tolerance", default=0.05, type=float, help="Allowed relative increase in call counts, prompt bytes and log bytes")
+Parser.add_argument("-TimeTolerance", default=0.25, type=float, help="Allowed relative increase in wall time and peak memory")
+Parser.add_argument("-Timeout", default=3600, type=int, help="Seconds before a run is given up on")
+Parser.add_argument("-KeepRuns", action="store_true", help="Keep each run's working directory (logs and story) instead of deleting it")
+Args = Parser.parse_args()
+
+
+def GetConfigurations(_Sizes: list):
+    Configurations = []
+    for Chapters in _Sizes:
+        for ScenePipeline in (True, False):
+            for Revisions in (True, False):
+                Name = f"{Chapters}ch-{'scenes' if ScenePipeline else 'stages'}-{'revisions' if Revisions else 'norevisions'}"
+                Configurations.append(
+                    {"Name": Name, "Chapters": Chapters, "ScenePipeline": ScenePipeline, "Revisions": Revisions}
+                )
+    return Configurations
+
+
+def GetCommand(_Config: dict, _Prompt: str):
+    Model = f"mock://bench?ttft=0&tps=0&chapters={_Config['Chapters']}&words={Args.Words}"
+    Command = [sys.executable, os.path.join(RootDir, "Write.py"), "-Prompt", _Prompt, "-Batch", "-ConsoleLogLevel", "7"]
+    for Flag in MODEL_FLAGS:
+        Command += [Flag, Model]
+    if not _Config["ScenePipeline"]:
+        Command.append("-NoSceneGenerationPipeline")
+    if _Config["Revisions"]:
+        # The mock passes every quality check, so force one round of revisions to exercise the loops,
+        # and include the final edit pass, whose prompts carry the whole novel
+        Command += ["-OutlineMinRevisions", "1", "-ChapterMinRevisions", "1", "-EnableFinalEditPass"]
+    else:
+        Command += ["-OutlineMaxRevisions", "0", "-NoChapterRevision"]
+    return Command
+
+
+def GetDirectorySize(_Path: str):
+    Size: int = 0
+    for Root, _, Files in os.walk(_Path):
+        for File in Files:
+            Size += os.path.getsize(os.path.join(Root, File))
+    return Size
+
+
+def RunConfiguration(_Config: dict, _Prompt: str):
+    WorkDir = tempfile.mkdtemp(prefix=f"Benchmark_{_Config['Name']}_")
+    print(f"Running {_Config['Name']} In {WorkDir}")
+
+    with open(os.path.join(WorkDir, "Output.txt"), "w") as OutputFile:
+        StartTime = time.perf_counter()
+        Process = subprocess.Popen(GetCommand(_Config, _Prompt), cwd=WorkDir, stdout=OutputFile, stderr=subprocess.STDOUT)
+        # Reap the child ourselves to get its own resource usage (RUSAGE_CHILDREN only gives the max over all runs)
+        while True:
+            Pid, Status, Usage = os.wait4(Process.pid, os.WNOHANG)
+            if Pid != 0:
+                break
+            if time.perf_counter() - StartTime > Args.Timeout:
+                Process.kill()
+            time.sleep(0.02)
+        WallTime = time.perf_counter() - StartTime
+        Process.returncode = os.waitstatus_to_exitcode(Status)
+
+    Result = dict(_Config)
+    Result["ExitCode"] = Process.returncode
+    Result["WallTime"] = WallTime
+    Result["PeakRSSBytes"] = Usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+    LogDirs = sorted(os.listdir(os.path.join(WorkDir, "Logs"))) if os.path.isdir(os.path.join(WorkDir, "Logs")) else []
+    Result["LogBytes"] = GetDirectorySize(os.path.join(WorkDir, "Logs"))
+
+    Stages: dict = {}
+    MaxPromptBytes: int = 0
+    if len(LogDirs) > 0 and os.path.exists(os.path.join(WorkDir, "Logs", LogDirs[-1], "CallStats.json")):
+        with open(os.path.join(WorkDir, "Logs", LogDirs[-1], "CallStats.json")) as f:
+            CallStats = json.load(f)
+        Stages = {
+            Name: {"Calls": Stage["Calls"], "PromptBytes": Stage.get("PromptBytes", 0)}
+            for Name, Stage in CallStats["Stages"].items()
+        }
+        MaxPromptBytes = max([Call.get("PromptBytes", 0) for Call in CallStats["Calls"]], default=0)
+
+    Result["Calls"] = sum(Stage["Calls"] for Stage in Stages.values())
+    Result["PromptBytes"] = sum(Stage["PromptBytes"] for Stage in Stages.values())
+    Result["MaxPromptBytes"] = MaxPromptBytes
+    # Flat per-chapter numbers across sizes mean linear scaling, growth means some prompt carries the whole story
+    Result["PromptBytesPerChapter"] = Result["PromptBytes"] / _Config["Chapters"]
+    Result["Stages"] = dict(sorted(Stages.items(), key=lambda Item: -Item[1]["PromptBytes"]))
+
+    if Result["ExitCode"] != 0 or Result["Calls"] == 0:
+        print(f"Warning, {_Config['Name']} Failed (Exit Code {Result['ExitCode']}), See {WorkDir}/Output.txt")
+    elif not Args.KeepRuns:
+        shutil.rmtree(WorkDir, ignore_errors=True)
+    return Result
+
+
+def FormatBytes(_Bytes: float):
+    for Unit in ("B", "KB", "MB"):
+        if abs(_Bytes) < 1024:
+            return f"{round(_Bytes, 1)}{Unit}"
+        _Bytes /= 1024
+    return f"{round(_Bytes, 1)}GB"
+
+
+def PrintResults(_Results: list):
+    print("")
+    print(f"{'Run':<32}{'Wall':>9}{'Calls':>7}{'Prompt':>10}{'Max Prompt':>12}{'Per Chapter':>13}{'Peak RSS':>10}{'Logs':>10}")
+    for Result in _Results:
+        print(
+            f"{Result['Name']:<32}{round(Result['WallTime'], 1):>8}s{Result['Calls']:>7}{FormatBytes(Result['PromptBytes']):>10}"
+            f"{FormatBytes(Result['MaxPromptBytes']):>12}{FormatBytes(Result['PromptBytesPerChapter']):>13}"
+            f"{FormatBytes(Result['PeakRSSBytes']):>10}{FormatBytes(Result['LogBytes']):>10}"
+        )
+
+
+def CompareResults(_Results: list, _Baseline: dict):
+    """
+    Returns a line for every metric that grew past its tolerance since the baseline.
+    """
+    BaselineRuns = {Run["Name"]: Run for Run in _Baseline["Runs"]}
+    Regressions: list = []
+    for Result in _Results:
+        Before = BaselineRuns.get(Result["Name"])
+        if Before is None:
+            continue
+        for Metric in COUNTED_METRICS + TIMED_METRICS:
+            Tolerance = Args.TimeTolerance if Metric in TIMED_METRICS else Args.Tolerance
+            Increase = Result[Metric] - Before.get(Metric, 0)
+            if Before.get(Metric, 0) > 0 and Increase > Before[Metric] * Tolerance and Increase > NOISE_FLOORS.get(Metric, 0):
+                Regressions.append(
+                    f"{Result['Name']}: {Metric} {round(Before[Metric], 2)} -> {round(Result[Metric], 2)} (+{round(100 * (Result[Metric] / Before[Metric] - 1), 1)}%)"
+                )
+        # A stage making more calls than before usually explains the rest
+        for Stage, Counts in Result["Stages"].items():
+            BeforeCalls = Before.get("Stages", {}).get(Stage, {}).get("Calls", 0)
+            if Counts["Calls"] > BeforeCalls:
+                Regressions.append(f"{Result['Name']}: {Stage} Calls {BeforeCalls} -> {Counts['Calls']}")
+    return Regressions
+
+
+Sizes = [int(Size) for Size in Args.Sizes.split(",") if Size.strip() != ""]
+Prompt = os.path.abspath(Args.Prompt)
+Results = [RunConfiguration(Config, Prompt) for Config in GetConfigurations(Sizes)]
+PrintResults(Results)
+
+with open(Args.Output, "w") as f:
+    json.dump({"Date": datetime.datetime.now().isoformat(), "Words": Args.Words, "Runs": Results}, f, indent=4)
+print(f"\nWrote Results To {Args.Output}")
+
+Failed = [Result["Name"] for Result in Results if Result["ExitCode"] != 0 or Result["Calls"] == 0]
+Regressions: list = []
+if Args.Baseline != "":
+    with open(Args.Baseline) as f:
+        Regressions = CompareResults(Results, json.load(f))
+    if len(Regressions) > 0:
+        print(f"\n{len(Regressions)} Regression(s) Against {Args.Baseline}:")
+        for Line in Regressions:
+            print(f" - {Line}")
+    else:
+        print(f"\nNo Regressions Against {Args.Baseline}")
+
+if len(Failed) > 0:
+    print(f"\nFailed Runs: {', '.join(Failed)}")
+sys.exit(1 if len(Failed) > 0 or len(Regressions) > 0 else 0)
@@ -0,0 +1,382 @@
+#!/bin/python3
+
+# Stand-in for an Ollama server, speaking enough of its HTTP API (/api/chat, /api/show, /api/pull, /api/ps)
+# for Write.py and the ollama client to run against it without a GPU. Responses come from the mock provider,
+# so they match each call's schema, and the server's speed, capacity and failures are all configurable.
+# Usage:
+#   python Tools/FakeOllamaServer.py -Port 11435 -Slots 4 -Latency 0.5 -TokensPerSecond 30
+#   python Tools/FakeOllamaServer.py -Models llama3 -LoadTime 5 -MaxLoadedModels 1   (other models must be pulled)
+#   python Tools/FakeOllamaServer.py -FailureRate 0.05 -DropRate 0.02 -MaxQueue 16   (inject errors)
+# GET /fake/stats returns the request counters as JSON, and POST /fake/reset zeroes them.
+
+import argparse
+import datetime
+import hashlib
+import http.server
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from Writer.Interface.MockProvider import MockProvider
+
+
+def GetModelName(_Model: str):
+    # Ollama treats "llama3" and "llama3:latest" as the same model
+    return _Model if ":" in _Model else f"{_Model}:latest"
+
+
+def GetDigest(_Model: str):
+    return hashlib.sha256(_Model.encode("utf-8")).hexdigest()
+
+
+class FakeOllama:
+    """
+    The server's state: which models exist and are loaded, the request slots, and counters.
+
+    Like Ollama with OLLAMA_NUM_PARALLEL set, `_Slots` requests generate at once and the rest wait in
+    line (answered with 503 once `_MaxQueue` are waiting, 0 for no limit). At most `_MaxLoadedModels`
+    models stay loaded, and a request for any other one first spends `_LoadTime` seconds loading it,
+    evicting the least recently used.
+    """
+
+    def __init__(self, _Args):
+        self.Args = _Args
+        self.Generator = MockProvider(0, 0, _Args.Words, _Args.Chapters, [], _Args.Scenes)
+        self.Random = random.Random(_Args.Seed)
+
+        self.Lock = threading.Lock()
+        self.Slots = threading.Semaphore(_Args.Slots)
+        self.LoadLock = threading.Lock()
+        self.Available: set = {GetModelName(Model) for Model in _Args.Models.split(",") if Model.strip() != ""}
+        self.Loaded: dict = {}  # Model -> last used, in load order
+
+        self.Stats = {
+            "Requests": 0,
+            "InFlight": 0,
+            "Queued": 0,
+            "MaxQueued": 0,
+            "Rejected": 0,
+            "InjectedFailures": 0,
+            "DroppedStreams": 0,
+            "Loads": 0,
+            "Pulls": 0,
+            "PromptTokens": 0,
+            "EvalTokens": 0,
+        }
+
+    def Count(self, _Key: str, _Amount: int = 1):
+        with self.Lock:
+            self.Stats[_Key] += _Amount
+
+    def ResetStats(self):
+        with self.Lock:
+            for Key in self.Stats:
+                if Key not in ("InFlight", "Queued"):
+                    self.Stats[Key] = 0
+            self.Stats["MaxQueued"] = self.Stats["Queued"]
+
+    def GetStats(self):
+        with self.Lock:
+            return {**self.Stats, "Loaded": list(self.Loaded)}
+
+    def IsAvailable(self, _Model: str):
+        # With no -Models given, every model exists
+        return len(self.Available) == 0 or GetModelName(_Model) in self.Available
+
+    def ShouldFail(self, _Rate: float):
+        with self.Lock:
+            return self.Random.random() < _Rate
+
+    def EnterQueue(self):
+        with self.Lock:
+            if self.Args.MaxQueue > 0 and self.Stats["Queued"] >= self.Args.MaxQueue:
+                self.Stats["Rejected"] += 1
+                return False
+            self.Stats["Queued"] += 1
+            self.Stats["MaxQueued"] = max(self.Stats["MaxQueued"], self.Stats["Queued"])
+            return True
+
+    def LoadModel(self, _Model: str):
+        """
+        Makes `_Model` resident, returning the seconds spent loading it (0 if it already was).
+        """
+        with self.LoadLock:
+            with self.Lock:
+                if _Model in self.Loaded:
+                    self.Loaded[_Model] = time.time()
+                    return 0.0
+            time.sleep(self.Args.LoadTime)
+            with self.Lock:
+                while len(self.Loaded) >= self.Args.MaxLoadedModels:
+                    del self.Loaded[min(self.Loaded, key=self.Loaded.get)]
+                self.Loaded[_Model] = time.time()
+                self.Stats["Loads"] += 1
+            return self.Args.LoadTime
+
+    def GetRunningModels(self):
+        Expires = (datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(minutes=5)).isoformat()
+        with self.Lock:
+            Models = list(self.Loaded)
+        return [
+            {
+                "name": Model,
+                "model": Model,
+                "size": 4 * 1024**3,
+                "digest": GetDigest(Model),
+                "details": {"format": "gguf", "family": "llama", "parameter_size": "8B", "quantization_level": "Q4_0"},
+                "expires_at": Expires,
+                "size_vram": 4 * 1024**3,
+            }
+            for Model in Models
+        ]
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    Server: FakeOllama = None
+
+    def log_message(self, format, *args):
+        if self.Server.Args.Verbose:
+            super().log_message(format, *args)
+
+    def ReadBody(self):
+        Length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(Length) or b"{}")
+
+    def SendJSON(self, _Status: int, _Data: dict):
+        Body = json.dumps(_Data).encode("utf-8")
+        self.send_response(_Status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(Body)))
+        self.end_headers()
+        self.wfile.write(Body)
+
+    def StartStream(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def SendChunk(self, _Data: dict):
+        Line = (json.dumps(_Data) + "\n").encode("utf-8")
+        self.wfile.write(f"{len(Line):x}\r\n".encode("ascii") + Line + b"\r\n")
+        self.wfile.flush()
+
+    def EndStream(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        if self.path == "/":
+            Body = b"Ollama is running"
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.send_header("Content-Length", str(len(Body)))
+            self.end_headers()
+            self.wfile.write(Body)
+        elif self.path == "/api/ps":
+            self.SendJSON(200, {"models": self.Server.GetRunningModels()})
+        elif self.path == "/api/version":
+            self.SendJSON(200, {"version": "0.0.0-fake"})
+        elif self.path == "/fake/stats":
+            self.SendJSON(200, self.Server.GetStats())
+        else:
+            self.SendJSON(404, {"error": "not found"})
+
+    def do_POST(self):
+        try:
+            Body = self.ReadBody()
+        except ValueError:
+            self.SendJSON(400, {"error": "invalid JSON body"})
+            return
+        if self.path == "/api/chat":
+            self.Chat(Body)
+        elif self.path == "/api/show":
+            self.Show(Body)
+        elif self.path == "/api/pull":
+            self.Pull(Body)
+        elif self.path == "/fake/reset":
+            self.Server.ResetStats()
+            self.SendJSON(200, self.Server.GetStats())
+        else:
+            self.SendJSON(404, {"error": "not found"})
+
+    def Show(self, _Body: dict):
+        Model = _Body.get("model") or _Body.get("name") or ""
+        if not self.Server.IsAvailable(Model):
+            self.SendJSON(404, {"error": f"model '{Model}' not found"})
+            return
+        self.SendJSON(
+            200,
+            {
+                "modelfile": f"FROM {Model}",
+                "parameters": "",
+                "template": "{{ .Prompt }}",
+                "details": {"format": "gguf", "family": "llama", "parameter_size": "8B", "quantization_level": "Q4_0"},
+                "model_info": {"general.architecture": "llama", "llama.context_length": self.Server.Args.ContextLength},
+            },
+        )
+
+    def Pull(self, _Body: dict):
+        Model = GetModelName(_Body.get("model") or _Body.get("name") or "")
+        self.Server.Count("Pulls")
+        Digest = f"sha256:{GetDigest(Model)}"
+        Total = 4 * 1024**3
+        Steps = 10
+
+        self.StartStream()
+        self.SendChunk({"status": "pulling manifest"})
+        for Step in range(1, Steps + 1):
+            time.sleep(self.Server.Args.PullTime / Steps)
+            self.SendChunk({"status": f"pulling {Digest[7:19]}", "digest": Digest, "total": Total, "completed": Total * Step // Steps})
+        with self.Server.Lock:
+            if len(self.Server.Available) > 0:
+                self.Server.Available.add(Model)
+        self.SendChunk({"status": "verifying sha256 digest"})
+        self.SendChunk({"status": "writing manifest"})
+        self.SendChunk({"status": "success"})
+        self.EndStream()
+
+    def Chat(self, _Body: dict):
+        Server = self.Server
+        Model = GetModelName(_Body.get("model", ""))
+        Messages = _Body.get("messages", [])
+        if not Server.IsAvailable(Model):
+            self.SendJSON(404, {"error": f"model '{_Body.get('model')}' not found, try pulling it first"})
+            return
+
+        Server.Count("Requests")
+        StartTime = time.time()
+        if not Server.Slots.acquire(blocking=False):
+            if not Server.EnterQueue():
+                self.SendJSON(503, {"error": "server busy, please try again.  maximum pending requests exceeded"})
+                return
+            Server.Slots.acquire()
+            Server.Count("Queued", -1)
+        Server.Count("InFlight")
+        try:
+            self.Generate(Model, Messages, _Body, StartTime)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up on the response (e.g. a stream validator aborted it)
+            self.close_connection = True
+        finally:
+            Server.Count("InFlight", -1)
+            Server.Slots.release()
+
+    def Generate(self, _Model: str, _Messages: list, _Body: dict, _StartTime: float):
+        Server = self.Server
+        if Server.ShouldFail(Server.Args.FailureRate):
+            Server.Count("InjectedFailures")
+            self.SendJSON(Server.Args.FailureStatus, {"error": "injected failure"})
+            return
+
+        LoadTime = Server.LoadModel(_Model)
+        time.sleep(Server.Args.Latency)
+
+        Options = _Body.get("options") or {}
+        Response = Server.Generator.GenerateResponse(_Messages, _Body.get("format"), Options.get("seed", 0))
+        Pieces = re.findall(r"\S+\s*|\s+", Response)
+        PromptTokens = sum(len(Message.get("content") or "") for Message in _Messages) // 4
+        Server.Count("PromptTokens", PromptTokens)
+
+        if not _Body.get("stream", True):
+            Server.Count("EvalTokens", len(Pieces))
+            if Server.Args.TokensPerSecond > 0:
+                time.sleep(len(Pieces) / Server.Args.TokensPerSecond)
+            self.SendJSON(200, self.GetFinalChunk(_Model, Response, _StartTime, LoadTime, PromptTokens, len(Pieces)))
+            return
+
+        DropAt = len(Pieces) // 2 if Server.ShouldFail(Server.Args.DropRate) else None
+        # Send the tokens in small batches rather than sleeping per token, which would cost more than it simulates
+        Batch = max(int(Server.Args.TokensPerSecond * 0.02), 1) if Server.Args.TokensPerSecond > 0 else len(Pieces)
+        DecodeStart = time.time()
+        self.StartStream()
+        for Start in range(0, len(Pieces), Batch):
+            if DropAt is not None and Start >= DropAt:
+                # Like a runner crashing part way through, the connection just goes away
+                Server.Count("DroppedStreams")
+                self.close_connection = True
+                return
+            if Start > 0 and Server.Args.TokensPerSecond > 0:
+                time.sleep(Batch / Server.Args.TokensPerSecond)
+            self.SendChunk(
+                {
+                    "model": _Model,
+                    "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                    "message": {"role": "assistant", "content": "".join(Pieces[Start : Start + Batch])},
+                    "done": False,
+                }
+            )
+        Server.Count("EvalTokens", len(Pieces))
+        Final = self.GetFinalChunk(_Model, "", _StartTime, LoadTime, PromptTokens, len(Pieces))
+        Final["eval_duration"] = int((time.time() - DecodeStart) * 1e9)
+        self.SendChunk(Final)
+        self.EndStream()
+
+    def GetFinalChunk(self, _Model: str, _Content: str, _StartTime: float, _LoadTime: float, _PromptTokens: int, _EvalTokens: int):
+        Args = self.Server.Args
+        return {
+            "model": _Model,
+            "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "message": {"role": "assistant", "content": _Content},
+            "done": True,
+            "done_reason": "stop",
+            "total_duration": int((time.time() - _StartTime) * 1e9),
+            "load_duration": int(_LoadTime * 1e9),
+            "prompt_eval_count": _PromptTokens,
+            "prompt_eval_duration": int(Args.Latency * 1e9),
+            "eval_count": _EvalTokens,
+            "eval_duration": int(_EvalTokens / Args.TokensPerSecond * 1e9) if Args.TokensPerSecond > 0 else 0,
+        }
+
+
+def GetParser():
+    Parser = argparse.ArgumentParser()
+    Parser.add_argument("-Host", default="127.0.0.1", type=str, help="Address to listen on")
+    Parser.add_argument("-Port", default=11435, type=int, help="Port to listen on (0 picks a free one)")
+    Parser.add_argument("-Slots", default=4, type=int, help="Requests generated at once, like OLLAMA_NUM_PARALLEL")
+    Parser.add_argument("-MaxQueue", default=0, type=int, help="Waiting requests before new ones get a 503, like OLLAMA_MAX_QUEUE (0 for no limit)")
+    Parser.add_argument("-Latency", default=0.1, type=float, help="Seconds before the first token of each response (prompt processing)")
+    Parser.add_argument("-TokensPerSecond", default=100, type=float, help="Decode speed of each request, 0 for instant")
+    Parser.add_argument("-Models", default="", type=str, help="Comma separated models the server has, others must be pulled first (default: any model)")
+    Parser.add_argument("-MaxLoadedModels", default=1, type=int, help="Models kept loaded at once, like OLLAMA_MAX_LOADED_MODELS")
+    Parser.add_argument("-LoadTime", default=0, type=float, help="Seconds to load a model that isn't loaded")
+    Parser.add_argument("-PullTime", default=1, type=float, help="Seconds a pull takes")
+    Parser.add_argument("-ContextLength", default=8192, type=int, help="Context length reported by /api/show")
+    Parser.add_argument("-FailureRate", default=0, type=float, help="Fraction of chat requests answered with -FailureStatus")
+    Parser.add_argument("-FailureStatus", default=500, type=int, help="HTTP status of injected failures")
+    Parser.add_argument("-DropRate", default=0, type=float, help="Fraction of chat streams cut off half way through")
+    Parser.add_argument("-Words", default=400, type=int, help="Words in each text response")
+    Parser.add_argument("-Chapters", default=3, type=int, help="Chapters in generated outlines")
+    Parser.add_argument("-Scenes", default=3, type=int, help="Scenes per chapter in generated scene lists")
+    Parser.add_argument("-Seed", default=0, type=int, help="Seed for failure injection")
+    Parser.add_argument("-Verbose", action="store_true", help="Log every request")
+    return Parser
+
+
+def Serve(_Args):
+    Handler.Server = FakeOllama(_Args)
+    HTTPServer = http.server.ThreadingHTTPServer((_Args.Host, _Args.Port), Handler)
+    HTTPServer.daemon_threads = True
+    # The port goes on its own line first, so whoever started us with -Port 0 can find it
+    print(f"Listening On {_Args.Host}:{HTTPServer.server_address[1]}", flush=True)
+    try:
+        HTTPServer.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(json.dumps(Handler.Server.GetStats()), flush=True)
+
+
+if __name__ == "__main__":
+    Serve(GetParser().parse_args())
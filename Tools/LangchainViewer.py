@@ -0,0 +1,63 @@
+#!/bin/python3
+
+# Reads back the LangchainDebug store of a run and renders calls as Markdown on demand.
+# Usage:
+#   python Tools/LangchainViewer.py Logs/Generation_<date>              (list calls)
+#   python Tools/LangchainViewer.py Logs/Generation_<date> -Call 12     (print one call, by ID or name)
+#   python Tools/LangchainViewer.py Logs/Generation_<date> -Export Out  (write every call as .md and .json)
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import Writer.LangchainStore
+
+
+Parser = argparse.ArgumentParser()
+Parser.add_argument("LogDir", help="Path to a run's log directory (or its LangchainDebug directory)")
+Parser.add_argument("-Call", default="", type=str, help="ID or name of the call to print as Markdown")
+Parser.add_argument("-Export", default="", type=str, help="Directory to write every call to as Markdown and JSON")
+Args = Parser.parse_args()
+
+
+StoreDir = Args.LogDir
+if os.path.isdir(os.path.join(StoreDir, "LangchainDebug")):
+    StoreDir = os.path.join(StoreDir, "LangchainDebug")
+
+Calls = Writer.LangchainStore.LoadLangchains(StoreDir)
+if len(Calls) == 0:
+    print(f"No language chains found in {StoreDir}")
+    sys.exit(1)
+
+
+if Args.Call != "":
+    Matches = [
+        Call
+        for Call in Calls
+        if str(Call["ID"]) == Args.Call
+        or Call["Name"] == Args.Call
+        or Writer.LangchainStore.GetLangchainTitle(Call) == Args.Call
+    ]
+    if len(Matches) == 0:
+        print(f"No call matching '{Args.Call}'")
+        sys.exit(1)
+    for Call in Matches:
+        print(Writer.LangchainStore.RenderMarkdown(Call))
+
+elif Args.Export != "":
+    os.makedirs(Args.Export, exist_ok=True)
+    for Call in Calls:
+        Title = Writer.LangchainStore.GetLangchainTitle(Call)
+        with open(os.path.join(Args.Export, f"{Title}.md"), "w") as f:
+            f.write(Writer.LangchainStore.RenderMarkdown(Call))
+        with open(os.path.join(Args.Export, f"{Title}.json"), "w") as f:
+            f.write(json.dumps(Call["Messages"], indent=4, sort_keys=True))
+    print(f"Exported {len(Calls)} language chains to {Args.Export}")
+
+else:
+    for Call in Calls:
+        Characters = sum(len(Message["content"]) for Message in Call["Messages"])
+        print(f"{str(Call['ID']).rjust(5)}  {len(Call['Messages'])} Message(s), {Characters} Chars  {Call['Name']}")
@@ -0,0 +1,257 @@
+#!/bin/python3
+
+# Runs concurrent story generations (separate Write.py processes, as a fleet of workers would) against an
+# Ollama server at increasing concurrency, to find where throughput stops scaling and latency takes off.
+# Without -Host it starts Tools/FakeOllamaServer.py with the given speed, slot and failure settings.
+# Usage:
+#   python Tools/LoadTest.py -Concurrency 1,2,4,8,16 -Slots 4 -Latency 0.2 -TokensPerSecond 50
+#   python Tools/LoadTest.py -FailureRate 0.05 -DropRate 0.02 -MaxQueue 8          (with injected failures)
+#   python Tools/LoadTest.py -Host 192.168.1.100:11434 -Model llama3 -Concurrency 1,2,4   (a real server)
+
+import argparse
+import json
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+ToolsDir = os.path.dirname(os.path.abspath(__file__))
+RootDir = os.path.abspath(os.path.join(ToolsDir, ".."))
+sys.path.insert(0, RootDir)
+
+import Writer.Config
+
+
+MODEL_FLAGS = [
+    "-InitialOutlineModel",
+    "-ChapterOutlineModel",
+    "-ChapterS1Model",
+    "-ChapterS2Model",
+    "-ChapterS3Model",
+    "-ChapterS4Model",
+    "-ChapterRevisionModel",
+    "-RevisionModel",
+    "-EvalModel",
+    "-InfoModel",
+    "-ScrubModel",
+    "-CheckerModel",
+    "-TranslatorModel",
+]
+
+# Settings passed straight through to the fake server
+SERVER_FLAGS = ["Slots", "MaxQueue", "Latency", "TokensPerSecond", "LoadTime", "FailureRate", "DropRate", "Words", "Chapters", "ContextLength"]
+
+
+Parser = argparse.ArgumentParser()
+Parser.add_argument("-Concurrency", default="1,2,4,8,16", type=str, help="Comma separated numbers of stories to generate at once")
+Parser.add_argument("-Rounds", default=1, type=int, help="Stories each worker writes, one after the other, at every level")
+Parser.add_argument("-Host", default="", type=str, help="Ollama server to test, leave empty to start a fake one")
+Parser.add_argument("-Model", default="fake-writer", type=str, help="Model every stage of the pipeline uses")
+Parser.add_argument("-Prompt", default=os.path.join(RootDir, "ExamplePrompts", "Example1", "Prompt.txt"), type=str, help="Prompt file to write from")
+Parser.add_argument("-MaxRequestsPerHost", default=Writer.Config.MAX_CONCURRENT_REQUESTS_PER_HOST, type=int, help="Each worker's own limit on requests in flight")
+Parser.add_argument("-ExtraArgs", default="-OutlineMaxRevisions 0 -NoChapterRevision", type=str, help="Further Write.py flags for every story")
+Parser.add_argument("-Timeout", default=3600, type=int, help="Seconds before a story is given up on")
+Parser.add_argument("-Output", default="LoadTest.json", type=str, help="Where to write the results as JSON")
+Parser.add_argument("-Slots", default=4, type=int, help="Fake server: requests generated at once")
+Parser.add_argument("-MaxQueue", default=0, type=int, help="Fake server: waiting requests before it answers 503 (0 for no limit)")
+Parser.add_argument("-Latency", default=0.1, type=float, help="Fake server: seconds before the first token")
+Parser.add_argument("-TokensPerSecond", default=100, type=float, help="Fake server: decode speed of each request")
+Parser.add_argument("-LoadTime", default=0, type=float, help="Fake server: seconds to load the model")
+Parser.add_argument("-FailureRate", default=0, type=float, help="Fake server: fraction of requests failed with a 500")
+Parser.add_argument("-DropRate", default=0, type=float, help="Fake server: fraction of streams cut off half way")
+Parser.add_argument("-Words", default=400, type=int, help="Fake server: words in each text response (the outline needs at least 250)")
+Parser.add_argument("-Chapters", default=3, type=int, help="Fake server: chapters in each story")
+Parser.add_argument("-ContextLength", default=131072, type=int, help="Fake server: context window it reports for the model")
+Args = Parser.parse_args()
+
+
+def StartFakeServer():
+    Command = [sys.executable, os.path.join(ToolsDir, "FakeOllamaServer.py"), "-Port", "0"]
+    for Flag in SERVER_FLAGS:
+        Command += [f"-{Flag}", str(getattr(Args, Flag))]
+    Process = subprocess.Popen(Command, stdout=subprocess.PIPE, text=True)
+    Line = Process.stdout.readline().strip()
+    if not Line.startswith("Listening On "):
+        Process.kill()
+        raise RuntimeError(f"Fake server failed to start: {Line!r}")
+    return Process, Line[len("Listening On "):]
+
+
+def GetServerStats(_Host: str, _Reset: bool = False):
+    # Only the fake server keeps counters, a real Ollama just doesn't have the endpoint
+    try:
+        Request = urllib.request.Request(f"http://{_Host}/fake/{'reset' if _Reset else 'stats'}", data=b"" if _Reset else None)
+        with urllib.request.urlopen(Request, timeout=5) as Response:
+            return json.load(Response)
+    except Exception:
+        return None
+
+
+def GetPercentile(_Values: list, _Percentile: float):
+    if len(_Values) == 0:
+        return None
+    Values = sorted(_Values)
+    # Nearest rank, so p99 of a small sample is its worst value rather than an interpolation
+    return Values[min(max(int(-(-_Percentile * len(Values) // 100)) - 1, 0), len(Values) - 1)]
+
+
+def WriteStory(_Host: str, _Stories: list, _Lock: threading.Lock):
+    WorkDir = tempfile.mkdtemp(prefix="LoadTest_")
+    Model = f"ollama://{Args.Model}@{_Host}"
+    Command = [sys.executable, os.path.join(RootDir, "Write.py"), "-Prompt", os.path.abspath(Args.Prompt), "-Batch"]
+    Command += ["-ConsoleLogLevel", "7", "-MaxRequestsPerHost", str(Args.MaxRequestsPerHost)]
+    for Flag in MODEL_FLAGS:
+        Command += [Flag, Model]
+    Command += shlex.split(Args.ExtraArgs)
+
+    StartTime = time.perf_counter()
+    with open(os.path.join(WorkDir, "Output.txt"), "w") as OutputFile:
+        try:
+            ExitCode = subprocess.run(Command, cwd=WorkDir, stdout=OutputFile, stderr=subprocess.STDOUT, timeout=Args.Timeout).returncode
+        except subprocess.TimeoutExpired:
+            ExitCode = None
+    Story = {"WallTime": time.perf_counter() - StartTime, "ExitCode": ExitCode, "Calls": []}
+
+    LogDir = os.path.join(WorkDir, "Logs")
+    for Generation in sorted(os.listdir(LogDir)) if os.path.isdir(LogDir) else []:
+        StatsPath = os.path.join(LogDir, Generation, "CallStats.json")
+        if os.path.exists(StatsPath):
+            with open(StatsPath) as f:
+                Story["Calls"] = json.load(f)["Calls"]
+
+    if ExitCode == 0:
+        shutil.rmtree(WorkDir, ignore_errors=True)
+    else:
+        Story["WorkDir"] = WorkDir
+    with _Lock:
+        _Stories.append(Story)
+
+
+def RunLevel(_Host: str, _Concurrency: int):
+    GetServerStats(_Host, True)
+    Stories: list = []
+    Lock = threading.Lock()
+
+    def Worker():
+        for _ in range(Args.Rounds):
+            WriteStory(_Host, Stories, Lock)
+
+    StartTime = time.perf_counter()
+    Workers = [threading.Thread(target=Worker) for _ in range(_Concurrency)]
+    for Thread in Workers:
+        Thread.start()
+    for Thread in Workers:
+        Thread.join()
+    WallTime = time.perf_counter() - StartTime
+
+    Calls = [Call for Story in Stories for Call in Story["Calls"] if not Call["Cached"]]
+    CallLatencies = [Call["WallTime"] for Call in Calls]
+    FirstTokenTimes = [Call["TimeToFirstToken"] for Call in Calls if Call["TimeToFirstToken"] is not None]
+    StoryLatencies = [Story["WallTime"] for Story in Stories if Story["ExitCode"] == 0]
+
+    return {
+        "Concurrency": _Concurrency,
+        "WallTime": WallTime,
+        "Stories": len(Stories),
+        "FailedStories": len([Story for Story in Stories if Story["ExitCode"] != 0]),
+        "FailedWorkDirs": [Story["WorkDir"] for Story in Stories if "WorkDir" in Story],
+        "Calls": len(Calls),
+        "Retries": sum(Call["Retries"] for Call in Calls),
+        "CallsPerSecond": len(Calls) / WallTime,
+        "TokensPerSecond": sum(Call["EvalTokens"] for Call in Calls) / WallTime,
+        "StoriesPerHour": len(StoryLatencies) / WallTime * 3600,
+        "CallLatencyP50": GetPercentile(CallLatencies, 50),
+        "CallLatencyP99": GetPercentile(CallLatencies, 99),
+        "TimeToFirstTokenP50": GetPercentile(FirstTokenTimes, 50),
+        "TimeToFirstTokenP99": GetPercentile(FirstTokenTimes, 99),
+        "StoryLatencyP50": GetPercentile(StoryLatencies, 50),
+        "StoryLatencyP99": GetPercentile(StoryLatencies, 99),
+        "Server": GetServerStats(_Host),
+    }
+
+
+def FormatSeconds(_Value):
+    return "-" if _Value is None else f"{round(_Value, 2)}s"
+
+
+def PrintLevel(_Level: dict):
+    Line = (
+        f"{_Level['Concurrency']:>11}{_Level['Stories']:>8}{_Level['FailedStories']:>7}{_Level['Calls']:>7}{_Level['Retries']:>8}"
+        f"{round(_Level['CallsPerSecond'], 2):>9}{round(_Level['TokensPerSecond'], 1):>9}{round(_Level['StoriesPerHour'], 1):>10}"
+        f"{FormatSeconds(_Level['CallLatencyP50']):>9}{FormatSeconds(_Level['CallLatencyP99']):>9}"
+        f"{FormatSeconds(_Level['TimeToFirstTokenP50']):>9}{FormatSeconds(_Level['TimeToFirstTokenP99']):>9}"
+        f"{FormatSeconds(_Level['StoryLatencyP50']):>10}{FormatSeconds(_Level['StoryLatencyP99']):>10}"
+    )
+    if _Level["Server"] is not None:
+        Line += f"{_Level['Server']['MaxQueued']:>7}"
+    print(Line, flush=True)
+
+
+def FindSaturation(_Levels: list):
+    """
+    The first level where adding workers gained less than 10% throughput, or None if it kept scaling.
+    """
+    for Previous, Level in zip(_Levels, _Levels[1:]):
+        if Level["CallsPerSecond"] < Previous["CallsPerSecond"] * 1.1:
+            return Previous, Level
+    return None
+
+
+Levels = [int(Level) for Level in Args.Concurrency.split(",") if Level.strip() != ""]
+ServerProcess = None
+Host = Args.Host
+if Host == "":
+    ServerProcess, Host = StartFakeServer()
+    print(f"Started Fake Ollama Server On {Host} ({Args.Slots} Slots, {Args.Latency}s Latency, {Args.TokensPerSecond}tok/s)")
+
+Results: list = []
+try:
+    print(
+        f"{'Concurrency':>11}{'Stories':>8}{'Failed':>7}{'Calls':>7}{'Retries':>8}{'Calls/s':>9}{'Tok/s':>9}{'Story/h':>10}"
+        f"{'p50':>9}{'p99':>9}{'TTFT p50':>9}{'TTFT p99':>9}{'Story p50':>10}{'Story p99':>10}"
+        + (f"{'Queue':>7}" if ServerProcess is not None else "")
+    )
+    for Concurrency in Levels:
+        Results.append(RunLevel(Host, Concurrency))
+        PrintLevel(Results[-1])
+finally:
+    if ServerProcess is not None:
+        ServerProcess.terminate()
+        ServerProcess.wait()
+
+Saturation = FindSaturation(Results)
+if Saturation is not None:
+    Previous, Level = Saturation
+    print(
+        f"\nThroughput Stops Scaling Beyond Concurrency {Previous['Concurrency']}: {round(Previous['CallsPerSecond'], 2)} -> "
+        f"{round(Level['CallsPerSecond'], 2)} Calls/s At {Level['Concurrency']}, While p99 Call Latency Went "
+        f"{FormatSeconds(Previous['CallLatencyP99'])} -> {FormatSeconds(Level['CallLatencyP99'])}"
+    )
+elif len(Results) > 1:
+    print(f"\nThroughput Still Scaling At Concurrency {Results[-1]['Concurrency']}, Try Higher Levels")
+
+for Level in Results:
+    for WorkDir in Level["FailedWorkDirs"]:
+        print(f"Failed Story At Concurrency {Level['Concurrency']}, See {WorkDir}/Output.txt")
+
+with open(Args.Output, "w") as f:
+    Settings = {Flag: getattr(Args, Flag) for Flag in SERVER_FLAGS} if ServerProcess is not None else {}
+    json.dump(
+        {
+            "Host": Args.Host if ServerProcess is None else "fake",
+            "Model": Args.Model,
+            "MaxRequestsPerHost": Args.MaxRequestsPerHost,
+            "ExtraArgs": Args.ExtraArgs,
+            "Server": Settings,
+            "Levels": Results,
+            "SaturatesAt": Saturation[0]["Concurrency"] if Saturation is not None else None,
+        },
+        f,
+        indent=4,
+    )
+print(f"\nWrote Results To {Args.Output}")
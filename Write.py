@@ -5,8 +5,13 @@ import time
 import datetime
 import os
 import json
+import functools
 
 import Writer.Config
+import Writer.Metrics
+import Writer.Checkpoint
+import Writer.Pipeline
+import Writer.Prompts
 
 import Writer.Interface.Wrapper
 import Writer.PrintUtils
@@ -23,6 +28,12 @@ import Writer.Translator
 # Setup Argparser
 Parser = argparse.ArgumentParser()
 Parser.add_argument("-Prompt", help="Path to file containing the prompt")
+Parser.add_argument(
+    "-Resume",
+    default="",
+    type=str,
+    help="Log directory of an earlier run to carry on from, skipping every stage it already completed (the prompt is taken from that run)",
+)
 Parser.add_argument(
     "-Output",
     default="",
@@ -158,6 +169,11 @@ Parser.add_argument(
     default=True,
     help="Disables the system from expanding the outline for the story chapter by chapter prior to writing the story's chapter content",
 )
+Parser.add_argument(
+    "-ParallelChapterOutlines",
+    action="store_true",
+    help="Expand each chapter's outline on its own, from the outline plus a short synopsis of the chapters around it, so they are generated concurrently instead of one after another in an ever growing conversation",
+)
 Parser.add_argument(
     "-EnableFinalEditPass",
     action="store_true",
@@ -174,6 +190,90 @@ Parser.add_argument(
     default=True,
     help="Use the new scene-by-scene generation pipeline as an initial starting point for chapter writing",
 )
+Parser.add_argument(
+    "-NoSceneGenerationPipeline",
+    action="store_true",
+    help="Disables the scene-by-scene pipeline, writing chapters with the staged plot/character/dialogue passes instead",
+)
+Parser.add_argument(
+    "-Cache",
+    action="store_true",
+    help="Cache LLM responses on disk so re-runs with the same seed and settings skip calls that were already made",
+)
+Parser.add_argument(
+    "-CacheDir",
+    default=Writer.Config.CACHE_DIR,
+    type=str,
+    help="Directory to store the response cache in",
+)
+Parser.add_argument(
+    "-CacheReadOnly",
+    action="store_true",
+    help="Use existing cache entries but never write new ones (implies -Cache)",
+)
+Parser.add_argument(
+    "-MaxRequestsPerHost",
+    default=Writer.Config.MAX_CONCURRENT_REQUESTS_PER_HOST,
+    type=int,
+    help="Max number of requests in flight to a single model host at once (match this to OLLAMA_NUM_PARALLEL)",
+)
+Parser.add_argument(
+    "-SkipModelCheck",
+    action="store_true",
+    help="Skip startup checks for models that a previous run already found on their host",
+)
+Parser.add_argument(
+    "-ConsoleLogLevel",
+    default=0,
+    type=int,
+    help="Only print log entries at or above this level (0-7) to the console, the log file still gets everything",
+)
+Parser.add_argument(
+    "-Batch",
+    action="store_true",
+    help="Headless mode, don't echo streamed responses to the terminal",
+)
+Parser.add_argument(
+    "-StreamTee",
+    default="",
+    type=str,
+    help="Append every streamed response to this file (works with or without -Batch)",
+)
+Parser.add_argument(
+    "-KeepAlive",
+    default=Writer.Config.OLLAMA_KEEP_ALIVE,
+    type=str,
+    help="How long Ollama should keep each model loaded after a request (e.g. '30m', '-1' for forever, '' for the server default)",
+)
+Parser.add_argument(
+    "-NoModelScheduling",
+    action="store_true",
+    help="Run requests to each Ollama host strictly in arrival order, instead of letting ones for already loaded models go first",
+)
+Parser.add_argument(
+    "-ContentRetries",
+    default=Writer.Config.CONTENT_RETRY_BUDGET,
+    type=int,
+    help="Unusable (empty, too short, looping) responses allowed per model on one task before escalating to a fallback model",
+)
+Parser.add_argument(
+    "-FallbackModels",
+    default="",
+    type=str,
+    help="Comma separated models to escalate to, in order, when a model spends its retry budget on a task (e.g. 'ollama://llama3:70b,google://gemini-1.5-pro')",
+)
+Parser.add_argument(
+    "-MetricsTextfile",
+    default="",
+    type=str,
+    help="Also write the run's metrics to this path in Prometheus textfile format (e.g. a node_exporter textfile collector directory)",
+)
+Parser.add_argument(
+    "-PipelineConcurrency",
+    default=Writer.Config.PIPELINE_MAX_CONCURRENCY,
+    type=int,
+    help="Max number of story stages (e.g. scrubbing one chapter while the next is written) worked on at once",
+)
 Args = Parser.parse_args()
 
 
@@ -210,11 +310,27 @@ Writer.Config.CHAPTER_NO_REVISIONS = Args.NoChapterRevision
 
 Writer.Config.SCRUB_NO_SCRUB = Args.NoScrubChapters
 Writer.Config.EXPAND_OUTLINE = Args.ExpandOutline
+Writer.Config.PARALLEL_CHAPTER_OUTLINES = Args.ParallelChapterOutlines
 Writer.Config.ENABLE_FINAL_EDIT_PASS = Args.EnableFinalEditPass
 
 Writer.Config.OPTIONAL_OUTPUT_NAME = Args.Output
-Writer.Config.SCENE_GENERATION_PIPELINE = Args.SceneGenerationPipeline
+Writer.Config.SCENE_GENERATION_PIPELINE = Args.SceneGenerationPipeline and not Args.NoSceneGenerationPipeline
 Writer.Config.DEBUG = Args.Debug
+Writer.Config.CACHE_ENABLED = Args.Cache or Args.CacheReadOnly
+Writer.Config.CACHE_DIR = Args.CacheDir
+Writer.Config.CACHE_READ_ONLY = Args.CacheReadOnly
+Writer.Config.MAX_CONCURRENT_REQUESTS_PER_HOST = Args.MaxRequestsPerHost
+Writer.Config.SKIP_MODEL_CHECK = Args.SkipModelCheck
+Writer.Config.METRICS_TEXTFILE_PATH = Args.MetricsTextfile
+Writer.Config.BATCH_MODE = Args.Batch
+Writer.Config.CONSOLE_LOG_LEVEL = Args.ConsoleLogLevel
+Writer.Config.STREAM_TEE_PATH = Args.StreamTee
+Writer.Config.CONTENT_RETRY_BUDGET = Args.ContentRetries
+Writer.Config.OLLAMA_KEEP_ALIVE = Args.KeepAlive
+Writer.Config.OLLAMA_RESIDENCY_SCHEDULING = not Args.NoModelScheduling
+Writer.Config.PIPELINE_MAX_CONCURRENCY = Args.PipelineConcurrency
+if Args.FallbackModels != "":
+    Writer.Config.FALLBACK_MODELS = {"*": [Model.strip() for Model in Args.FallbackModels.split(",") if Model.strip() != ""]}
 
 # Get a list of all used providers
 Models = [
@@ -241,39 +357,86 @@ SysLogger = Writer.PrintUtils.Logger()
 SysLogger.Log("Created OLLAMA Interface", 5)
 Interface = Writer.Interface.Wrapper.Interface(Models)
 
-# Load User Prompt
-Prompt: str = ""
-if Args.Prompt is None:
-    raise Exception("No Prompt Provided")
-with open(Args.Prompt, "r") as f:
-    Prompt = f.read()
-
-
-# If user wants their prompt translated, do so
-if Writer.Config.TRANSLATE_PROMPT_LANGUAGE != "":
-    Prompt = Writer.Translator.TranslatePrompt(
-        Interface, SysLogger, Prompt, Writer.Config.TRANSLATE_PROMPT_LANGUAGE
+# Every completed stage is saved as it finishes, so a run that dies part way can be carried on with -Resume
+if Args.Resume != "":
+    CheckpointDir: str = Writer.Checkpoint.GetCheckpointDirectory(Args.Resume)
+    if not os.path.isdir(CheckpointDir):
+        raise Exception(f"Nothing To Resume At {Args.Resume}")
+else:
+    CheckpointDir: str = f"{SysLogger.LogDirPrefix}/Checkpoint"
+Checkpoint = Writer.Checkpoint.Checkpoint(CheckpointDir, SysLogger)
+SysLogger.Log(f"Saving Progress To {CheckpointDir} (Carry On After A Crash With -Resume {CheckpointDir})", 4)
+
+# Each stage of the story is a task in a graph that names the tasks it needs the results of, so
+# anything that only needs the outline (story info, chapter outlines) runs alongside chapter writing,
+# and each chapter goes on to be scrubbed and translated as soon as it's written
+def LoadPrompt():
+    Prompt: str = Checkpoint.Load("Prompt")
+    if Prompt is None:
+        if Args.Prompt is None:
+            raise Exception("No Prompt Provided")
+        with open(Args.Prompt, "r") as f:
+            Prompt = f.read()
+        Checkpoint.Save("Prompt", Prompt)
+
+    # If user wants their prompt translated, do so
+    if Writer.Config.TRANSLATE_PROMPT_LANGUAGE != "":
+        TranslatedPrompt: str = Checkpoint.Load("TranslatedPrompt")
+        if TranslatedPrompt is None:
+            TranslatedPrompt = Writer.Translator.TranslatePrompt(
+                Interface, SysLogger, Prompt, Writer.Config.TRANSLATE_PROMPT_LANGUAGE
+            )
+            Checkpoint.Save("TranslatedPrompt", TranslatedPrompt)
+        Prompt = TranslatedPrompt
+
+    return Prompt
+
+
+def GenerateOutline(_Prompt: str):
+    SavedOutline: dict = Checkpoint.Load("Outline")
+    if SavedOutline is not None:
+        return SavedOutline
+
+    Outline, Elements, RoughChapterOutline, BaseContext = Writer.OutlineGenerator.GenerateOutline(
+        Interface, SysLogger, _Prompt, Writer.Config.OUTLINE_QUALITY, Checkpoint
     )
+    SavedOutline = {"Outline": Outline, "StoryElements": Elements, "RoughChapterOutline": RoughChapterOutline, "BaseContext": BaseContext}
+    Checkpoint.Save("Outline", SavedOutline)
+    return SavedOutline
+
+
+def GenerateStoryInfo(_Outline: dict):
+    Info: dict = Checkpoint.Load("StoryInfo")
+    if Info is None:
+        Messages = []
+        Messages.append(Interface.BuildUserQuery(_Outline["Outline"]))
+        Info = Writer.StoryInfo.GetStoryInfo(Interface, SysLogger, Messages)
+        Checkpoint.Save("StoryInfo", Info)
+    return Info
+
+
+def CountChapters(_Outline: dict):
+    NumChapters: int = Checkpoint.Load("ChapterCount")
+    if NumChapters is None:
+        SysLogger.Log("Detecting Chapters", 5)
+        Messages = [Interface.BuildUserQuery(_Outline["Outline"])]
+        NumChapters = Writer.Chapter.ChapterDetector.LLMCountChapters(
+            Interface, SysLogger, Interface.GetLastMessageText(Messages)
+        )
+        Checkpoint.Save("ChapterCount", NumChapters)
+    SysLogger.Log(f"Found {NumChapters} Chapter(s)", 5)
+    return NumChapters
 
 
-# Generate the Outline
-Outline, Elements, RoughChapterOutline, BaseContext = Writer.OutlineGenerator.GenerateOutline(
-    Interface, SysLogger, Prompt, Writer.Config.OUTLINE_QUALITY
-)
-BasePrompt = Prompt
-
-
-# Detect the number of chapters
-SysLogger.Log("Detecting Chapters", 5)
-Messages = [Interface.BuildUserQuery(Outline)]
-NumChapters: int = Writer.Chapter.ChapterDetector.LLMCountChapters(
-    Interface, SysLogger, Interface.GetLastMessageText(Messages)
-)
-SysLogger.Log(f"Found {NumChapters} Chapter(s)", 5)
+# Chapter outlines are written one after another in a single conversation, each task adding to it
+# and the chain of inputs keeping them in order
+ChapterOutlineHistory: list = []
 
 
-## Write Per-Chapter Outline
-Prompt = f"""
+def GenerateChapterOutline(_ChapterNum: int, _Outline: dict, *_PreviousChapterOutlines):
+    Outline: str = _Outline["Outline"]
+    if _ChapterNum == 1:
+        Prompt = f"""
 Please help me expand upon the following outline, chapter by chapter.
 
 ```
@@ -281,89 +444,188 @@ Please help me expand upon the following outline, chapter by chapter.
 ```
     
 """
-Messages = [Interface.BuildUserQuery(Prompt)]
-ChapterOutlines: list = []
-if Writer.Config.EXPAND_OUTLINE:
-    for Chapter in range(1, NumChapters + 1):
+        ChapterOutlineHistory.append(Interface.BuildUserQuery(Prompt))
+
+    ChapterOutline: str = Checkpoint.Load(f"ChapterOutlines/Chapter_{_ChapterNum:03}")
+    if ChapterOutline is not None:
+        # Rebuild the conversation the later chapters are generated in, as it was when this one was saved
+        ChapterOutlineHistory.append(Interface.BuildUserQuery(Writer.Prompts.CHAPTER_OUTLINE_PROMPT.format(_Chapter=_ChapterNum, _Outline=Outline)))
+        ChapterOutlineHistory.append(Interface.BuildAssistantQuery(ChapterOutline))
+    else:
         ChapterOutline, Messages = Writer.OutlineGenerator.GeneratePerChapterOutline(
-            Interface, SysLogger, Chapter, Outline, Messages
+            Interface, SysLogger, _ChapterNum, Outline, ChapterOutlineHistory
         )
-        ChapterOutlines.append(ChapterOutline)
+        ChapterOutlineHistory[:] = Messages
+        Checkpoint.Save(f"ChapterOutlines/Chapter_{_ChapterNum:03}", ChapterOutline)
+    return ChapterOutline
+
+
+def SummarizeChapters(_Outline: dict, _NumChapters: int):
+    Synopses: list = Checkpoint.Load("ChapterSynopses")
+    if Synopses is None:
+        Synopses = Writer.OutlineGenerator.GenerateChapterSynopses(Interface, SysLogger, _Outline["Outline"], _NumChapters)
+        Checkpoint.Save("ChapterSynopses", Synopses)
+    return Synopses
+
+
+# With -ParallelChapterOutlines, each chapter's outline is generated on its own from the outline and a
+# synopsis of the chapters around it, so they can all be worked on at once
+def GenerateIndependentChapterOutline(_ChapterNum: int, _Outline: dict, _Synopses: list):
+    ChapterOutline: str = Checkpoint.Load(f"ChapterOutlines/Chapter_{_ChapterNum:03}")
+    if ChapterOutline is None:
+        ChapterOutline = Writer.OutlineGenerator.GenerateIndependentChapterOutline(
+            Interface, SysLogger, _ChapterNum, _Outline["Outline"], _Synopses
+        )
+        Checkpoint.Save(f"ChapterOutlines/Chapter_{_ChapterNum:03}", ChapterOutline)
+    return ChapterOutline
 
 
-# Create MegaOutline
-DetailedOutline: str = ""
-for Chapter in ChapterOutlines:
-    DetailedOutline += Chapter
-MegaOutline: str = f"""
+def BuildMegaOutline(_Outline: dict, *_ChapterOutlines):
+    DetailedOutline: str = ""
+    for ChapterOutline in _ChapterOutlines:
+        DetailedOutline += ChapterOutline
+    return f"""
 
 # Base Outline
-{Elements}
+{_Outline["StoryElements"]}
 
 # Detailed Outline
 {DetailedOutline}
 
 """
 
-# Setup Base Prompt For Per-Chapter Generation
-UsedOutline: str = Outline
-if Writer.Config.EXPAND_OUTLINE:
-    UsedOutline = MegaOutline
 
-
-# Write the chapters
-SysLogger.Log("Starting Chapter Writing", 5)
-Chapters = []
-for i in range(1, NumChapters + 1):
+def WriteChapter(_ChapterNum: int, _Outline: dict, *_PreviousChapters):
+    Chapter: str = Checkpoint.Load(f"Chapters/Chapter_{_ChapterNum:03}")
+    if Chapter is not None:
+        return Chapter
 
     Chapter = Writer.Chapter.ChapterGenerator.GenerateChapter(
         Interface,
         SysLogger,
-        i,
+        _ChapterNum,
         NumChapters,
-        Outline,
-        Chapters,
+        _Outline["Outline"],
+        list(_PreviousChapters),
         Writer.Config.OUTLINE_QUALITY,
-        BaseContext,
+        _Outline["BaseContext"],
     )
 
-    Chapter = f"### Chapter {i}\n\n{Chapter}"
-    Chapters.append(Chapter)
+    Chapter = f"### Chapter {_ChapterNum}\n\n{Chapter}"
+    Checkpoint.Save(f"Chapters/Chapter_{_ChapterNum:03}", Chapter)
     ChapterWordCount = Writer.Statistics.GetWordCount(Chapter)
     SysLogger.Log(f"Chapter Word Count: {ChapterWordCount}", 2)
+    return Chapter
 
 
-# Now edit the whole thing together
-StoryBodyText: str = ""
-StoryInfoJSON:dict = {"Outline": Outline}
-StoryInfoJSON.update({"StoryElements": Elements})
-StoryInfoJSON.update({"RoughChapterOutline": RoughChapterOutline})
-StoryInfoJSON.update({"BaseContext": BaseContext})
-
-if Writer.Config.ENABLE_FINAL_EDIT_PASS:
-    NewChapters = Writer.NovelEditor.EditNovel(
-        Interface, SysLogger, Chapters, Outline, NumChapters
+# Takes every written chapter followed by the already edited ones before this chapter
+def EditChapter(_ChapterNum: int, _Outline: dict, *_Chapters):
+    Chapters = list(_Chapters[:NumChapters])
+    Edited = list(_Chapters[NumChapters:])
+    return Writer.NovelEditor.EditChapter(
+        Interface, SysLogger, Edited + Chapters[len(Edited):], _Outline["Outline"], _ChapterNum, Checkpoint
     )
-NewChapters = Chapters
-StoryInfoJSON.update({"UnscrubbedChapters": NewChapters})
 
-# Now scrub it (if enabled)
-if not Writer.Config.SCRUB_NO_SCRUB:
-    NewChapters = Writer.Scrubber.ScrubNovel(
-        Interface, SysLogger, NewChapters, NumChapters
-    )
-else:
-    SysLogger.Log(f"Skipping Scrubbing Due To Config", 4)
-StoryInfoJSON.update({"ScrubbedChapter": NewChapters})
+
+def ScrubChapter(_ChapterNum: int, _Chapter: str):
+    return Writer.Scrubber.ScrubChapter(Interface, SysLogger, _Chapter, _ChapterNum, Checkpoint)
 
 
-# If enabled, translate the novel
-if Writer.Config.TRANSLATE_LANGUAGE != "":
-    NewChapters = Writer.Translator.TranslateNovel(
-        Interface, SysLogger, NewChapters, NumChapters, Writer.Config.TRANSLATE_LANGUAGE
+def TranslateChapter(_ChapterNum: int, _Chapter: str):
+    return Writer.Translator.TranslateChapter(
+        Interface, SysLogger, _Chapter, _ChapterNum, Writer.Config.TRANSLATE_LANGUAGE, Checkpoint
     )
-else:
+
+
+Pipeline = Writer.Pipeline.Pipeline(SysLogger, Writer.Config.PIPELINE_MAX_CONCURRENCY)
+Pipeline.Add("Prompt", LoadPrompt)
+Pipeline.Add("Outline", GenerateOutline, ["Prompt"])
+Pipeline.Add("StoryInfo", GenerateStoryInfo, ["Outline"])
+Pipeline.Add("ChapterCount", CountChapters, ["Outline"])
+
+# The rest of the graph depends on how many chapters there are
+NumChapters: int = Pipeline.Wait("ChapterCount")
+
+if Writer.Config.EXPAND_OUTLINE and Writer.Config.PARALLEL_CHAPTER_OUTLINES:
+    Pipeline.Add("ChapterSynopses", SummarizeChapters, ["Outline", "ChapterCount"])
+    for i in range(1, NumChapters + 1):
+        Pipeline.Add(f"ChapterOutline_{i}", functools.partial(GenerateIndependentChapterOutline, i), ["Outline", "ChapterSynopses"])
+elif Writer.Config.EXPAND_OUTLINE:
+    for i in range(1, NumChapters + 1):
+        Pipeline.Add(
+            f"ChapterOutline_{i}",
+            functools.partial(GenerateChapterOutline, i),
+            ["Outline"] + ([f"ChapterOutline_{i - 1}"] if i > 1 else []),
+        )
+if Writer.Config.EXPAND_OUTLINE:
+    # Inputs are listed in chapter order, so the outlines are put back together in order however they finish
+    Pipeline.Add("MegaOutline", BuildMegaOutline, ["Outline"] + [f"ChapterOutline_{i}" for i in range(1, NumChapters + 1)])
+
+# Each chapter is written with the ones before it as context
+SysLogger.Log("Starting Chapter Writing", 5)
+for i in range(1, NumChapters + 1):
+    Pipeline.Add(f"Chapter_{i}", functools.partial(WriteChapter, i), ["Outline"] + [f"Chapter_{j}" for j in range(1, i)])
+
+FinalChapterTasks: list = []
+ScrubbedChapterTasks: list = []
+TranslatedChapterTasks: list = []
+for i in range(1, NumChapters + 1):
+
+    # The edit pass reads the whole novel, so it waits for every chapter and the edits before this one
+    FinalTask: str = f"Chapter_{i}"
+    if Writer.Config.ENABLE_FINAL_EDIT_PASS:
+        FinalTask = f"Edited_{i}"
+        Pipeline.Add(
+            FinalTask,
+            functools.partial(EditChapter, i),
+            ["Outline"] + [f"Chapter_{j}" for j in range(1, NumChapters + 1)] + [f"Edited_{j}" for j in range(1, i)],
+        )
+    FinalChapterTasks.append(FinalTask)
+
+    # Now scrub it (if enabled)
+    if not Writer.Config.SCRUB_NO_SCRUB:
+        Pipeline.Add(
+            f"Scrubbed_{i}",
+            functools.partial(ScrubChapter, i),
+            [FinalTask],
+        )
+        FinalTask = f"Scrubbed_{i}"
+    ScrubbedChapterTasks.append(FinalTask)
+
+    # If enabled, translate the chapter
+    if Writer.Config.TRANSLATE_LANGUAGE != "":
+        Pipeline.Add(
+            f"Translated_{i}",
+            functools.partial(TranslateChapter, i),
+            [FinalTask],
+        )
+        FinalTask = f"Translated_{i}"
+    TranslatedChapterTasks.append(FinalTask)
+
+if Writer.Config.SCRUB_NO_SCRUB:
+    SysLogger.Log(f"Skipping Scrubbing Due To Config", 4)
+if Writer.Config.TRANSLATE_LANGUAGE == "":
     SysLogger.Log(f"No Novel Translation Requested, Skipping Translation Step", 4)
+
+Pipeline.Join()
+Results: dict = Pipeline.GetResults()
+
+
+# Now put the whole thing together
+BasePrompt = Results["Prompt"]
+Outline: str = Results["Outline"]["Outline"]
+Elements = Results["Outline"]["StoryElements"]
+RoughChapterOutline = Results["Outline"]["RoughChapterOutline"]
+BaseContext = Results["Outline"]["BaseContext"]
+
+StoryBodyText: str = ""
+StoryInfoJSON:dict = {"Outline": Outline}
+StoryInfoJSON.update({"StoryElements": Elements})
+StoryInfoJSON.update({"RoughChapterOutline": RoughChapterOutline})
+StoryInfoJSON.update({"BaseContext": BaseContext})
+StoryInfoJSON.update({"UnscrubbedChapters": [Results[Task] for Task in FinalChapterTasks]})
+StoryInfoJSON.update({"ScrubbedChapter": [Results[Task] for Task in ScrubbedChapterTasks]})
+NewChapters = [Results[Task] for Task in TranslatedChapterTasks]
 StoryInfoJSON.update({"TranslatedChapters": NewChapters})
 
 
@@ -373,9 +635,7 @@ for Chapter in NewChapters:
 
 
 # Now Generate Info
-Messages = []
-Messages.append(Interface.BuildUserQuery(Outline))
-Info = Writer.StoryInfo.GetStoryInfo(Interface, SysLogger, Messages)
+Info: dict = Results["StoryInfo"]
 Title = Info["Title"]
 StoryInfoJSON.update({"Title": Info["Title"]})
 Summary = Info["Summary"]
@@ -392,6 +652,22 @@ print("---------------------------------------------")
 ElapsedTime = time.time() - StartTime
 
 
+if Interface.Cache is not None:
+    SysLogger.Log(Interface.Cache.GetSummary(), 4)
+Interface.CallStats.LogSummary(SysLogger)
+Interface.Scheduler.LogSummary(SysLogger)
+Pipeline.LogSummary()
+if len(Checkpoint.Resumed) > 0:
+    SysLogger.Log(f"Resumed {len(Checkpoint.Resumed)} Saved Stage(s) From {CheckpointDir}", 4)
+Interface.CallStats.Save(f"{SysLogger.LogDirPrefix}/CallStats.json")
+Pipeline.Save(f"{SysLogger.LogDirPrefix}/Pipeline.json")
+Writer.Metrics.WritePrometheusTextfile(f"{SysLogger.LogDirPrefix}/Metrics.prom")
+Writer.Metrics.WriteJSONSummary(f"{SysLogger.LogDirPrefix}/Metrics.json")
+if Writer.Config.METRICS_TEXTFILE_PATH != "":
+    Writer.Metrics.WritePrometheusTextfile(Writer.Config.METRICS_TEXTFILE_PATH)
+Interface.OutputSink.Close()
+
+
 # Calculate Total Words
 TotalWords: int = Writer.Statistics.GetWordCount(StoryBodyText)
 SysLogger.Log(f"Story Total Word Count: {TotalWords}", 4)
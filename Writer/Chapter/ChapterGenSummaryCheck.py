@@ -1,9 +1,9 @@
-import json
-
 import Writer.LLMEditor
 import Writer.PrintUtils
 import Writer.Config
 import Writer.Prompts
+import Writer.JSONRepair
+import Writer.Schemas
 
 
 def LLMSummaryCheck(Interface, _Logger, _RefSummary: str, _Work: str):
@@ -30,7 +30,7 @@ def LLMSummaryCheck(Interface, _Logger, _RefSummary: str, _Work: str):
         )
     )
     SummaryLangchain = Interface.SafeGenerateText(
-        _Logger, SummaryLangchain, Writer.Config.CHAPTER_STAGE1_WRITER_MODEL
+        _Logger, SummaryLangchain, Writer.Config.CHAPTER_STAGE1_WRITER_MODEL, _MaxChars=Writer.Config.STREAM_MAX_CHARS_CHECK
     )  # CHANGE THIS MODEL EVENTUALLY - BUT IT WORKS FOR NOW!!!
     WorkSummary: str = Interface.GetLastMessageText(SummaryLangchain)
 
@@ -45,7 +45,7 @@ def LLMSummaryCheck(Interface, _Logger, _RefSummary: str, _Work: str):
         )
     )
     SummaryLangchain = Interface.SafeGenerateText(
-        _Logger, SummaryLangchain, Writer.Config.CHAPTER_STAGE1_WRITER_MODEL
+        _Logger, SummaryLangchain, Writer.Config.CHAPTER_STAGE1_WRITER_MODEL, _MaxChars=Writer.Config.STREAM_MAX_CHARS_CHECK
     )  # CHANGE THIS MODEL EVENTUALLY - BUT IT WORKS FOR NOW!!!
     OutlineSummary: str = Interface.GetLastMessageText(SummaryLangchain)
 
@@ -62,38 +62,19 @@ def LLMSummaryCheck(Interface, _Logger, _RefSummary: str, _Work: str):
         )
     )
     ComparisonLangchain = Interface.SafeGenerateText(
-        _Logger, ComparisonLangchain, Writer.Config.REVISION_MODEL, _Format="json"
+        _Logger, ComparisonLangchain, Writer.Config.REVISION_MODEL, _Format=Writer.Schemas.SUMMARY_CHECK, _MaxChars=Writer.Config.STREAM_MAX_CHARS_CHECK
     )  # CHANGE THIS MODEL EVENTUALLY - BUT IT WORKS FOR NOW!!!
 
-    Iters: int = 0
-    while True:
-
-        RawResponse = Interface.GetLastMessageText(ComparisonLangchain)
-        RawResponse = RawResponse.replace("`", "")
-        RawResponse = RawResponse.replace("json", "")
-
-        try:
-            Iters += 1
-            Dict = json.loads(RawResponse)
-            return (
-                Dict["DidFollowOutline"],
-                "### Extra Suggestions:\n" + Dict["Suggestions"],
-            )
-        except Exception as E:
-            if Iters > 4:
-                _Logger.Log("Critical Error Parsing JSON", 7)
-                return False, ""
-
-            _Logger.Log("Error Parsing JSON Written By LLM, Asking For Edits", 7)
-            EditPrompt: str = (
-                f"Please revise your JSON. It encountered the following error during parsing: {E}. Remember that your entire response is plugged directly into a JSON parser, so don't write **anything** except pure json."
-            )
-            ComparisonLangchain.append(Interface.BuildUserQuery(EditPrompt))
-            _Logger.Log("Asking LLM TO Revise", 7)
-            ComparisonLangchain = Interface.SafeGenerateText(
-                _Logger,
-                ComparisonLangchain,
-                Writer.Config.REVISION_MODEL,
-                _Format="json",
-            )
-            _Logger.Log("Done Asking LLM TO Revise JSON", 6)
+    return Writer.JSONRepair.ParseResponseJSON(
+        Interface,
+        _Logger,
+        ComparisonLangchain,
+        Writer.Config.REVISION_MODEL,
+        "LLMSummaryCheck",
+        (False, ""),
+        lambda JSON: (
+            JSON["DidFollowOutline"],
+            "### Extra Suggestions:\n" + JSON["Suggestions"],
+        ),
+        _Format=Writer.Schemas.SUMMARY_CHECK,
+    )
@@ -0,0 +1,72 @@
+import json
+import os
+import tempfile
+import time
+
+
+class Checkpoint:
+    """
+    Saves each completed stage of a run (base context, outline, chapters, ...) to `_Directory`, so that a
+    run which dies part way can be carried on with `-Resume` instead of starting over.
+
+    Each artifact is a small JSON file named after its stage (`Chapters/Chapter_003.json`), written to a
+    temporary file and renamed into place, so a crash mid-write never leaves a half-written artifact
+    behind. Pass None as `_Directory` to turn checkpointing off.
+    """
+
+    def __init__(self, _Directory: str, _Logger=None):
+        self.Directory = _Directory
+        self.Logger = _Logger
+        self.Resumed: list = []
+        if self.Directory is not None:
+            os.makedirs(self.Directory, exist_ok=True)
+
+    def GetPath(self, _Name: str):
+        return os.path.join(self.Directory, f"{_Name}.json")
+
+    def Has(self, _Name: str):
+        return self.Directory is not None and os.path.exists(self.GetPath(_Name))
+
+    def Load(self, _Name: str):
+        """
+        Returns the saved value of stage `_Name`, or None if it hasn't completed yet.
+        """
+        if not self.Has(_Name):
+            return None
+        with open(self.GetPath(_Name), "r") as f:
+            Value = json.load(f)["Value"]
+        self.Resumed.append(_Name)
+        if self.Logger is not None:
+            self.Logger.Log(f"Resuming With Saved '{_Name}' From {self.Directory}", 4)
+        return Value
+
+    def Save(self, _Name: str, _Value):
+        if self.Directory is None:
+            return
+        Path = self.GetPath(_Name)
+        os.makedirs(os.path.dirname(Path), exist_ok=True)
+
+        Handle, TempPath = tempfile.mkstemp(dir=os.path.dirname(Path), prefix=".tmp_")
+        try:
+            with os.fdopen(Handle, "w") as f:
+                json.dump({"Stage": _Name, "SavedAt": time.time(), "Value": _Value}, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(TempPath, Path)
+        except BaseException:
+            if os.path.exists(TempPath):
+                os.remove(TempPath)
+            raise
+        if self.Logger is not None:
+            self.Logger.Log(f"Saved Checkpoint '{_Name}'", 3)
+
+
+def GetCheckpointDirectory(_RunDirectory: str):
+    # Accept a run's log directory as well as the checkpoint directory inside it
+    if os.path.isdir(os.path.join(_RunDirectory, "Checkpoint")):
+        return os.path.join(_RunDirectory, "Checkpoint")
+    return _RunDirectory
+
+
+# Shared stand-in for callers that don't checkpoint
+DISABLED = Checkpoint(None)
@@ -19,9 +19,44 @@ SCRUB_MODEL = "ollama://llama3.2"  # Note this value is overridden by the argpar
 CHECKER_MODEL = "ollama://llama3.2"  # Model used to check results
 TRANSLATOR_MODEL = "ollama://llama3.2"
 
-OLLAMA_CTX = 30000
+OLLAMA_CTX = 30000  # num_ctx used for every request when OLLAMA_AUTO_CTX is disabled
+
+OLLAMA_STRUCTURED_OUTPUTS = True  # Send JSON schemas as Ollama's `format` (needs Ollama 0.5+), plain JSON mode otherwise
+OLLAMA_AUTO_CTX = True  # Pick num_ctx per request from OLLAMA_CTX_BUCKETS instead of always using OLLAMA_CTX
+OLLAMA_CTX_BUCKETS = [4096, 8192, 16384, 32768, 65536, 131072]  # Few sizes, since every change of num_ctx reloads the model
+CONTEXT_RESPONSE_RESERVE = 4096  # Tokens left free for the response when sizing num_ctx (unless num_predict is set)
+DEFAULT_CHARS_PER_TOKEN = 3.6  # Starting estimate, recalibrated per model from the prompt token counts Ollama reports
+TOKENIZERS = {}  # Optional Hugging Face tokenizers for exact counts (needs `tokenizers`), e.g. {"llama3:70b": "meta-llama/Meta-Llama-3-70B"}
 
 OLLAMA_HOST = "127.0.0.1:11434"
+OLLAMA_KEEP_ALIVE = "30m"  # Note this value is overridden by the argparser # keep_alive sent with each request so models stay loaded between pipeline phases ("" for Ollama's default of 5m)
+OLLAMA_RESIDENCY_SCHEDULING = True  # Note this value is overridden by the argparser # Let waiting requests for already loaded models go first, to avoid swapping models
+SCHEDULER_REFRESH_SECONDS = 2  # How often each host's loaded models are re-read from /api/ps
+SCHEDULER_MAX_BYPASS = 8  # Most times a request for an unloaded model can be passed over before it goes regardless
+
+PIPELINE_MAX_CONCURRENCY = 4  # Note this value is overridden by the argparser # Story stages (tasks in Writer.Pipeline) worked on at once
+MAX_CONCURRENT_REQUESTS_PER_HOST = 4  # Note this value is overridden by the argparser # should match OLLAMA_NUM_PARALLEL on the server
+HOST_MAX_CONCURRENCY = {}  # Optional per-host overrides, e.g. {"192.168.1.100:11434": 8}
+HOST_EJECT_AFTER_FAILURES = 2  # Consecutive failed requests before a host is taken out of its model's pool
+HOST_EJECT_SECONDS = 30  # How long an ejected host sits out before it is health checked for re-admission
+RETRY_MAX_ATTEMPTS = 4  # Attempts per request before a transport failure (connection error, 429, 5xx) is fatal
+RETRY_BASE_DELAY = 1  # Backoff before the first retry, doubling (with jitter) for each one after
+RETRY_MAX_DELAY = 60  # Cap on any single backoff, including ones asked for by a Retry-After header
+CIRCUIT_FAILURE_THRESHOLD = 5  # Consecutive failures before requests to a Google/OpenRouter endpoint are held back
+CIRCUIT_RESET_SECONDS = 30  # How long they are held back before a probe request is let through
+OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"  # Point at a local fake server to test without the real API
+OPENROUTER_GZIP_MIN_BYTES = 0  # Gzip request bodies at least this large (e.g. whole-novel edits), 0 to never compress
+OPENAI_HOST = "127.0.0.1:8000"  # Default host for `openai://` models (vLLM, llama.cpp server, ...) given without `@host`
+OPENAI_GZIP_MIN_BYTES = 0  # As OPENROUTER_GZIP_MIN_BYTES, for `openai://` servers (only enable it if the server decompresses requests)
+MOCK_TIME_TO_FIRST_TOKEN = 0.05  # Simulated latency of `mock://` models, override per model with `?ttft=`
+MOCK_TOKENS_PER_SECOND = 500  # Simulated decode speed of `mock://` models (`?tps=`, 0 for instant)
+MOCK_WORDS = 400  # Length of `mock://` text responses (`?words=`)
+MOCK_CHAPTERS = 3  # Chapters in `mock://` outlines, and the chapter count their JSON answers report (`?chapters=`)
+MOCK_SCENES = 3  # Items in `mock://` JSON lists, i.e. scenes per chapter (`?scenes=`)
+MOCK_SCRIPT_PATH = ""  # Optional JSON list of {"Match": regex, "Response": text} for `mock://` calls that need specific answers
+
+SKIP_MODEL_CHECK = False  # Note this value is overridden by the argparser
+MODEL_MANIFEST_PATH = "Cache/ModelManifest.json"  # Models already validated on each host, trusted when SKIP_MODEL_CHECK is set
 
 SEED = 12  # Note this value is overridden by the argparser
 
@@ -38,14 +73,57 @@ CHAPTER_MAX_REVISIONS = 3  # Note this value is overridden by the argparser
 
 SCRUB_NO_SCRUB = False  # Note this value is overridden by the argparser
 EXPAND_OUTLINE = False  # Note this value is overridden by the argparser
+PARALLEL_CHAPTER_OUTLINES = False  # Note this value is overridden by the argparser # Expand each chapter's outline on its own (from the outline plus a synopsis of its neighbours) instead of in one conversation
+CHAPTER_OUTLINE_SYNOPSIS_WINDOW = 2  # Chapters either side of the one being outlined that make it into its synopsis
 ENABLE_FINAL_EDIT_PASS = False  # Note this value is overridden by the argparser
 
 SCENE_GENERATION_PIPELINE = True
 
 OPTIONAL_OUTPUT_NAME = ""
 
+CACHE_ENABLED = False  # Note this value is overridden by the argparser
+CACHE_DIR = "Cache/Responses"  # Note this value is overridden by the argparser
+CACHE_READ_ONLY = False  # Note this value is overridden by the argparser
+CACHE_MAX_BYTES = 4 * 1024**3  # Least recently used entries are evicted past this size
+CACHE_MAX_AGE = 30 * 24 * 60 * 60  # Entries older than this (in seconds) are ignored and evicted
+
+STREAM_VALIDATION = True  # Abandon degenerate responses while they stream instead of after they finish
+STREAM_MAX_CHARS = 120000  # Default cap on response length, for calls that don't pass a tighter one of their own
+STREAM_MAX_CHARS_JSON = 32000  # Default cap for JSON responses
+STREAM_MAX_CHARS_CHAPTER = 60000  # Cap for chapter writing stages and revisions
+STREAM_MAX_CHARS_OUTLINE = 40000  # Cap for the story elements, outline, chapter outlines and scene lists
+STREAM_MAX_CHARS_CHECK = 12000  # Cap for summaries, critiques and yes/no checks
+STREAM_REWRITE_RATIO = 2  # Scrubbing, translating or editing a text may come out at most this many times as long...
+STREAM_REWRITE_SLACK = 4000  # ...plus this many characters
+STREAM_TRAILING_CHARS = 200  # Text allowed after a complete JSON response while waiting for the usage counters, before the stream is closed
+STREAM_REPEAT_NGRAM = 10  # Words per n-gram when looking for repetition loops
+STREAM_REPEAT_MAX = 5  # A response is looping once one n-gram shows up this many times...
+STREAM_REPEAT_WINDOW = 600  # ...within this many words
+STREAM_REFUSAL_PATTERNS = [  # Regexes matched against the start of each response
+    r"I'm sorry, but",
+    r"I am sorry, but",
+    r"I apologi[sz]e, but",
+    r"I can(?:no|')t (?:help|assist|fulfill|comply|write|create|continue)",
+    r"I(?: am|'m) (?:not able|unable) to (?:help|assist|fulfill|comply|write|create|continue)",
+    r"As an AI",
+]
+
+CONTENT_RETRY_BUDGET = 4  # Unusable text responses (empty, too short, abandoned mid-stream) allowed per model before escalating
+FALLBACK_MODELS = {}  # Models to escalate to, in order, once a model spends its retry budget, e.g. {"ollama://llama3:8b": ["ollama://llama3:70b"]} ("*" covers every model without its own entry)
+JSON_MAX_ATTEMPTS = 5  # Unusable JSON responses allowed per model before escalating or giving up (locally repaired ones count as usable)
+
+BATCH_MODE = False  # Note this value is overridden by the argparser
+STREAM_TEE_PATH = ""  # Note this value is overridden by the argparser
+STREAM_FLUSH_CHARS = 256  # Streamed text is echoed to the terminal in chunks of at least this many characters
+
+METRICS_TEXTFILE_PATH = ""  # Note this value is overridden by the argparser
+
 DEBUG = False
 
+CONSOLE_LOG_LEVEL = 0  # Note this value is overridden by the argparser
+LOG_ITEMS_LIMIT = 10000  # Most recent log entries kept in memory by each Logger
+LOG_BATCH_SIZE = 256  # Max log entries written per batch by the background log writer
+
 # Tested models:
 "llama3:70b"  # works as editor model, DO NOT use as writer model, it sucks
 "vanilj/midnight-miqu-70b-v1.5"  # works rather well as the writer, not well as anything else
@@ -0,0 +1,166 @@
+import json
+import threading
+
+
+class CallStats:
+    """
+    Per-call record of LLM timings and token counts, attributed to the pipeline stage that made the call.
+
+    Ollama reports durations in nanoseconds on its final stream chunk. Other providers only report token
+    counts, so their decode time is taken as the wall time after the first token arrived.
+    """
+
+    def __init__(self):
+        self.Calls: list = []
+        self.Escalations: list = []
+        self.Lock = threading.Lock()
+
+    def Record(
+        self,
+        _Stage: str,
+        _CallStack: str,
+        _Provider: str,
+        _Model: str,
+        _Host: str,
+        _WallTime: float,
+        _Usage: dict,
+        _Cached: bool = False,
+    ):
+        Record = {
+            "Stage": _Stage,
+            "CallStack": _CallStack,
+            "Provider": _Provider,
+            "Model": _Model,
+            "Host": _Host,
+            "WallTime": _WallTime,
+            "Cached": _Cached,
+            "TimeToFirstToken": _Usage.get("TimeToFirstToken"),
+            "LoadTime": _Usage.get("load_duration", 0) / 1e9,
+            "PromptTokens": _Usage.get("prompt_eval_count", 0),
+            "PromptBytes": _Usage.get("PromptBytes", 0),
+            "PromptTime": _Usage.get("prompt_eval_duration", 0) / 1e9,
+            "EvalTokens": _Usage.get("eval_count", 0),
+            "EvalTime": _Usage.get("eval_duration", 0) / 1e9,
+            "TotalTime": _Usage.get("total_duration", 0) / 1e9,
+            "Retries": _Usage.get("Retries", 0),
+            "BackoffTime": _Usage.get("BackoffTime", 0.0),
+        }
+        if Record["EvalTime"] == 0 and Record["TimeToFirstToken"] is not None:
+            Record["EvalTime"] = max(_WallTime - Record["TimeToFirstToken"], 0)
+
+        Record["PrefillTokensPerSecond"] = self.GetRate(Record["PromptTokens"], Record["PromptTime"])
+        Record["DecodeTokensPerSecond"] = self.GetRate(Record["EvalTokens"], Record["EvalTime"])
+
+        # Model load time only counts as dominating when it's the bulk of a call that took real time
+        ServerTime = Record["TotalTime"] if Record["TotalTime"] > 0 else _WallTime
+        Record["LoadDominated"] = (
+            Record["LoadTime"] > 1 and Record["LoadTime"] > 0.5 * ServerTime
+        )
+
+        with self.Lock:
+            self.Calls.append(Record)
+        return Record
+
+    def RecordEscalation(self, _Stage: str, _CallStack: str, _FromModel: str, _ToModel: str, _Reason: str):
+        Record = {
+            "Stage": _Stage,
+            "CallStack": _CallStack,
+            "FromModel": _FromModel,
+            "ToModel": _ToModel,
+            "Reason": _Reason,
+        }
+        with self.Lock:
+            self.Escalations.append(Record)
+        return Record
+
+    def GetRate(self, _Tokens: int, _Seconds: float):
+        if _Tokens <= 0 or _Seconds <= 0:
+            return None
+        return _Tokens / _Seconds
+
+    def FormatRecord(self, _Record: dict):
+        Summary: str = f"Generated Response in {round(_Record['WallTime'], 2)}s"
+        if _Record["LoadTime"] > 0:
+            Summary += f" | Load {round(_Record['LoadTime'], 2)}s"
+        if _Record["PromptTokens"] > 0:
+            Summary += f" | Prefill {_Record['PromptTokens']}tok"
+            if _Record["PrefillTokensPerSecond"] is not None:
+                Summary += f" @ {round(_Record['PrefillTokensPerSecond'], 1)}tok/s"
+        if _Record["EvalTokens"] > 0:
+            Summary += f" | Decode {_Record['EvalTokens']}tok"
+            if _Record["DecodeTokensPerSecond"] is not None:
+                Summary += f" @ {round(_Record['DecodeTokensPerSecond'], 1)}tok/s"
+        if _Record["Retries"] > 0 or _Record["BackoffTime"] > 0:
+            Summary += f" | {_Record['Retries']} Retries, {round(_Record['BackoffTime'], 2)}s Backoff"
+        return Summary
+
+    def GetStageSummary(self):
+        """
+        Aggregates the recorded calls per stage, sorted by total wall time.
+        """
+        Stages: dict = {}
+        with self.Lock:
+            Calls = list(self.Calls)
+        for Call in Calls:
+            Stage = Stages.setdefault(
+                Call["Stage"],
+                {
+                    "Calls": 0,
+                    "CachedCalls": 0,
+                    "LoadDominatedCalls": 0,
+                    "WallTime": 0,
+                    "LoadTime": 0,
+                    "PromptTokens": 0,
+                    "PromptBytes": 0,
+                    "PromptTime": 0,
+                    "EvalTokens": 0,
+                    "EvalTime": 0,
+                    "Retries": 0,
+                    "BackoffTime": 0,
+                },
+            )
+            Stage["Calls"] += 1
+            Stage["CachedCalls"] += int(Call["Cached"])
+            Stage["LoadDominatedCalls"] += int(Call["LoadDominated"])
+            for Key in ("WallTime", "LoadTime", "PromptTokens", "PromptBytes", "PromptTime", "EvalTokens", "EvalTime", "Retries", "BackoffTime"):
+                Stage[Key] += Call[Key]
+
+        for Stage in Stages.values():
+            Stage["PrefillTokensPerSecond"] = self.GetRate(Stage["PromptTokens"], Stage["PromptTime"])
+            Stage["DecodeTokensPerSecond"] = self.GetRate(Stage["EvalTokens"], Stage["EvalTime"])
+
+        return dict(sorted(Stages.items(), key=lambda Item: -Item[1]["WallTime"]))
+
+    def LogSummary(self, _Logger):
+        _Logger.Log("LLM Call Timing By Stage:", 4)
+        for Name, Stage in self.GetStageSummary().items():
+            Line = f" - {Name}: {Stage['Calls']} Call(s), {round(Stage['WallTime'], 1)}s Total, {round(Stage['LoadTime'], 1)}s Loading"
+            if Stage["PrefillTokensPerSecond"] is not None:
+                Line += f", Prefill {round(Stage['PrefillTokensPerSecond'], 1)}tok/s"
+            if Stage["DecodeTokensPerSecond"] is not None:
+                Line += f", Decode {round(Stage['DecodeTokensPerSecond'], 1)}tok/s"
+            if Stage["Retries"] > 0:
+                Line += f", {Stage['Retries']} Transport Retries ({round(Stage['BackoffTime'], 1)}s Backoff)"
+            if Stage["LoadDominatedCalls"] > 0:
+                Line += f", {Stage['LoadDominatedCalls']} Load-Dominated Call(s)"
+            _Logger.Log(Line, 6 if Stage["LoadDominatedCalls"] > 0 else 4)
+
+        # Stages whose model had to hand over to a fallback are ones it can't handle reliably
+        with self.Lock:
+            Escalations = list(self.Escalations)
+        Counts: dict = {}
+        for Escalation in Escalations:
+            Key = (Escalation["Stage"], Escalation["FromModel"], Escalation["ToModel"])
+            Counts[Key] = Counts.get(Key, 0) + 1
+        if len(Counts) > 0:
+            _Logger.Log("Model Escalations By Stage:", 6)
+            for (Stage, FromModel, ToModel), Count in sorted(Counts.items(), key=lambda Item: -Item[1]):
+                _Logger.Log(f" - {Stage}: {FromModel} -> {ToModel} x{Count}", 6)
+
+    def Save(self, _Path: str):
+        Data = {"Stages": self.GetStageSummary()}
+        with self.Lock:
+            Data["Calls"] = list(self.Calls)
+            Data["Escalations"] = list(self.Escalations)
+        with open(_Path, "w") as f:
+            json.dump(Data, f, indent=4)
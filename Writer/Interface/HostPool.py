@@ -0,0 +1,107 @@
+import time
+
+
+class HostPool:
+    """
+    Routes requests for one model across several hosts serving it.
+
+    Each request goes to the healthy host with the fewest requests in flight (ties rotate).
+    A host is ejected after `_MaxFailures` consecutive failed requests, and is only re-admitted
+    once `_EjectSeconds` have passed and it answers `_HealthCheck` again. A lone host is never
+    ejected, as there is nowhere to reroute to, so its failures are left to the retry backoff.
+    """
+
+    def __init__(
+        self,
+        _Hosts: list,
+        _HealthCheck=None,
+        _MaxFailures: int = 2,
+        _EjectSeconds: float = 30,
+    ):
+        self.Hosts: list = list(_Hosts)
+        self.HealthCheck = _HealthCheck
+        self.MaxFailures = _MaxFailures
+        self.EjectSeconds = _EjectSeconds
+
+        self.InFlight: dict = {Host: 0 for Host in self.Hosts}
+        self.Failures: dict = {Host: 0 for Host in self.Hosts}
+        self.EjectedUntil: dict = {Host: 0.0 for Host in self.Hosts}
+        self.NextIndex: int = 0
+
+    def IsEjected(self, _Host: str):
+        return self.EjectedUntil[_Host] != 0
+
+    def Eject(self, _Host: str):
+        self.EjectedUntil[_Host] = time.monotonic() + self.EjectSeconds
+
+    def Readmit(self, _Host: str):
+        self.EjectedUntil[_Host] = 0.0
+        self.Failures[_Host] = 0
+
+    def GetWaitTime(self, _Host: str):
+        # How long until an ejected host is due back (0 for healthy hosts)
+        if not self.IsEjected(_Host):
+            return 0
+        return max(self.EjectedUntil[_Host] - time.monotonic(), 0)
+
+    def GetHealthyHosts(self):
+        return [Host for Host in self.Hosts if not self.IsEjected(Host)]
+
+    async def IsHealthy(self, _Host: str):
+        if self.HealthCheck is None:
+            return True
+        try:
+            return bool(await self.HealthCheck(_Host))
+        except Exception:
+            return False
+
+    async def Acquire(self, _PreferredHosts: list = None):
+        """
+        Picks the host for the next request and counts it as in flight until Release is called.
+        Healthy hosts in `_PreferredHosts` (e.g. ones with the model already loaded) are picked over the rest.
+        """
+
+        # Give ejected hosts whose cooldown has expired a chance to rejoin
+        Now = time.monotonic()
+        for Host in self.Hosts:
+            if self.IsEjected(Host) and self.EjectedUntil[Host] <= Now:
+                if await self.IsHealthy(Host):
+                    self.Readmit(Host)
+                else:
+                    self.Eject(Host)
+
+        Candidates = self.GetHealthyHosts()
+        if len(Candidates) == 0:
+            # Everything is down, so try whichever host is due back soonest rather than failing outright
+            Candidates = [min(self.Hosts, key=lambda Host: self.EjectedUntil[Host])]
+        elif _PreferredHosts:
+            Preferred = [Host for Host in Candidates if Host in _PreferredHosts]
+            if len(Preferred) > 0:
+                Candidates = Preferred
+
+        # Rotate the starting point so idle hosts share load instead of the first one taking everything
+        Offset = self.NextIndex % len(Candidates)
+        self.NextIndex += 1
+        Rotated = Candidates[Offset:] + Candidates[:Offset]
+        Host = min(Rotated, key=lambda Host: self.InFlight[Host])
+
+        self.InFlight[Host] += 1
+        return Host
+
+    def Release(self, _Host: str, _Error: Exception = None):
+        self.InFlight[_Host] -= 1
+
+        if _Error is None:
+            self.Failures[_Host] = 0
+            return
+
+        self.Failures[_Host] += 1
+        if len(self.Hosts) > 1 and self.Failures[_Host] >= self.MaxFailures and not self.IsEjected(_Host):
+            self.Eject(_Host)
+
+    def GetStatus(self):
+        Status: list = []
+        for Host in self.Hosts:
+            State = "ejected" if self.IsEjected(Host) else "healthy"
+            Status.append(f"{Host} ({State}, {self.InFlight[Host]} in flight)")
+        return ", ".join(Status)
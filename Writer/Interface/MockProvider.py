@@ -0,0 +1,129 @@
+import Writer.Schemas
+
+import asyncio
+import hashlib
+import json
+import random
+import re
+
+
+WORDS = (
+    "the a storm over harbor lantern quiet city old map captain river light shadow door letter "
+    "promise winter garden signal bridge secret train tower voice memory stranger morning ash "
+    "silver road crew engine ledger rain market window night watch returned carried whispered "
+    "remembered opened crossed waited followed across beneath toward beyond slowly again still"
+).split()
+
+
+class MockProvider:
+    """
+    In-process stand-in for a model server, for running the whole pipeline without a GPU.
+
+    Responses follow each call's contract: JSON formats get an instance of their schema (or an object
+    with the keys the prompt asks for) with `_Scenes` items in each list, and text calls get `_Words`
+    words of filler prose laid out in `_Chapters` chapters. `_Script` entries ({"Match": regex,
+    "Response": text}) are checked against the last message first, for calls that need something
+    specific. Output is deterministic per seed and prompt, and streams after `_TimeToFirstToken`
+    seconds at `_TokensPerSecond` (one token per word).
+    """
+
+    def __init__(
+        self,
+        _TimeToFirstToken: float = 0.05,
+        _TokensPerSecond: float = 500,
+        _Words: int = 400,
+        _Chapters: int = 3,
+        _Script: list = [],
+        _Scenes: int = 3,
+    ):
+        self.TimeToFirstToken = _TimeToFirstToken
+        self.TokensPerSecond = _TokensPerSecond
+        self.Words = _Words
+        self.Chapters = _Chapters
+        self.Scenes = _Scenes
+        self.Script = [(re.compile(Entry["Match"], re.IGNORECASE | re.DOTALL), Entry["Response"]) for Entry in _Script]
+
+    def GetRandom(self, _Messages: list, _Seed: int):
+        Digest = hashlib.sha256(json.dumps([_Seed, _Messages[-1]["content"] if _Messages else ""]).encode("utf-8"))
+        return random.Random(Digest.hexdigest())
+
+    def GenerateResponse(self, _Messages: list, _Format=None, _Seed: int = 0):
+        Random = self.GetRandom(_Messages, _Seed)
+        LastMessage: str = _Messages[-1]["content"] if _Messages else ""
+
+        for Pattern, Response in self.Script:
+            if Pattern.search(LastMessage):
+                return Response
+
+        if Writer.Schemas.IsJSONFormat(_Format):
+            Schema = Writer.Schemas.GetSchema(_Format)
+            if Schema is not None:
+                return json.dumps(self.GenerateFromSchema(Schema, Random), indent=4)
+            # Plain JSON mode, so answer with the keys the prompt spells out
+            Keys = list(dict.fromkeys(re.findall(r'"([A-Za-z_][A-Za-z0-9_]*)"\s*:', LastMessage)))
+            return json.dumps({Key: self.GenerateSentence(Random, 8) for Key in Keys}, indent=4)
+
+        return self.GenerateProse(Random, self.Words)
+
+    def GenerateFromSchema(self, _Schema: dict, _Random: random.Random):
+        if "enum" in _Schema:
+            return _Schema["enum"][0]
+        Type = _Schema.get("type")
+        if Type == "object":
+            return {
+                Key: self.GenerateFromSchema(Property, _Random)
+                for Key, Property in _Schema.get("properties", {}).items()
+            }
+        if Type == "array":
+            Count = max(_Schema.get("minItems", 0), self.Scenes)
+            return [self.GenerateFromSchema(_Schema.get("items", {}), _Random) for _ in range(Count)]
+        if Type == "boolean":
+            # Every "is this done?" check passes, so revision loops end as early as they are allowed to
+            return True
+        if Type == "integer":
+            return max(_Schema.get("minimum", 1), self.Chapters)
+        if Type == "number":
+            return max(_Schema.get("minimum", 0), 80)
+        if Type == "null":
+            return None
+        return self.GenerateSentence(_Random, 12)
+
+    def GenerateSentence(self, _Random: random.Random, _Words: int):
+        Sentence = " ".join(_Random.choice(WORDS) for _ in range(_Words))
+        return Sentence[0].upper() + Sentence[1:] + "."
+
+    def GenerateProse(self, _Random: random.Random, _Words: int):
+        Chapters: list = []
+        WordsPerChapter = max(_Words // self.Chapters, 1)
+        for Chapter in range(1, self.Chapters + 1):
+            Paragraphs: list = []
+            Remaining = WordsPerChapter
+            while Remaining > 0:
+                Sentences: list = []
+                for _ in range(min(5, max(Remaining // 12, 1))):
+                    Length = min(12, Remaining)
+                    Sentences.append(self.GenerateSentence(_Random, Length))
+                    Remaining -= Length
+                    if Remaining <= 0:
+                        break
+                Paragraphs.append(" ".join(Sentences))
+            Chapters.append(f"# Chapter {Chapter}\n\n" + "\n\n".join(Paragraphs))
+        return "\n\n".join(Chapters)
+
+    async def Chat(self, _Messages: list, _Format=None, _Seed: int = 0):
+        """
+        Streams the response as OpenAI-style chunks, ending with one that carries the usage.
+        """
+        Response = self.GenerateResponse(_Messages, _Format, _Seed)
+        Pieces = re.findall(r"\S+\s*|\s+", Response)
+
+        await asyncio.sleep(self.TimeToFirstToken)
+        # Send the tokens in small batches rather than sleeping per token, which would cost more than it simulates
+        Batch = max(int(self.TokensPerSecond * 0.02), 1) if self.TokensPerSecond > 0 else len(Pieces)
+        for Start in range(0, len(Pieces), Batch):
+            if Start > 0 and self.TokensPerSecond > 0:
+                await asyncio.sleep(Batch / self.TokensPerSecond)
+            yield {"choices": [{"delta": {"content": "".join(Pieces[Start : Start + Batch])}}]}
+
+        PromptChars = sum(len(Message["content"]) for Message in _Messages)
+        yield {"choices": [], "usage": {"prompt_tokens": PromptChars // 4, "completion_tokens": len(Pieces)}}
@@ -0,0 +1,171 @@
+import Writer.Metrics
+
+import asyncio
+import contextlib
+import time
+
+
+class Waiter:
+    def __init__(self, _Model: str, _Future: asyncio.Future):
+        self.Model = _Model
+        self.Future = _Future
+        self.Bypassed: int = 0
+
+
+class HostState:
+    def __init__(self, _Capacity: int):
+        self.Capacity = _Capacity
+        self.Running: dict = {}  # Model -> requests in flight
+        self.Resident: set = set()  # Models loaded on the host, as of the last refresh
+        self.LastRefresh: float = 0.0
+        self.Waiters: list = []
+
+    def GetInFlight(self):
+        return sum(self.Running.values())
+
+    def GetWarmModels(self):
+        return self.Resident | {Model for Model, Count in self.Running.items() if Count > 0}
+
+
+class ModelScheduler:
+    """
+    Hands out the request slots of each Ollama host, preferring requests for models that are already loaded.
+
+    Ollama keeps only as many models in memory as fit, so interleaving calls to different models makes it
+    unload and reload weights over and over. When a slot frees up, the scheduler lets the oldest waiting
+    request for a warm model (running, or resident according to `/api/ps`) go ahead of requests for cold
+    ones. A request is never passed over more than `_MaxBypass` times, so cold models don't starve.
+    """
+
+    def __init__(self, _GetCapacity, _ListResident, _RefreshSeconds: float = 2, _MaxBypass: int = 8):
+        self.GetCapacity = _GetCapacity  # Host -> number of requests it may run at once
+        self.ListResident = _ListResident  # async Host -> names of the models loaded on it
+        self.RefreshSeconds = _RefreshSeconds
+        self.MaxBypass = _MaxBypass
+        self.Hosts: dict = {}
+
+        self.Loads: int = 0  # Requests started for a model that wasn't loaded
+        self.ReloadsAvoided: int = 0  # Requests for a warm model moved ahead of one for a cold model
+        self.PerHost: dict = {}  # Host -> {"Loads": n, "ReloadsAvoided": n}
+
+    def GetState(self, _Host: str):
+        if _Host not in self.Hosts:
+            self.Hosts[_Host] = HostState(self.GetCapacity(_Host))
+            self.PerHost[_Host] = {"Loads": 0, "ReloadsAvoided": 0}
+        return self.Hosts[_Host]
+
+    async def Refresh(self, _Host: str, _Force: bool = False):
+        State = self.GetState(_Host)
+        if not _Force and time.monotonic() - State.LastRefresh < self.RefreshSeconds:
+            return
+        State.LastRefresh = time.monotonic()
+        try:
+            State.Resident = set(await self.ListResident(_Host))
+        except Exception:
+            # Keep the last known state, the request itself will find out if the host is down
+            pass
+
+    def IsWarm(self, _Host: str, _Model: str):
+        return _Model in self.GetState(_Host).GetWarmModels()
+
+    def HasFreeSlot(self, _Host: str):
+        State = self.GetState(_Host)
+        return State.GetInFlight() < State.Capacity and len(State.Waiters) == 0
+
+    def GetWarmHosts(self, _Hosts: list, _Model: str):
+        """
+        The hosts in `_Hosts` that have `_Model` loaded and a slot free, for routing requests to.
+        """
+        return [Host for Host in _Hosts if Host is not None and self.IsWarm(Host, _Model) and self.HasFreeSlot(Host)]
+
+    @contextlib.asynccontextmanager
+    async def Slot(self, _Host: str, _Model: str):
+        await self.Acquire(_Host, _Model)
+        try:
+            yield
+        finally:
+            self.Release(_Host, _Model)
+
+    async def Acquire(self, _Host: str, _Model: str):
+        State = self.GetState(_Host)
+        await self.Refresh(_Host)
+
+        if State.GetInFlight() < State.Capacity and len(State.Waiters) == 0:
+            self.Start(_Host, State, _Model)
+            return
+
+        Entry = Waiter(_Model, asyncio.get_running_loop().create_future())
+        State.Waiters.append(Entry)
+        try:
+            await Entry.Future
+        except asyncio.CancelledError:
+            if Entry in State.Waiters:
+                State.Waiters.remove(Entry)
+            elif Entry.Future.done() and not Entry.Future.cancelled():
+                # The slot was granted just as we were cancelled, so hand it on
+                self.Release(_Host, _Model)
+            raise
+
+    def Release(self, _Host: str, _Model: str):
+        State = self.GetState(_Host)
+        State.Running[_Model] -= 1
+        State.Resident.add(_Model)
+        self.Dispatch(_Host, State)
+
+    def Start(self, _Host: str, State: HostState, _Model: str):
+        if _Model not in State.GetWarmModels():
+            self.Loads += 1
+            self.PerHost[_Host]["Loads"] += 1
+            Writer.Metrics.Increment("ollama_model_loads_total", {"host": _Host, "model": _Model})
+            # Loading a model may evict others, so look again before the next decision
+            State.LastRefresh = 0.0
+        State.Running[_Model] = State.Running.get(_Model, 0) + 1
+
+    def Dispatch(self, _Host: str, State: HostState):
+        # A waiter whose task was cancelled has its future cancelled straight away, but only takes itself off the
+        # queue on its next step, so skip it rather than granting it a slot nobody will release
+        State.Waiters = [Entry for Entry in State.Waiters if not Entry.Future.done()]
+        while State.GetInFlight() < State.Capacity and len(State.Waiters) > 0:
+            Entry = self.PickNext(_Host, State)
+            State.Waiters.remove(Entry)
+            self.Start(_Host, State, Entry.Model)
+            Entry.Future.set_result(True)
+
+    def PickNext(self, _Host: str, State: HostState):
+        Head = State.Waiters[0]
+        if Head.Bypassed >= self.MaxBypass:
+            return Head
+
+        Warm = State.GetWarmModels()
+        for Index, Entry in enumerate(State.Waiters):
+            if Entry.Model not in Warm:
+                continue
+            Skipped = State.Waiters[:Index]
+            if any(Other.Model not in Warm for Other in Skipped):
+                # Serving the head instead would have swapped models
+                self.ReloadsAvoided += 1
+                self.PerHost[_Host]["ReloadsAvoided"] += 1
+                Writer.Metrics.Increment("ollama_reloads_avoided_total", {"host": _Host, "model": Entry.Model})
+            for Other in Skipped:
+                Other.Bypassed += 1
+            return Entry
+        return Head
+
+    def GetSummary(self):
+        return {
+            "Loads": self.Loads,
+            "ReloadsAvoided": self.ReloadsAvoided,
+            "Hosts": {
+                Host: {**Counts, "Resident": sorted(self.Hosts[Host].Resident)}
+                for Host, Counts in self.PerHost.items()
+            },
+        }
+
+    def LogSummary(self, _Logger):
+        if len(self.PerHost) == 0:
+            return
+        _Logger.Log(
+            f"Model Scheduler: {self.Loads} Model Load(s), {self.ReloadsAvoided} Reload(s) Avoided By Reordering", 4
+        )
+        for Host, Counts in self.PerHost.items():
+            _Logger.Log(f" - {Host}: {Counts['Loads']} Load(s), {Counts['ReloadsAvoided']} Reload(s) Avoided", 4)
@@ -0,0 +1,229 @@
+import gzip, json, requests, time
+from requests.adapters import HTTPAdapter
+from typing import Any, List, Mapping, Optional, Literal, TypedDict
+from Writer.Interface.RetryPolicy import RetryPolicy, GetRetryAfter, ServerError
+
+CONNECT_TIMEOUT = 10
+
+# Sampling options that servers expect as integers (options parsed from `?param=value` arrive as floats)
+INTEGER_PARAMETERS = {"max_tokens", "max_completion_tokens", "n", "seed", "top_k", "min_tokens", "logprobs", "top_logprobs"}
+
+
+class APIError(ServerError):
+    """An error reported by an OpenAI-compatible server, with the HTTP status (or error code) and any Retry-After it sent."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[str] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def create_session(pool_size: int = 10):
+    """A requests session that keeps up to pool_size connections per host alive, so calls skip the TCP/TLS handshake."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_chunk_text(chunk: dict):
+    choices = chunk.get("choices") or []
+    if len(choices) == 0:
+        return ""
+    return (choices[0].get("delta") or choices[0].get("message") or {}).get("content") or ""
+
+
+class OpenAICompatible:
+    """Streaming client for the OpenAI chat completions protocol, as served by vLLM, llama.cpp's server, OpenRouter and others.
+    https://platform.openai.com/docs/api-reference/chat/streaming
+    """
+
+    Message_Type = TypedDict('Message', { 'role': Literal['user', 'assistant', 'system', 'tool'], 'content': str })
+
+    error_type = APIError
+    error_descriptions: dict = {}
+
+    def __init__(self,
+        api_url: str,
+        model: str,
+        api_key: str = "",
+        options: Optional[Mapping[str, Any]] | None = None,
+        timeout: int = 3600,
+        session: Optional[requests.Session] = None,
+        pool_size: int = 10,
+        gzip_min_bytes: int = 0,
+        ):
+        """api_url is the full chat completions URL, so the client can point at any server (e.g. a local fake for testing).
+        options are passed through as sampling parameters on every request.
+        Pass a shared session to reuse connections across clients, otherwise each client pools its own.
+        Request bodies of at least gzip_min_bytes are sent gzip compressed (0 disables this)."""
+        self.api_url = api_url
+        self.model = model
+        self.api_key = api_key
+        self.options = dict(options) if options is not None else {}
+        self.timeout = timeout
+        self.session = session if session is not None else create_session(pool_size)
+        self.gzip_min_bytes = gzip_min_bytes
+
+    def ensure_array(self,
+            input_msg: List[Message_Type] | Message_Type
+        ) -> List[Message_Type]:
+        if isinstance(input_msg, (list, tuple)):
+            return input_msg
+        else:
+            return [input_msg]
+
+    def get_headers(self):
+        headers = {
+            "Content-Type": "application/json",
+            "Accept": "text/event-stream",
+        }
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+
+    def build_body(self,
+            messages: List[Message_Type],
+            seed: int = None,
+            response_format: Optional[Mapping[str, Any]] | None = None,
+            options: Optional[Mapping[str, Any]] | None = None
+    ):
+        body = {
+            "model": self.model,
+            "messages": messages,
+            "stream": True,
+            # Ask for token counts on the final chunk
+            "stream_options": {"include_usage": True},
+        }
+        for key, value in {**self.options, **(options or {})}.items():
+            if key in INTEGER_PARAMETERS and isinstance(value, float) and value.is_integer():
+                value = int(value)
+            body[key] = value
+        if seed is not None:
+            body["seed"] = seed
+        if response_format is not None:
+            body["response_format"] = response_format
+        return body
+
+    def chat(self,
+            messages: Message_Type,
+            max_retries: int = 10,
+            seed: int = None,
+            response_format: Optional[Mapping[str, Any]] | None = None
+    ):
+        return self.chat_with_usage(messages, max_retries, seed, response_format)[0]
+
+    def chat_with_usage(self,
+            messages: Message_Type,
+            max_retries: int = 10,
+            seed: int = None,
+            response_format: Optional[Mapping[str, Any]] | None = None,
+            retry_policy: Optional[RetryPolicy] = None
+    ):
+        """Same as chat, but returns (content, usage) where usage holds the server's token counts.
+        response_format overrides the client's for this request only, so concurrent calls can ask for different formats.
+        Failed requests are retried with the backoff of retry_policy (honouring Retry-After), returning (None, {}) once max_retries is spent."""
+        policy = retry_policy if retry_policy is not None else RetryPolicy(max_retries)
+        for attempt in range(1, max_retries + 1):
+            try:
+                return self.send(messages, seed, response_format)
+            except Exception as e:
+                if not policy.IsRetryable(e):
+                    raise
+                if attempt >= max_retries:
+                    print(f"Request to '{self.api_url}' failed after {attempt} attempts: '{e}'")
+                    break
+                delay = policy.GetDelay(attempt, GetRetryAfter(e))
+                print(f"Request to '{self.api_url}' failed: '{e}', retry attempt {attempt} in {round(delay, 1)}s.")
+                time.sleep(delay)
+        return None, {}
+
+    def send(self,
+            messages: Message_Type,
+            seed: int = None,
+            response_format: Optional[Mapping[str, Any]] | None = None
+    ):
+        """Makes a single request, returning (content, usage) once the whole response has streamed in.
+        Raises error_type (with the status code and any Retry-After) when the server reports an error, and requests' exceptions on transport failures."""
+        content = []
+        usage = {}
+        for chunk in self.stream(messages, seed, response_format):
+            content.append(get_chunk_text(chunk))
+            usage = chunk.get("usage") or usage
+        return "".join(content), usage
+
+    def stream(self,
+            messages: Message_Type,
+            seed: int = None,
+            response_format: Optional[Mapping[str, Any]] | None = None,
+            options: Optional[Mapping[str, Any]] | None = None
+    ):
+        """Starts a streaming request and returns an iterator over its chunks, as parsed from the server-sent events.
+        options are sampling parameters for this request only, on top of the client's.
+        Errors reported before the stream starts are raised here, and ones reported part way through are raised while iterating.
+        Closing the iterator early closes the connection, which makes the server stop generating."""
+        headers = self.get_headers()
+        data = json.dumps(self.build_body(self.ensure_array(messages), seed, response_format, options)).encode("utf-8")
+        if self.gzip_min_bytes > 0 and len(data) >= self.gzip_min_bytes:
+            # Whole-novel prompts run to megabytes of very compressible text
+            data = gzip.compress(data, compresslevel=5)
+            headers["Content-Encoding"] = "gzip"
+
+        response = self.session.post(url=self.api_url, headers=headers, data=data, timeout=(CONNECT_TIMEOUT, self.timeout), stream=True)
+        if response.status_code >= 400:
+            try:
+                raise self.get_response_error(response)
+            finally:
+                response.close()
+        return self.iter_chunks(response)
+
+    def get_response_error(self, response: requests.Response):
+        retry_after = response.headers.get("Retry-After")
+        try:
+            data = response.json()
+        except ValueError:
+            return self.error_type(f"HTTP {response.status_code}: {response.text[:200]!r}", response.status_code, retry_after)
+        if isinstance(data, dict) and 'error' in data:
+            return self.get_error(data, response.status_code, retry_after)
+        return self.error_type(f"HTTP {response.status_code}: {str(data)[:200]}", response.status_code, retry_after)
+
+    def get_error(self, data: dict, status_code: Optional[int] = None, retry_after: Optional[str] = None):
+        error = data['error'] if isinstance(data['error'], dict) else {"message": str(data['error'])}
+        code = error.get('code')
+        status = code if isinstance(code, int) else status_code
+        message = error.get('message')
+        if status in self.error_descriptions:
+            message = f"{message} ({self.error_descriptions[status]})"
+        return self.error_type(f"{message} (status {status})", status, retry_after)
+
+    def iter_chunks(self, response: requests.Response):
+        """Parses a server-sent event stream of chat completion chunks, closing the response when done (or abandoned)."""
+        retry_after = response.headers.get("Retry-After")
+        try:
+            if "text/event-stream" not in response.headers.get("Content-Type", ""):
+                # Some servers ignore "stream" and answer with the whole completion in one JSON body
+                data = response.json()
+                if 'error' in data:
+                    raise self.get_error(data, response.status_code, retry_after)
+                if not data.get('choices'):
+                    raise self.error_type(f"Response without error but missing choices: {str(data)[:200]}", None, retry_after)
+                yield data
+                return
+
+            # Event streams are always UTF-8, whatever the headers say, and are read as they arrive rather than in blocks
+            response.encoding = "utf-8"
+            for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+                # Blank lines separate events, and lines starting with ':' are keep-alive comments
+                if not line or not line.startswith("data:"):
+                    continue
+                payload = line[len("data:"):].strip()
+                if payload == "[DONE]":
+                    return
+                chunk = json.loads(payload)
+                if 'error' in chunk:
+                    # The server failed part way through, after the 200 was already sent
+                    raise self.get_error(chunk, response.status_code, retry_after)
+                yield chunk
+        finally:
+            response.close()
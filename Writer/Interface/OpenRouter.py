@@ -1,13 +1,32 @@
-import json, requests, time
+import requests
 from typing import Any, List, Mapping, Optional, Literal, Union, TypedDict
+from Writer.Interface.OpenAICompatible import OpenAICompatible, APIError, CONNECT_TIMEOUT, create_session
 
-class OpenRouter:
+# https://openrouter.ai/docs/errors
+ERROR_DESCRIPTIONS = {
+    400: "Bad Request (invalid or missing params, CORS)",
+    401: "Invalid credentials (OAuth session expired, disabled/invalid API key)",
+    402: "Your account or API key has insufficient credits. Add more credits and retry the request.",
+    403: "Your chosen model requires moderation and your input was flagged",
+    408: "Your request timed out",
+    429: "You are being rate limited",
+    502: "Your chosen model is down or we received an invalid response from it",
+    503: "There is no available model provider that meets your routing requirements",
+    524: "Cloudflare timed out waiting for the model",
+}
+
+class OpenRouterError(APIError):
+    """An error reported by OpenRouter, with the HTTP status (or error code) and any Retry-After it sent."""
+
+class OpenRouter(OpenAICompatible):
     """OpenRouter.
     https://openrouter.ai/docs#models
     https://openrouter.ai/docs#llm-parameters
     """
 
-    Message_Type = TypedDict('Message', { 'role': Literal['user', 'assistant', 'system', 'tool'], 'content': str })
+    error_type = OpenRouterError
+    error_descriptions = ERROR_DESCRIPTIONS
+
     ProviderPreferences_Type = TypedDict(
         'ProviderPreferences', {
             'allow_fallbacks': Optional[bool],
@@ -43,18 +62,21 @@ class OpenRouter:
         set_p90: bool = False,
         api_url: str = "https://openrouter.ai/api/v1/chat/completions",
         timeout: int = 3600,
+        session: Optional[requests.Session] = None,
+        pool_size: int = 10,
+        gzip_min_bytes: int = 0,
         ):
+        """api_url can point at any server speaking the same protocol (e.g. a local fake for testing).
+        Pass a shared session to reuse connections across clients, otherwise each client pools its own.
+        Request bodies of at least gzip_min_bytes are sent gzip compressed (0 disables this)."""
 
-        self.api_url = api_url
-        self.api_key = api_key
+        super().__init__(api_url, model, api_key, None, timeout, session, pool_size, gzip_min_bytes)
         self.provider = provider
-        self.model = model
         self.max_tokens = max_tokens
         self.seed = seed
         self.logit_bias = logit_bias
         self.response_format = response_format
         self.stop = stop
-        self.timeout = timeout
 
         # Get the top LLM sampling parameter configurations used by users on OpenRouter.
         # https://openrouter.ai/docs/parameters-api
@@ -64,7 +86,7 @@ class OpenRouter:
                 'accept': 'application/json',
                 'Authorization': f'Bearer {self.api_key}'
             }
-            params = requests.get(parameters_url, headers=headers).json()["data"]
+            params = self.session.get(parameters_url, headers=headers, timeout=CONNECT_TIMEOUT).json()["data"]
             # I am so sorry
             self.temperature = params["temperature_p50"] if set_p50 else params["temperature_p90"]
             self.top_k = params["top_k_p50"] if set_p50 else params["top_k_p90"]
@@ -109,26 +131,19 @@ class OpenRouter:
         if top_p is not None: self.top_p = top_p
         if min_p is not None: self.min_p = min_p
         if top_a is not None: self.top_a = top_a
-    def ensure_array(self,
-            input_msg: List[Message_Type] | Message_Type
-        ) -> List[Message_Type]:
-        if isinstance(input_msg, (list, tuple)):
-            return input_msg
-        else:
-            return [input_msg]
+    def get_headers(self):
+        headers = super().get_headers()
+        headers['HTTP-Referer'] = 'https://github.com/datacrystals/AIStoryWriter'
+        headers['X-Title'] = 'StoryForgeAI'
+        return headers
 
-    def chat(self,
-            messages: Message_Type,
-            max_retries: int = 10,
-            seed: int = None
+    def build_body(self,
+            messages: List[OpenAICompatible.Message_Type],
+            seed: int = None,
+            response_format: Optional[Mapping[str, Any]] | None = None,
+            options: Optional[Mapping[str, Any]] | None = None
     ):
-        messages = self.ensure_array(messages)
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            'HTTP-Referer': 'https://github.com/datacrystals/AIStoryWriter',
-            'X-Title': 'StoryForgeAI',
-        }
-        body={
+        body = {
             "model": self.model,
             "messages": messages,
             "max_token": self.max_tokens,
@@ -142,58 +157,11 @@ class OpenRouter:
             "top_a": self.top_a,
             "seed": self.seed if seed is None else seed,
             "logit_bias": self.logit_bias,
-            "response_format": self.response_format,
+            "response_format": self.response_format if response_format is None else response_format,
             "stop": self.stop,
             "provider": self.provider,
-            "stream": False,
+            "stream": True,
+            "usage": {"include": True},
         }
-
-        retries = 0
-        while retries < max_retries:
-            try:
-                response = requests.post(url=self.api_url, headers=headers, data=json.dumps(body), timeout=self.timeout, stream=False)
-                response.raise_for_status()  # Raises an HTTPError if the HTTP request returned an unsuccessful status code
-                if 'choices' in response.json():
-                    # Return result from request
-                    return response.json()["choices"][0]["message"]["content"]
-                elif 'error' in response.json():
-                    print(f"Openrouter returns error '{response.json()['error']['code']}' with message '{response.json()['error']['message']}', retry attempt {retries + 1}.")
-                    if response.json()['error']['code'] == 400:
-                        print("Bad Request (invalid or missing params, CORS)")
-                    if response.json()['error']['code'] == 401:
-                        raise Exception ("Invalid credentials (OAuth session expired, disabled/invalid API key)")
-                    if response.json()['error']['code'] == 402:
-                        raise Exception ("Your account or API key has insufficient credits. Add more credits and retry the request.")   
-                    if response.json()['error']['code'] == 403:
-                        print("Your chosen model requires moderation and your input was flagged")
-                    if response.json()['error']['code'] == 408:
-                        print("Your request timed out")
-                    if response.json()['error']['code'] == 429:
-                        print("You are being rate limited")
-                        print("Waiting 10 seconds")
-                        time.sleep(10)
-                    if response.json()['error']['code'] == 502:
-                        print("Your chosen model is down or we received an invalid response from it")
-                    if response.json()['error']['code'] == 503:
-                        print("There is no available model provider that meets your routing requirements")
-                else:
-                    from pprint import pprint
-                    print(f"Response without error but missing choices, retry attempt {retries + 1}.")
-                    pprint(response.json())
-            except requests.exceptions.HTTPError as http_err:
-                # HTTP error status code
-                print(f"HTTP error occurred: '{http_err}' - Status Code: '{http_err.response.status_code}', retry attempt {retries + 1}.")
-                # Funny Cloudflare being funny.
-                # This is a lie: https://community.cloudflare.com/t/community-tip-fixing-error-524-a-timeout-occurred/42342
-                if http_err.response.status_code == 524:
-                    time.sleep(10)
-            except (requests.exceptions.Timeout, requests.exceptions.TooManyRedirects) as err:
-                # timeouts and redirects
-                print(f"Retry attempt {retries + 1} after error: '{err}'")
-            except requests.exceptions.RequestException as req_err:
-                # any other request errors that haven't been caught by the previous except blocks
-                print(f"An error occurred while making the request: '{req_err}', retry attempt {retries + 1}.")
-            except Exception as e:
-                # all other exceptions
-                print(f"An unexpected error occurred: '{e}', retry attempt {retries + 1}.")
-            retries += 1
+        body.update(options or {})
+        return body
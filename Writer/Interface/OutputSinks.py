@@ -0,0 +1,203 @@
+import sys
+
+
+class OutputStream:
+    """
+    One streamed response, as opened by `OutputSink.Open`. `Write` is called for every chunk and `End`
+    once the response is complete (or abandoned).
+    """
+
+    def Write(self, _Text: str):
+        pass
+
+    def End(self):
+        pass
+
+
+class OutputSink:
+    """
+    Receives the text of streamed responses as it arrives.
+
+    Several responses can stream at once (e.g. scrubbing one chapter while the next is written), so each
+    one gets its own OutputStream from `Open`, named after the call stack that made the request, and a
+    sink must keep their text apart. All streams run on the interface's event loop, so sinks are only
+    ever called from that one thread.
+    """
+
+    def Open(self, _Name: str):
+        return OutputStream()
+
+    def Close(self):
+        pass
+
+
+class NullSink(OutputSink):
+    """
+    Discards everything, for headless runs.
+    """
+
+    pass
+
+
+class TerminalStream(OutputStream):
+    def __init__(self, _Sink, _Name: str):
+        self.Sink = _Sink
+        self.Name = _Name
+        self.Buffer: list = []
+
+    def Write(self, _Text: str):
+        self.Sink.WriteStream(self, _Text)
+
+    def End(self):
+        self.Sink.EndStream(self)
+
+
+class TerminalSink(OutputSink):
+    """
+    Echoes responses to stdout, buffering chunks so we write (and flush) once per `_FlushChars`
+    characters instead of once per token.
+
+    Only one response is echoed live at a time. Any others streaming alongside it are held back and
+    printed whole, once they are complete and the live one has ended, so their text never interleaves.
+    """
+
+    def __init__(self, _FlushChars: int = 256, _EndText: str = "\n"):
+        self.FlushChars = _FlushChars
+        self.EndText = _EndText
+        self.Buffer: list = []
+        self.BufferedChars: int = 0
+        self.Live: TerminalStream = None
+        self.Streams: list = []  # Streams that have been opened but not ended, in order
+        self.Completed: list = []  # Whole responses waiting for the live one to end
+
+    def Open(self, _Name: str):
+        Stream = TerminalStream(self, _Name)
+        self.Streams.append(Stream)
+        return Stream
+
+    def WriteStream(self, _Stream: TerminalStream, _Text: str):
+        if self.Live is None:
+            self.Live = _Stream
+        if _Stream is not self.Live:
+            _Stream.Buffer.append(_Text)
+            return
+        self.Buffer.append(_Text)
+        self.BufferedChars += len(_Text)
+        if self.BufferedChars >= self.FlushChars:
+            self.Flush()
+
+    def EndStream(self, _Stream: TerminalStream):
+        if _Stream not in self.Streams:
+            return
+        self.Streams.remove(_Stream)
+        if _Stream is not self.Live:
+            self.Completed.append("".join(_Stream.Buffer) + self.EndText)
+            _Stream.Buffer = []
+            if self.Live is not None:
+                return
+        else:
+            self.Buffer.append(self.EndText)
+            self.Live = None
+
+        # The terminal is free, so print what finished meanwhile and hand it to the oldest open stream
+        self.Buffer += self.Completed
+        self.Completed = []
+        if len(self.Streams) > 0:
+            self.Live = self.Streams[0]
+            self.Buffer += self.Live.Buffer
+            self.Live.Buffer = []
+        self.Flush()
+
+    def Flush(self):
+        if len(self.Buffer) == 0:
+            return
+        sys.stdout.write("".join(self.Buffer))
+        sys.stdout.flush()
+        self.Buffer = []
+        self.BufferedChars = 0
+
+    def Close(self):
+        self.Buffer += self.Completed
+        self.Completed = []
+        for Stream in self.Streams:
+            if Stream is not self.Live:
+                self.Buffer += Stream.Buffer
+                Stream.Buffer = []
+        self.Flush()
+
+
+class FileTeeStream(OutputStream):
+    def __init__(self, _Sink, _Name: str, _Inner: OutputStream):
+        self.Sink = _Sink
+        self.Name = _Name
+        self.Inner = _Inner
+        self.Buffer: list = []
+
+    def Write(self, _Text: str):
+        self.Buffer.append(_Text)
+        if self.Inner is not None:
+            self.Inner.Write(_Text)
+
+    def End(self):
+        self.Sink.WriteResponse(self.Name, "".join(self.Buffer))
+        self.Buffer = []
+        if self.Inner is not None:
+            self.Inner.End()
+
+
+class FileTeeSink(OutputSink):
+    """
+    Appends responses to a file, and passes them on to another sink if one is given. Each response is
+    written whole once it ends, under a header naming the call stack that asked for it, so concurrent
+    responses don't interleave.
+    """
+
+    def __init__(self, _Path: str, _Inner: OutputSink = None):
+        self.File = open(_Path, "a", encoding="utf-8")
+        self.Inner = _Inner
+
+    def Open(self, _Name: str):
+        return FileTeeStream(self, _Name, self.Inner.Open(_Name) if self.Inner is not None else None)
+
+    def WriteResponse(self, _Name: str, _Text: str):
+        self.File.write(f"### {_Name}\n\n{_Text}\n\n")
+        self.File.flush()
+
+    def Close(self):
+        self.File.close()
+        if self.Inner is not None:
+            self.Inner.Close()
+
+
+class CallbackStream(OutputStream):
+    def __init__(self, _Sink, _Name: str):
+        self.Sink = _Sink
+        self.Name = _Name
+
+    def Write(self, _Text: str):
+        self.Sink.OnText(self.Name, _Text)
+
+    def End(self):
+        if self.Sink.OnEnd is not None:
+            self.Sink.OnEnd(self.Name)
+
+
+class CallbackSink(OutputSink):
+    """
+    Hands each chunk to `_OnText(name, text)`, and calls `_OnEnd(name)` (if given) when a response
+    completes, `name` telling concurrent responses apart.
+    """
+
+    def __init__(self, _OnText, _OnEnd=None):
+        self.OnText = _OnText
+        self.OnEnd = _OnEnd
+
+    def Open(self, _Name: str):
+        return CallbackStream(self, _Name)
+
+
+def CreateOutputSink(_Echo: bool, _TeePath: str = "", _FlushChars: int = 256, _EndText: str = "\n"):
+    Sink = TerminalSink(_FlushChars, _EndText) if _Echo else NullSink()
+    if _TeePath != "":
+        Sink = FileTeeSink(_TeePath, Sink)
+    return Sink
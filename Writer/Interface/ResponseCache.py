@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+class ResponseCache:
+    """
+    Content-addressed on-disk cache for LLM responses.
+
+    Each entry is keyed by a hash of everything that determines the model's output
+    (provider, model, options, seed, format and the full message list) and stored as
+    a small JSON file at `{CacheDir}/{Key[:2]}/{Key}.json`.
+    Entries older than `_MaxAge` seconds are dropped, and once the cache grows past
+    `_MaxBytes` the least recently used entries are evicted first.
+
+    An entry's file is written once, so its mtime is its creation time and is what both
+    `Get` and `Evict` measure age by. Use is tracked separately, in the atime.
+    """
+
+    def __init__(
+        self,
+        _CacheDir: str,
+        _MaxBytes: int,
+        _MaxAge: float,
+        _ReadOnly: bool = False,
+    ):
+        self.CacheDir = _CacheDir
+        self.MaxBytes = _MaxBytes
+        self.MaxAge = _MaxAge
+        self.ReadOnly = _ReadOnly
+
+        self.Hits: int = 0
+        self.Misses: int = 0
+        self.SavedSeconds: float = 0
+        self.WritesSinceEviction: int = 0
+        self.Lock = threading.Lock()
+
+        if not self.ReadOnly:
+            os.makedirs(self.CacheDir, exist_ok=True)
+            self.Evict()
+
+    def GetKey(
+        self,
+        _Provider: str,
+        _Model: str,
+        _Options: dict,
+        _Seed: int,
+        _Format: str,
+        _Messages: list,
+    ):
+        # Normalize the options so `temperature=1` and `temperature=1.0` share an entry
+        Options: dict = {}
+        for Key, Value in (_Options or {}).items():
+            Options[str(Key)] = float(Value) if isinstance(Value, (int, float)) else Value
+
+        KeyData = {
+            "Provider": _Provider,
+            "Model": _Model,
+            "Options": Options,
+            "Seed": _Seed,
+            "Format": _Format.lower() if isinstance(_Format, str) else _Format,
+            "Messages": [
+                {"role": Message["role"], "content": Message["content"]}
+                for Message in _Messages
+            ],
+        }
+        Serialized = json.dumps(KeyData, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(Serialized.encode("utf-8")).hexdigest()
+
+    def GetPath(self, _Key: str):
+        return os.path.join(self.CacheDir, _Key[:2], f"{_Key}.json")
+
+    def Get(self, _Key: str):
+        """
+        Returns the cached entry for the given key, or None on a miss.
+        """
+        Path = self.GetPath(_Key)
+        try:
+            Stat = os.stat(Path)
+            with open(Path, "r", encoding="utf-8") as f:
+                Entry = json.load(f)
+        except (OSError, ValueError):
+            with self.Lock:
+                self.Misses += 1
+            return None
+
+        if time.time() - Stat.st_mtime > self.MaxAge:
+            with self.Lock:
+                self.Misses += 1
+            return None
+
+        # Mark the entry as used so size-based eviction drops the least recently used first, leaving
+        # the mtime (its age) alone
+        if not self.ReadOnly:
+            try:
+                os.utime(Path, (time.time(), Stat.st_mtime))
+            except OSError:
+                pass
+
+        with self.Lock:
+            self.Hits += 1
+            self.SavedSeconds += Entry.get("GenerationTime", 0)
+        return Entry
+
+    def Put(self, _Key: str, _Response: str, _GenerationTime: float = 0, _Metadata: dict = {}):
+        if self.ReadOnly:
+            return
+
+        Entry = {
+            "Key": _Key,
+            "Created": time.time(),
+            "GenerationTime": _GenerationTime,
+            "Response": _Response,
+        }
+        Entry.update(_Metadata)
+
+        # Write to a temp file and rename it so readers never see a partial entry
+        Path = self.GetPath(_Key)
+        os.makedirs(os.path.dirname(Path), exist_ok=True)
+        TempPath = f"{Path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(TempPath, "w", encoding="utf-8") as f:
+            json.dump(Entry, f, ensure_ascii=False)
+        os.replace(TempPath, Path)
+
+        with self.Lock:
+            self.WritesSinceEviction += 1
+            ShouldEvict = self.WritesSinceEviction >= 100
+            if ShouldEvict:
+                self.WritesSinceEviction = 0
+        if ShouldEvict:
+            self.Evict()
+
+    def Evict(self):
+        """
+        Removes expired entries, then the least recently used ones until under the size limit.
+        """
+        if self.ReadOnly or not os.path.isdir(self.CacheDir):
+            return
+
+        Now = time.time()
+        Entries: list = []
+        TotalBytes: int = 0
+        for Root, _, Files in os.walk(self.CacheDir):
+            for Name in Files:
+                Path = os.path.join(Root, Name)
+                try:
+                    Stat = os.stat(Path)
+                except OSError:
+                    continue
+                if Name.endswith(".tmp") or Now - Stat.st_mtime > self.MaxAge:
+                    # Stale temp files are leftovers from an interrupted write
+                    if Name.endswith(".tmp") and Now - Stat.st_mtime < 3600:
+                        continue
+                    try:
+                        os.remove(Path)
+                    except OSError:
+                        pass
+                    continue
+                Entries.append((max(Stat.st_atime, Stat.st_mtime), Stat.st_size, Path))
+                TotalBytes += Stat.st_size
+
+        if TotalBytes <= self.MaxBytes:
+            return
+
+        Entries.sort()
+        for _, Size, Path in Entries:
+            if TotalBytes <= self.MaxBytes:
+                break
+            try:
+                os.remove(Path)
+                TotalBytes -= Size
+            except OSError:
+                pass
+
+    def GetSummary(self):
+        Total = self.Hits + self.Misses
+        HitRate = (self.Hits / Total * 100) if Total > 0 else 0
+        return f"Response Cache: {self.Hits} Hit(s), {self.Misses} Miss(es) ({HitRate:.1f}% Hit Rate), ~{round(self.SavedSeconds, 2)}s Of Generation Saved"
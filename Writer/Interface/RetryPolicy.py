@@ -0,0 +1,214 @@
+import asyncio
+import email.utils
+import random
+import time
+
+from Writer.Interface.StreamValidators import StreamValidationError
+from Writer.Interface.TokenCounter import ContextOverflowError
+
+
+# HTTP statuses worth retrying: timeouts, rate limits, and server/gateway errors (Cloudflare uses 52x)
+RETRYABLE_STATUSES = {408, 409, 425, 429}
+NON_RETRYABLE_ERRORS = (StreamValidationError, ContextOverflowError, NotImplementedError)
+
+
+class ServerError(Exception):
+    """
+    Base for errors reported by a model server (e.g. OpenAICompatible's APIError). Retried according to their
+    status code, or as a transport failure when the server didn't give one (e.g. an error event mid-stream).
+    """
+
+    pass
+
+
+# Failures of the connection rather than of the request, retried whatever they carry. Anything else without
+# a status code (KeyError, TypeError, ...) is a bug on our side, so sending the request again won't help.
+TRANSPORT_ERRORS = [ConnectionError, TimeoutError, asyncio.TimeoutError, ServerError]
+try:
+    import httpx
+
+    TRANSPORT_ERRORS.append(httpx.TransportError)
+except ImportError:
+    pass
+try:
+    import requests
+
+    TRANSPORT_ERRORS += [requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError]
+except ImportError:
+    pass
+TRANSPORT_ERRORS = tuple(TRANSPORT_ERRORS)
+
+
+class RetriesExhaustedError(Exception):
+    """
+    Raised when a request still fails after the retry policy's last attempt.
+    """
+
+    pass
+
+
+def GetStatusCode(_Error: Exception):
+    # ollama.ResponseError and our own provider errors carry `status_code`, google.api_core errors carry `code`,
+    # and requests/httpx HTTP errors carry the response
+    for Status in (
+        getattr(_Error, "status_code", None),
+        getattr(_Error, "code", None),
+        getattr(getattr(_Error, "response", None), "status_code", None),
+    ):
+        if isinstance(Status, int) and not isinstance(Status, bool):
+            return Status
+    return None
+
+
+def ParseRetryAfter(_Value):
+    """
+    Reads a Retry-After value, either a number of seconds or an HTTP date, returning seconds or None.
+    """
+    if _Value is None:
+        return None
+    if isinstance(_Value, (int, float)):
+        return max(float(_Value), 0)
+    try:
+        return max(float(_Value), 0)
+    except ValueError:
+        pass
+    try:
+        return max(email.utils.parsedate_to_datetime(_Value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def GetRetryAfter(_Error: Exception):
+    if getattr(_Error, "retry_after", None) is not None:
+        return ParseRetryAfter(_Error.retry_after)
+    Headers = getattr(getattr(_Error, "response", None), "headers", None)
+    if Headers is not None:
+        return ParseRetryAfter(Headers.get("Retry-After"))
+    return None
+
+
+class CircuitBreaker:
+    """
+    Stops hammering a host that keeps failing. After `_FailureThreshold` consecutive failures the circuit
+    opens for `_ResetSeconds`, during which requests wait instead of being sent. The first request after
+    that goes through as a probe: success closes the circuit, another failure opens it again.
+    """
+
+    def __init__(self, _FailureThreshold: int, _ResetSeconds: float):
+        self.FailureThreshold = _FailureThreshold
+        self.ResetSeconds = _ResetSeconds
+        self.Failures: int = 0
+        self.OpenUntil: float = 0.0
+
+    def IsOpen(self):
+        return self.GetWaitTime() > 0
+
+    def GetWaitTime(self):
+        return max(self.OpenUntil - time.monotonic(), 0)
+
+    def RecordSuccess(self):
+        self.Failures = 0
+        self.OpenUntil = 0.0
+
+    def RecordFailure(self):
+        self.Failures += 1
+        if self.FailureThreshold > 0 and self.Failures >= self.FailureThreshold:
+            self.OpenUntil = time.monotonic() + self.ResetSeconds
+
+
+class RetryPolicy:
+    """
+    Shared transport retry policy for every provider: exponential backoff with full jitter, honouring
+    Retry-After when the server sends one, and a circuit breaker per host.
+
+    Only transport failures are retried (TRANSPORT_ERRORS, and 408/409/425/429/5xx statuses). Client errors,
+    responses rejected by a stream validator and any other exception are raised straight away, as sending
+    them again won't help.
+    """
+
+    def __init__(
+        self,
+        _MaxAttempts: int = 4,
+        _BaseDelay: float = 1,
+        _MaxDelay: float = 60,
+        _FailureThreshold: int = 5,
+        _ResetSeconds: float = 30,
+    ):
+        self.MaxAttempts = max(_MaxAttempts, 1)
+        self.BaseDelay = _BaseDelay
+        self.MaxDelay = _MaxDelay
+        self.FailureThreshold = _FailureThreshold
+        self.ResetSeconds = _ResetSeconds
+        self.Breakers: dict = {}
+
+    def GetBreaker(self, _Host: str):
+        if _Host not in self.Breakers:
+            self.Breakers[_Host] = CircuitBreaker(self.FailureThreshold, self.ResetSeconds)
+        return self.Breakers[_Host]
+
+    def IsRetryable(self, _Error: Exception):
+        if isinstance(_Error, NON_RETRYABLE_ERRORS):
+            return False
+        Status = GetStatusCode(_Error)
+        if Status is None:
+            return isinstance(_Error, TRANSPORT_ERRORS)
+        return Status in RETRYABLE_STATUSES or Status >= 500
+
+    def GetDelay(self, _Attempt: int, _RetryAfter: float = None):
+        """
+        Backoff before retry number `_Attempt` (1 for the first retry).
+        """
+        if _RetryAfter is not None:
+            # The server knows when it will take us back, but don't let it park the run indefinitely
+            return min(_RetryAfter, self.MaxDelay)
+        return random.uniform(0, min(self.BaseDelay * 2 ** (_Attempt - 1), self.MaxDelay))
+
+    async def Run(self, _Attempt, _Host: str = None, _Stats: dict = None, _Log=None):
+        """
+        Awaits `_Attempt()` (a function returning a fresh coroutine, so each try opens a new request) until
+        it succeeds or the policy gives up. `_Host` selects the circuit breaker, leave it as None when the
+        caller tracks host health itself. Retries and time spent backing off are added to `_Stats`.
+        """
+        Stats = _Stats if _Stats is not None else {}
+        Stats.setdefault("Retries", 0)
+        Stats.setdefault("BackoffTime", 0.0)
+        Breaker = self.GetBreaker(_Host) if _Host is not None else None
+
+        Attempt: int = 0
+        while True:
+            Attempt += 1
+            if Breaker is not None and Breaker.IsOpen():
+                Wait = Breaker.GetWaitTime()
+                if _Log is not None:
+                    _Log(f"Circuit Open For '{_Host}' After {Breaker.Failures} Failures, Waiting {round(Wait, 1)}s", 6)
+                Stats["BackoffTime"] += Wait
+                await asyncio.sleep(Wait)
+
+            try:
+                Result = await _Attempt()
+            except Exception as e:
+                if not self.IsRetryable(e):
+                    raise
+                if Breaker is not None:
+                    Breaker.RecordFailure()
+                if Attempt >= self.MaxAttempts:
+                    if _Log is not None:
+                        _Log("Max Retries Exceeded During Generation, Aborting!", 7)
+                    raise RetriesExhaustedError(
+                        f"Generation failed after {Attempt} attempts, last error: {e}"
+                    ) from e
+
+                Delay = self.GetDelay(Attempt, GetRetryAfter(e))
+                if _Log is not None:
+                    _Log(
+                        f"Exception During Generation{f' On {_Host!r}' if _Host else ''} '{e}', Retrying In {round(Delay, 1)}s ({self.MaxAttempts - Attempt} Retries Remaining)",
+                        7,
+                    )
+                Stats["Retries"] += 1
+                Stats["BackoffTime"] += Delay
+                await asyncio.sleep(Delay)
+                continue
+
+            if Breaker is not None:
+                Breaker.RecordSuccess()
+            return Result
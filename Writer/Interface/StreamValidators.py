@@ -0,0 +1,300 @@
+import collections
+import re
+
+import Writer.JSONRepair
+
+
+class StreamValidationError(Exception):
+    """
+    Raised when a validator rejects a response part way through the stream.
+    """
+
+    def __init__(self, _Reason: str, _Detail: str, _PartialText: str = ""):
+        super().__init__(f"{_Reason}: {_Detail}")
+        self.Reason = _Reason
+        self.Detail = _Detail
+        self.PartialText = _PartialText
+
+
+class JSONGenerationError(Exception):
+    """
+    Raised when a model still hasn't produced the JSON we asked for after the retry budget is spent.
+    """
+
+    pass
+
+
+class ContentGenerationError(Exception):
+    """
+    Raised when a model (and each of its fallbacks) still hasn't produced a usable response after its retry budget is spent.
+    """
+
+    pass
+
+
+class StreamValidator:
+    """
+    Watches a response as it streams in. `Feed` gets each new chunk along with the total length
+    so far, and returns a description of the problem once the response should be abandoned.
+
+    A validator can also set `Complete` once it has seen everything it needs, which ends the
+    stream early, and `Finish` gets to trim the final text.
+    """
+
+    Name: str = "invalid"
+    Complete: bool = False
+
+    def Feed(self, _Chunk: str, _TotalChars: int):
+        return None
+
+    def Finish(self, _Text: str):
+        return _Text
+
+
+class RepetitionValidator(StreamValidator):
+    """
+    Detects generation loops: fires when any run of `_NGramSize` words appears `_MaxRepeats` times
+    within the last `_Window` words.
+    """
+
+    Name = "repetition"
+
+    def __init__(self, _NGramSize: int = 10, _MaxRepeats: int = 5, _Window: int = 600):
+        self.NGramSize = _NGramSize
+        self.MaxRepeats = _MaxRepeats
+        self.Window = _Window
+
+        self.PartialWord: str = ""
+        self.Words = collections.deque()
+        self.NGrams = collections.deque()
+        self.Counts = collections.Counter()
+
+    def Feed(self, _Chunk: str, _TotalChars: int):
+        # Words can be split across chunks, so hold back the trailing fragment until the next one
+        Pieces = (self.PartialWord + _Chunk).split()
+        if len(Pieces) == 0:
+            return None
+        if _Chunk[-1:].isspace():
+            self.PartialWord = ""
+        else:
+            self.PartialWord = Pieces.pop()
+
+        for Word in Pieces:
+            self.Words.append(Word.lower())
+            if len(self.Words) > self.NGramSize:
+                self.Words.popleft()
+            if len(self.Words) < self.NGramSize:
+                continue
+
+            NGram = tuple(self.Words)
+            self.NGrams.append(NGram)
+            self.Counts[NGram] += 1
+            if len(self.NGrams) > self.Window:
+                Oldest = self.NGrams.popleft()
+                self.Counts[Oldest] -= 1
+                if self.Counts[Oldest] == 0:
+                    del self.Counts[Oldest]
+
+            if self.Counts[NGram] >= self.MaxRepeats:
+                return f"'{' '.join(NGram)}' repeated {self.Counts[NGram]} times in the last {len(self.NGrams)} words"
+        return None
+
+
+class LengthValidator(StreamValidator):
+    """
+    Fires once the response runs past `_MaxChars` characters.
+    """
+
+    Name = "length"
+
+    def __init__(self, _MaxChars: int):
+        self.MaxChars = _MaxChars
+
+    def Feed(self, _Chunk: str, _TotalChars: int):
+        if _TotalChars > self.MaxChars:
+            return f"response passed the {self.MaxChars} character cap for this task"
+        return None
+
+
+class RefusalValidator(StreamValidator):
+    """
+    Fires when the response opens with refusal boilerplate. Only the first `_WithinChars`
+    characters are checked, as that's where models put it (and a story may quote it later).
+    """
+
+    Name = "refusal"
+
+    def __init__(self, _Patterns: list, _WithinChars: int = 300):
+        self.Pattern = re.compile(
+            r"^\s*(?:" + "|".join(_Patterns) + ")", re.IGNORECASE
+        )
+        self.WithinChars = _WithinChars
+        self.Head: str = ""
+
+    def Feed(self, _Chunk: str, _TotalChars: int):
+        if len(self.Head) >= self.WithinChars:
+            return None
+        self.Head += _Chunk
+        Match = self.Pattern.match(self.Head)
+        if Match is not None:
+            return f"response opened with refusal '{Match.group(0).strip()}'"
+        return None
+
+
+class JSONValidator(StreamValidator):
+    """
+    Incrementally tokenizes a JSON response, firing as soon as it can no longer become JSON that
+    Writer.JSONRepair can parse (no JSON within `_MaxHeadChars`, mismatched brackets, stray characters)
+    or the top-level object closes without one of `_RequiredAttribs`. Once the top-level value closes the
+    response is Complete, and Finish trims it to just that value (dropping any text or markdown fence
+    the model put before it).
+
+    The mistakes RepairJSON fixes are let through rather than costing a regeneration: single and smart
+    quotes, quotes inside strings, bare words like True or None, raw newlines and trailing commas. Like
+    RepairJSON, a quote only closes a string when the structure carries on after it. This only tracks
+    structure, so the finished text still has to go through Writer.JSONRepair.ParseJSON.
+    """
+
+    Name = "json"
+
+    STRING_CLOSERS = Writer.JSONRepair.STRING_CLOSERS
+
+    def __init__(self, _RequiredAttribs: list = [], _MaxHeadChars: int = 2000):
+        self.RequiredAttribs = list(_RequiredAttribs)
+        self.MaxHeadChars = _MaxHeadChars
+        self.Keys: set = set()
+
+        self.Head: str = ""  # Text before the opening bracket
+        self.Offset: int = 0
+        self.Start: int = None
+        self.End: int = None
+
+        self.Stack: list = []  # Open containers, '{' or '['
+        self.ExpectKey: list = []  # Per open container, whether the next string is an object key
+        self.Quote: str = None  # The character that opened the current string, None outside strings
+        self.Escape: bool = False
+        self.PendingClose: str = None  # A possible closing quote (and whitespace after it), until what follows shows if it was one
+        self.StringIsKey: bool = False
+        self.CurrentString: list = []
+
+    def Feed(self, _Chunk: str, _TotalChars: int):
+        if self.Complete:
+            return None
+        for Character in _Chunk:
+            Problem = self.FeedCharacter(Character)
+            self.Offset += 1
+            if Problem is not None or self.Complete:
+                return Problem
+        return None
+
+    def FeedCharacter(self, _Character: str):
+        if self.Start is None:
+            if _Character in "{[":
+                if _Character == "[" and len(self.RequiredAttribs) > 0:
+                    return "expected an object with required attributes but got a list"
+                self.Start = self.Offset
+                self.Stack.append(_Character)
+                self.ExpectKey.append(_Character == "{")
+                return None
+            # Chatty text or a markdown fence before the JSON is dropped when it's parsed, but give up if none comes
+            self.Head += _Character
+            if len(self.Head) > self.MaxHeadChars:
+                return f"no JSON in the first {self.MaxHeadChars} characters, response started with {self.Head.strip()[:40]!r}"
+            return None
+
+        if self.Quote is not None:
+            if self.PendingClose is not None:
+                if _Character.isspace():
+                    self.PendingClose += _Character
+                    return None
+                if _Character in ",:}]":
+                    self.CloseString()
+                    return self.FeedStructure(_Character)
+                # The quote was part of the text
+                self.AddToString(self.PendingClose)
+                self.PendingClose = None
+
+            if self.Escape:
+                self.Escape = False
+                self.AddToString(_Character)
+            elif _Character == "\\":
+                self.Escape = True
+            elif _Character in self.STRING_CLOSERS[self.Quote]:
+                self.PendingClose = _Character
+            else:
+                self.AddToString(_Character)
+            return None
+
+        return self.FeedStructure(_Character)
+
+    def FeedStructure(self, _Character: str):
+        if _Character.isspace():
+            return None
+        if _Character in self.STRING_CLOSERS:
+            self.Quote = _Character
+            self.StringIsKey = self.Stack[-1] == "{" and self.ExpectKey[-1]
+            self.CurrentString = []
+            return None
+        if _Character == ":":
+            if self.Stack[-1] != "{" or not self.ExpectKey[-1]:
+                return "unexpected ':'"
+            self.ExpectKey[-1] = False
+            return None
+        if _Character == ",":
+            if self.Stack[-1] == "{":
+                self.ExpectKey[-1] = True
+            return None
+        if _Character in "{[":
+            self.Stack.append(_Character)
+            self.ExpectKey.append(_Character == "{")
+            return None
+        if _Character in "}]":
+            Expected = "}" if self.Stack[-1] == "{" else "]"
+            if _Character != Expected:
+                return f"mismatched '{_Character}', expected '{Expected}'"
+            self.Stack.pop()
+            self.ExpectKey.pop()
+            if len(self.Stack) == 0:
+                Missing = [Attrib for Attrib in self.RequiredAttribs if Attrib not in self.Keys]
+                if len(Missing) > 0:
+                    return f"missing required attribute(s) {', '.join(Missing)}"
+                self.End = self.Offset + 1
+                self.Complete = True
+            return None
+        # Numbers and bare words (true, null, and the True/None RepairJSON rewrites)
+        if _Character.isalnum() or _Character in "+-._":
+            return None
+        return f"unexpected character {_Character!r} in JSON"
+
+    def AddToString(self, _Text: str):
+        if self.StringIsKey and len(self.Stack) == 1:
+            self.CurrentString.append(_Text)
+
+    def CloseString(self):
+        self.Quote = None
+        self.PendingClose = None
+        if self.StringIsKey and len(self.Stack) == 1:
+            self.Keys.add("".join(self.CurrentString))
+
+    def Finish(self, _Text: str):
+        if self.Start is None:
+            return _Text
+        return _Text[self.Start : self.End]
+
+
+def CreateStreamValidators(
+    _MaxChars: int,
+    _NGramSize: int,
+    _MaxRepeats: int,
+    _Window: int,
+    _RefusalPatterns: list,
+    _RequiredAttribs: list = None,
+):
+    Validators: list = [RepetitionValidator(_NGramSize, _MaxRepeats, _Window)]
+    if _RequiredAttribs is not None:
+        Validators.append(JSONValidator(_RequiredAttribs))
+    if _MaxChars is not None and _MaxChars > 0:
+        Validators.append(LengthValidator(_MaxChars))
+    if len(_RefusalPatterns) > 0:
+        Validators.append(RefusalValidator(_RefusalPatterns))
+    return Validators
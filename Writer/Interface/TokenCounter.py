@@ -0,0 +1,115 @@
+import threading
+
+
+class ContextOverflowError(Exception):
+    pass
+
+
+class TokenCounter:
+    """
+    Counts prompt tokens for a given model.
+
+    Uses a real tokenizer when one is registered for the model (or configured in `_TokenizerNames`
+    and loadable with the optional `tokenizers` package), otherwise falls back to a chars-per-token
+    ratio that is recalibrated per model from the prompt token counts the server reports back.
+    """
+
+    # Rough per-message cost of the chat template (role markers, separators)
+    MessageOverhead: int = 4
+
+    def __init__(self, _DefaultCharsPerToken: float = 3.6, _TokenizerNames: dict = {}):
+        self.DefaultCharsPerToken = _DefaultCharsPerToken
+        self.TokenizerNames = dict(_TokenizerNames)
+        self.Tokenizers: dict = {}  # Model -> callable(str) -> int, or None if unavailable
+        self.CharsPerToken: dict = {}  # Model -> calibrated ratio
+        self.Lock = threading.Lock()
+
+    def RegisterTokenizer(self, _Model: str, _CountFunction):
+        """
+        Plugs in a tokenizer for a model, given as a function that returns the token count of a string.
+        """
+        with self.Lock:
+            self.Tokenizers[_Model] = _CountFunction
+
+    def GetTokenizer(self, _Model: str, _Log=None):
+        with self.Lock:
+            if _Model in self.Tokenizers:
+                return self.Tokenizers[_Model]
+
+        CountFunction = None
+        if _Model in self.TokenizerNames:
+            try:
+                from tokenizers import Tokenizer
+
+                LoadedTokenizer = Tokenizer.from_pretrained(self.TokenizerNames[_Model])
+                CountFunction = lambda _Text: len(LoadedTokenizer.encode(_Text).ids)
+            except Exception as e:
+                if _Log is not None:
+                    _Log(f"Could Not Load Tokenizer '{self.TokenizerNames[_Model]}' For {_Model} ({e}), Using Estimate", 6)
+
+        # Cache misses too, so we don't retry a failed load on every request
+        with self.Lock:
+            self.Tokenizers[_Model] = CountFunction
+        return CountFunction
+
+    def GetCharsPerToken(self, _Model: str):
+        return self.CharsPerToken.get(_Model, self.DefaultCharsPerToken)
+
+    def CountMessages(self, _Model: str, _Messages: list, _Log=None):
+        Tokenizer = self.GetTokenizer(_Model, _Log)
+        Total: int = 0
+        for Message in _Messages:
+            Content: str = Message["content"]
+            if Tokenizer is not None:
+                Total += Tokenizer(Content)
+            else:
+                Total += int(len(Content) / self.GetCharsPerToken(_Model)) + 1
+            Total += self.MessageOverhead
+        return Total
+
+    def Calibrate(self, _Model: str, _Messages: list, _PromptTokens: int, _Log=None):
+        """
+        Updates the model's chars-per-token estimate from a prompt token count reported by the server.
+        """
+        if _PromptTokens is None or _PromptTokens <= 0 or self.GetTokenizer(_Model, _Log) is not None:
+            return
+
+        Chars = sum(len(Message["content"]) for Message in _Messages)
+        Tokens = _PromptTokens - self.MessageOverhead * len(_Messages)
+        if Tokens <= 0 or Chars < 200:
+            return
+
+        # Servers that reuse a cached prompt prefix report fewer tokens, so ignore implausible ratios
+        Ratio = Chars / Tokens
+        if Ratio < 1.5 or Ratio > 8:
+            return
+
+        with self.Lock:
+            Previous = self.CharsPerToken.get(_Model)
+            self.CharsPerToken[_Model] = Ratio if Previous is None else (0.8 * Previous + 0.2 * Ratio)
+
+
+def PickContextSize(
+    _PromptTokens: int,
+    _ResponseReserve: int,
+    _Buckets: list,
+    _ModelContextLength: int = None,
+    _Floor: int = 0,
+):
+    """
+    Returns the smallest bucket (at least `_Floor`) that fits the prompt plus room for the response,
+    capped at the model's real window when it is known.
+    """
+    Needed = _PromptTokens + _ResponseReserve
+
+    Size = None
+    for Bucket in sorted(_Buckets):
+        if Bucket >= Needed and Bucket >= _Floor:
+            Size = Bucket
+            break
+    if Size is None:
+        Size = max(max(_Buckets), _Floor, Needed)
+
+    if _ModelContextLength is not None:
+        Size = min(Size, _ModelContextLength)
+    return Size
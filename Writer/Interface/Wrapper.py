@@ -1,8 +1,22 @@
 import Writer.Config
+import Writer.Metrics
+import Writer.JSONRepair
+import Writer.Schemas
+from Writer.Interface.ResponseCache import ResponseCache
+from Writer.Interface.HostPool import HostPool
+from Writer.Interface.TokenCounter import TokenCounter, ContextOverflowError, PickContextSize
+from Writer.Interface.CallStats import CallStats
+from Writer.Interface.RetryPolicy import RetryPolicy
+from Writer.Interface.ModelScheduler import ModelScheduler
+from Writer.Interface.OutputSinks import CreateOutputSink
+from Writer.Interface.StreamValidators import StreamValidationError, JSONGenerationError, ContentGenerationError, CreateStreamValidators
 import dotenv
-import inspect
+import asyncio
+import contextvars
+import functools
 import json
 import os
+import threading
 import time
 import random
 import importlib
@@ -13,6 +27,33 @@ from urllib.parse import parse_qs, urlparse
 dotenv.load_dotenv()
 
 
+def GetOllamaModelName(_Model: str):
+    # Ollama reports untagged models as `name:latest`
+    return _Model if ":" in _Model else f"{_Model}:latest"
+
+
+# Name of the pipeline call chain that issued the current request, set when a call crosses onto the interface's event loop
+CallStackContext = contextvars.ContextVar("CallStack", default=None)
+
+
+def OnInterfaceLoop(_Function):
+    """
+    Makes an async Interface method awaitable from any event loop by running it on the interface's own loop.
+    """
+
+    @functools.wraps(_Function)
+    async def Wrapper(self, *args, **kwargs):
+        Coroutine = _Function(self, *args, **kwargs)
+        if asyncio.get_running_loop() is self.Loop:
+            return await Coroutine
+        Future = asyncio.run_coroutine_threadsafe(
+            self.WithCallStack(Coroutine, self.GetCallStack()), self.Loop
+        )
+        return await asyncio.wrap_future(Future)
+
+    return Wrapper
+
+
 class Interface:
 
     def __init__(
@@ -20,10 +61,62 @@ class Interface:
         Models: list = [],
     ):
         self.Clients: dict = {}
+        self.HostClients: dict = {}
+        self.CheckedPackages: set = set()
+        self.TokenCounter = TokenCounter(
+            Writer.Config.DEFAULT_CHARS_PER_TOKEN, Writer.Config.TOKENIZERS
+        )
+        self.ContextLengths: dict = {}  # Model -> real context window reported by the server
+        self.ContextHighWater: dict = {}  # Model -> largest num_ctx sent so far
+        self.CallStats = CallStats()
+        self.OutputSink = CreateOutputSink(
+            not Writer.Config.BATCH_MODE,
+            Writer.Config.STREAM_TEE_PATH,
+            Writer.Config.STREAM_FLUSH_CHARS,
+            "\n\n\n\n" if Writer.Config.DEBUG else "\n",
+        )
+        self.HostSemaphores: dict = {}
+        self.HTTPSession = None
+        self.Scheduler = ModelScheduler(
+            self.GetHostCapacity,
+            self.ListResidentModels,
+            Writer.Config.SCHEDULER_REFRESH_SECONDS,
+            Writer.Config.SCHEDULER_MAX_BYPASS,
+        )
+        self.RetryPolicy = RetryPolicy(
+            Writer.Config.RETRY_MAX_ATTEMPTS,
+            Writer.Config.RETRY_BASE_DELAY,
+            Writer.Config.RETRY_MAX_DELAY,
+            Writer.Config.CIRCUIT_FAILURE_THRESHOLD,
+            Writer.Config.CIRCUIT_RESET_SECONDS,
+        )
         self.History = []
-        self.LoadModels(Models)
+
+        # All provider I/O runs on this loop, so concurrent callers share clients and per-host limits
+        self.Loop = asyncio.new_event_loop()
+        self.LoopThread = threading.Thread(
+            target=self.Loop.run_forever, name="InterfaceLoop", daemon=True
+        )
+        self.LoopThread.start()
+
+        self.Cache = None
+        if Writer.Config.CACHE_ENABLED:
+            self.Cache = ResponseCache(
+                Writer.Config.CACHE_DIR,
+                Writer.Config.CACHE_MAX_BYTES,
+                Writer.Config.CACHE_MAX_AGE,
+                Writer.Config.CACHE_READ_ONLY,
+            )
+        # Load fallback models up front too, so escalating mid-run doesn't stall on a model check or pull
+        self.LoadModels(
+            list(Models) + [Fallback for Model in Models for Fallback in self.GetFallbackModels(Model)]
+        )
 
     def ensure_package_is_installed(self, package_name):
+        # Only check each package once per run
+        if package_name in self.CheckedPackages:
+            return
+        self.CheckedPackages.add(package_name)
         try:
             importlib.import_module(package_name)
         except ImportError:
@@ -33,6 +126,9 @@ class Interface:
             )
 
     def LoadModels(self, Models: list):
+        # Distinct (host, model) pairs to validate on Ollama, checked all at once after the loop
+        OllamaModels: set = set()
+
         for Model in Models:
             if Model in self.Clients:
                 continue
@@ -47,37 +143,20 @@ class Interface:
                     self.ensure_package_is_installed("ollama")
                     import ollama
 
-                    OllamaHost = ModelHost if ModelHost is not None else None
-
-                    # Check if availabel via ollama.show(Model)
-                    # check if the model is in the list of models
-                    try:
-                        ollama.Client(host=OllamaHost).show(ProviderModel)
-                        pass
-                    except Exception as e:
-                        print(
-                            f"Model {ProviderModel} not found in Ollama models. Downloading..."
-                        )
-                        OllamaDownloadStream = ollama.Client(host=OllamaHost).pull(
-                            ProviderModel, stream=True
-                        )
-                        for chunk in OllamaDownloadStream:
-                            if "completed" in chunk and "total" in chunk:
-                                OllamaDownloadProgress = (
-                                    chunk["completed"] / chunk["total"]
-                                )
-                                completedSize = chunk["completed"] / 1024**3
-                                totalSize = chunk["total"] / 1024**3
-                                print(
-                                    f"Downloading {ProviderModel}: {OllamaDownloadProgress * 100:.2f}% ({completedSize:.3f}GB/{totalSize:.3f}GB)",
-                                    end="\r",
-                                )
-                            else:
-                                print(f"{chunk['status']} {ProviderModel}", end="\r")
-                        print("\n\n\n")
-
-                    self.Clients[Model] = ollama.Client(host=OllamaHost)
-                    print(f"OLLAMA Host is '{OllamaHost}'")
+                    # A model may be served by a pool of hosts, e.g. `llama3:70b@hostA,hostB`
+                    OllamaHosts = self.GetHosts(ModelHost)
+                    for OllamaHost in OllamaHosts:
+                        if OllamaHost not in self.HostClients:
+                            self.HostClients[OllamaHost] = ollama.AsyncClient(host=OllamaHost)
+                        OllamaModels.add((OllamaHost, ProviderModel))
+
+                    self.Clients[Model] = HostPool(
+                        OllamaHosts,
+                        self.CheckOllamaHostHealth,
+                        Writer.Config.HOST_EJECT_AFTER_FAILURES,
+                        Writer.Config.HOST_EJECT_SECONDS,
+                    )
+                    print(f"OLLAMA Host(s) are '{', '.join(OllamaHosts)}'")
 
                 elif Provider == "google":
                     # Validate Google API Key
@@ -97,7 +176,17 @@ class Interface:
                     )
 
                 elif Provider == "openai":
-                    raise NotImplementedError("OpenAI API not supported")
+                    # Any server speaking the OpenAI chat completions protocol, e.g. vLLM or llama.cpp's server
+                    from Writer.Interface.OpenAICompatible import OpenAICompatible
+
+                    self.Clients[Model] = OpenAICompatible(
+                        api_url=self.GetOpenAIURL(ModelHost),
+                        model=ProviderModel,
+                        api_key=os.environ.get("OPENAI_API_KEY", ""),
+                        session=self.GetHTTPSession(),
+                        gzip_min_bytes=Writer.Config.OPENAI_GZIP_MIN_BYTES,
+                    )
+                    print(f"OpenAI-Compatible Endpoint is '{self.Clients[Model].api_url}'")
 
                 elif Provider == "openrouter":
                     if (
@@ -110,7 +199,29 @@ class Interface:
                     from Writer.Interface.OpenRouter import OpenRouter
 
                     self.Clients[Model] = OpenRouter(
-                        api_key=os.environ["OPENROUTER_API_KEY"], model=ProviderModel
+                        api_key=os.environ["OPENROUTER_API_KEY"],
+                        model=ProviderModel,
+                        api_url=Writer.Config.OPENROUTER_API_URL,
+                        session=self.GetHTTPSession(),
+                        gzip_min_bytes=Writer.Config.OPENROUTER_GZIP_MIN_BYTES,
+                    )
+
+                elif Provider == "mock":
+                    # In-process fake for running the pipeline without a model server, e.g. `mock://writer?tps=200&words=800`
+                    from Writer.Interface.MockProvider import MockProvider
+
+                    Options = ModelOptions if ModelOptions is not None else {}
+                    Script: list = []
+                    if Writer.Config.MOCK_SCRIPT_PATH != "":
+                        with open(Writer.Config.MOCK_SCRIPT_PATH) as f:
+                            Script = json.load(f)
+                    self.Clients[Model] = MockProvider(
+                        Options.get("ttft", Writer.Config.MOCK_TIME_TO_FIRST_TOKEN),
+                        Options.get("tps", Writer.Config.MOCK_TOKENS_PER_SECOND),
+                        int(Options.get("words", Writer.Config.MOCK_WORDS)),
+                        int(Options.get("chapters", Writer.Config.MOCK_CHAPTERS)),
+                        Script,
+                        int(Options.get("scenes", Writer.Config.MOCK_SCENES)),
                     )
 
                 elif Provider == "Anthropic":
@@ -120,17 +231,201 @@ class Interface:
                     print(f"Warning, ")
                     raise Exception(f"Model Provider {Provider} for {Model} not found")
 
-    def SafeGenerateText(
+        if len(OllamaModels) > 0:
+            self.RunSync(self.ValidateOllamaModelsAsync(OllamaModels))
+
+    def GetHTTPSession(self):
+        # One pooled session for every HTTP provider, so concurrent calls reuse kept-alive connections
+        if self.HTTPSession is None:
+            from Writer.Interface.OpenAICompatible import create_session
+
+            self.HTTPSession = create_session(
+                max([Writer.Config.MAX_CONCURRENT_REQUESTS_PER_HOST] + list(Writer.Config.HOST_MAX_CONCURRENCY.values()))
+            )
+        return self.HTTPSession
+
+    async def ValidateOllamaModelsAsync(self, _Models: set):
+        """
+        Checks that every (host, model) pair exists, pulling missing ones, with all hosts queried concurrently.
+        """
+        Manifest: dict = self.LoadModelManifest()
+        Progress: dict = {}  # (Host, Model, Digest) -> (Completed, Total)
+        Downloading: set = set()
+
+        def PrintProgress():
+            Completed = sum(Done for Done, _ in Progress.values())
+            Total = sum(Size for _, Size in Progress.values())
+            Percent = (Completed / Total * 100) if Total > 0 else 0
+            print(
+                f"Downloading {len(Downloading)} Model(s): {Percent:.2f}% ({Completed / 1024**3:.3f}GB/{Total / 1024**3:.3f}GB)",
+                end="\r",
+            )
+
+        async def Validate(_Host: str, _Model: str):
+            Key = f"{_Model}@{_Host}"
+            if Writer.Config.SKIP_MODEL_CHECK and Key in Manifest:
+                return
+
+            Client = self.HostClients[_Host]
+            try:
+                ModelInfo = await Client.show(_Model)
+                self.ContextLengths.setdefault(_Model, self.GetContextLengthFromInfo(ModelInfo))
+            except Exception as e:
+                print(f"Model {_Model} not found in Ollama models on {_Host}. Downloading...")
+                Downloading.add(Key)
+                async for chunk in await Client.pull(_Model, stream=True):
+                    if "completed" in chunk and "total" in chunk:
+                        Digest = chunk["digest"] if "digest" in chunk else ""
+                        Progress[(_Host, _Model, Digest)] = (chunk["completed"], chunk["total"])
+                        PrintProgress()
+                    else:
+                        print(f"{chunk['status']} {_Model}@{_Host}", end="\r")
+                Downloading.discard(Key)
+                print(f"\nFinished Downloading {_Model} on {_Host}")
+
+            Manifest[Key] = time.time()
+
+        await asyncio.gather(*[Validate(Host, Model) for Host, Model in sorted(_Models)])
+        self.SaveModelManifest(Manifest)
+
+    async def GetOllamaContextLength(self, _Hosts: list, _Model: str):
+        # Ask any host in the pool, they all serve the same model
+        if _Model not in self.ContextLengths:
+            for Host in _Hosts:
+                try:
+                    ModelInfo = await self.HostClients[Host].show(_Model)
+                except Exception:
+                    continue
+                self.ContextLengths[_Model] = self.GetContextLengthFromInfo(ModelInfo)
+                break
+        return self.ContextLengths.get(_Model)
+
+    def GetContextLengthFromInfo(self, _ModelInfo):
+        # `/api/show` reports the window as `<architecture>.context_length` in model_info
+        Info = getattr(_ModelInfo, "modelinfo", None)
+        if Info is None and isinstance(_ModelInfo, dict):
+            Info = _ModelInfo.get("model_info")
+        for Key, Value in (Info or {}).items():
+            if Key.endswith(".context_length"):
+                return int(Value)
+        return None
+
+    def LoadModelManifest(self):
+        try:
+            with open(Writer.Config.MODEL_MANIFEST_PATH, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def SaveModelManifest(self, _Manifest: dict):
+        ManifestDir = os.path.dirname(Writer.Config.MODEL_MANIFEST_PATH)
+        if ManifestDir != "":
+            os.makedirs(ManifestDir, exist_ok=True)
+        TempPath = Writer.Config.MODEL_MANIFEST_PATH + ".tmp"
+        with open(TempPath, "w") as f:
+            json.dump(_Manifest, f, indent=4, sort_keys=True)
+        os.replace(TempPath, Writer.Config.MODEL_MANIFEST_PATH)
+
+    def RunSync(self, _Coroutine):
+        """
+        Runs a coroutine on the interface's event loop and blocks until it finishes.
+        """
+        if threading.current_thread() is self.LoopThread:
+            _Coroutine.close()
+            raise RuntimeError(
+                "Blocking Interface calls cannot be made from the interface's event loop, await the Async variant instead"
+            )
+        Future = asyncio.run_coroutine_threadsafe(
+            self.WithCallStack(_Coroutine, self.GetCallStack()), self.Loop
+        )
+        return Future.result()
+
+    async def WithCallStack(self, _Coroutine, _CallStack: str):
+        CallStackContext.set(_CallStack)
+        return await _Coroutine
+
+    def GetCallStack(self):
+        # Walk out of the interface and event loop internals to the pipeline functions that made this call
+        CallStack: str = ""
+        Frame = sys._getframe(1)
+        while Frame is not None:
+            FileName = Frame.f_code.co_filename
+            if FileName != __file__ and not any(
+                Internal in FileName for Internal in ("asyncio", "threading", "concurrent")
+            ):
+                CallStack += f"{Frame.f_code.co_name}."
+            Frame = Frame.f_back
+        return CallStack[:-1].replace("<module>", "Main")
+
+    def GetHostCapacity(self, _Host: str):
+        return Writer.Config.HOST_MAX_CONCURRENCY.get(
+            _Host, Writer.Config.MAX_CONCURRENT_REQUESTS_PER_HOST
+        )
+
+    def GetHostSemaphore(self, _Host: str):
+        # Created lazily on the interface loop, so they always belong to it
+        if _Host not in self.HostSemaphores:
+            self.HostSemaphores[_Host] = asyncio.Semaphore(self.GetHostCapacity(_Host))
+        return self.HostSemaphores[_Host]
+
+    def GetOllamaSlot(self, _Host: str, _Model: str):
+        # With residency scheduling, the scheduler hands out the host's slots instead of its plain semaphore
+        if Writer.Config.OLLAMA_RESIDENCY_SCHEDULING:
+            return self.Scheduler.Slot(_Host, _Model)
+        return self.GetHostSemaphore(_Host)
+
+    async def ListResidentModels(self, _Host: str):
+        Response = await asyncio.wait_for(self.HostClients[_Host].ps(), timeout=5)
+        return [
+            GetOllamaModelName(Model.get("model") or Model.get("name"))
+            for Model in Response["models"]
+        ]
+
+    def GetHosts(self, _ModelHost: str):
+        if _ModelHost is None:
+            return [None]
+        return [Host.strip() for Host in _ModelHost.split(",") if Host.strip() != ""]
+
+    async def CheckOllamaHostHealth(self, _Host: str):
+        # Listing the running models is cheap and proves the server is answering
+        await asyncio.wait_for(self.HostClients[_Host].ps(), timeout=5)
+        return True
+
+    def SafeGenerateText(self, *args, **kwargs):
+        """
+        Blocking wrapper around SafeGenerateTextAsync.
+        """
+        return self.RunSync(self.SafeGenerateTextAsync(*args, **kwargs))
+
+    def SafeGenerateJSON(self, *args, **kwargs):
+        """
+        Blocking wrapper around SafeGenerateJSONAsync.
+        """
+        return self.RunSync(self.SafeGenerateJSONAsync(*args, **kwargs))
+
+    def ChatAndStreamResponse(self, *args, **kwargs):
+        """
+        Blocking wrapper around ChatAndStreamResponseAsync.
+        """
+        return self.RunSync(self.ChatAndStreamResponseAsync(*args, **kwargs))
+
+    @OnInterfaceLoop
+    async def SafeGenerateTextAsync(
         self,
         _Logger,
         _Messages,
         _Model: str,
         _SeedOverride: int = -1,
         _Format: str = None,
-        _MinWordCount: int = 1
+        _MinWordCount: int = 1,
+        _MaxChars: int = None,
         ):
         """
         This function guarantees that the output will not be whitespace.
+        Unusable responses (empty, shorter than `_MinWordCount`, or abandoned mid-stream by a validator) are retried with
+        a new seed, up to CONTENT_RETRY_BUDGET times per model, before escalating to the model's FALLBACK_MODELS in order.
+        Raises ContentGenerationError once every model has spent its budget. `_MaxChars` is the task's cap on response
+        length (one of the STREAM_MAX_CHARS_* settings, or GetRewriteMaxChars), past which the stream is abandoned.
         """
 
         # Strip Empty Messages
@@ -138,52 +433,137 @@ class Interface:
             if _Messages[i]["content"].strip() == "":
                 del _Messages[i]
         print(f"size(_Messages)={len(_Messages)}")
-        NewMsg = self.ChatAndStreamResponse(_Logger, _Messages, _Model, _SeedOverride, _Format)
 
-        while (self.GetLastMessageText(NewMsg).strip() == "") or (len(self.GetLastMessageText(NewMsg).split(" ")) < _MinWordCount):
-            if self.GetLastMessageText(NewMsg).strip() == "":
-                _Logger.Log("SafeGenerateText: Generation Failed Due To Empty (Whitespace) Response, Reattempting Output", 7)
-            elif (len(self.GetLastMessageText(NewMsg).split(" ")) < _MinWordCount):
-                _Logger.Log(f"SafeGenerateText: Generation Failed Due To Short Response ({len(self.GetLastMessageText(NewMsg).split(' '))}, min is {_MinWordCount}), Reattempting Output", 7)
+        Seed = _SeedOverride
+        Models = [_Model] + self.GetFallbackModels(_Model)
+        for ModelIndex, Model in enumerate(Models):
+            if ModelIndex > 0:
+                await self.EscalateAsync(_Logger, Models[ModelIndex - 1], Model, "content")
 
-            _Messages.pop() # Remove failed attempt
-            print(f"size(_Messages)={len(_Messages)}")
-            NewMsg = self.ChatAndStreamResponse(_Logger, _Messages, _Model, random.randint(0, 99999), _Format)
+            for Attempt in range(1, Writer.Config.CONTENT_RETRY_BUDGET + 1):
+                MetricLabels = self.GetMetricLabels(Model)
+                try:
+                    NewMsg = await self.ChatAndStreamResponseAsync(_Logger, _Messages, Model, Seed, _Format, _MaxChars)
+                except StreamValidationError as e:
+                    _Logger.Log(f"SafeGenerateText: Generation Abandoned After {len(e.PartialText)} Chars ({e}), Reattempting Output ({Attempt}/{Writer.Config.CONTENT_RETRY_BUDGET})", 7)
+                    Writer.Metrics.Increment("llm_stream_aborts_total", {**MetricLabels, "reason": e.Reason})
+                    Writer.Metrics.Increment("llm_retries_total", {**MetricLabels, "reason": e.Reason})
+                    Seed = random.randint(0, 99999)
+                    continue
+
+                Text: str = self.GetLastMessageText(NewMsg)
+                if Text.strip() == "":
+                    _Logger.Log(f"SafeGenerateText: Generation Failed Due To Empty (Whitespace) Response, Reattempting Output ({Attempt}/{Writer.Config.CONTENT_RETRY_BUDGET})", 7)
+                    Writer.Metrics.Increment("llm_empty_responses_total", MetricLabels)
+                    Writer.Metrics.Increment("llm_retries_total", {**MetricLabels, "reason": "empty"})
+                elif len(Text.split(" ")) < _MinWordCount:
+                    _Logger.Log(f"SafeGenerateText: Generation Failed Due To Short Response ({len(Text.split(' '))}, min is {_MinWordCount}), Reattempting Output ({Attempt}/{Writer.Config.CONTENT_RETRY_BUDGET})", 7)
+                    Writer.Metrics.Increment("llm_short_responses_total", MetricLabels)
+                    Writer.Metrics.Increment("llm_retries_total", {**MetricLabels, "reason": "short"})
+                else:
+                    return NewMsg
 
-        return NewMsg
+                _Messages.pop() # Remove failed attempt
+                print(f"size(_Messages)={len(_Messages)}")
+                Seed = random.randint(0, 99999)
 
+        raise ContentGenerationError(
+            f"No usable response from {', '.join(Models)} after {Writer.Config.CONTENT_RETRY_BUDGET} attempt(s) each"
+        )
 
 
-    def SafeGenerateJSON(self, _Logger, _Messages, _Model:str, _SeedOverride:int = -1, _RequiredAttribs:list = []):
 
-        while True:
-            Response = self.SafeGenerateText(_Logger, _Messages, _Model, _SeedOverride, _Format = "JSON")
-            try:
+    @OnInterfaceLoop
+    async def SafeGenerateJSONAsync(self, _Logger, _Messages, _Model:str, _SeedOverride:int = -1, _RequiredAttribs:list = [], _Schema:dict = None, _MaxChars:int = None):
+        """
+        Generates a JSON response, returning the message history and the parsed JSON.
+        The stream is checked as it arrives and dropped as soon as it can't become JSON that Writer.JSONRepair can
+        parse (or closes without one of `_RequiredAttribs`), the usual LLM mistakes being repaired locally instead. When a `_Schema` (from Writer.Schemas) is given, the provider is asked to
+        stick to it and the result is validated against it. After JSON_MAX_ATTEMPTS bad responses the model's
+        FALLBACK_MODELS are tried in order, and JSONGenerationError is raised once they have all failed too.
+        """
 
-                # Check that it returned valid json
-                JSONResponse = json.loads(self.GetLastMessageText(Response))
+        Format = _Schema if _Schema is not None else "json"
+        RequiredAttribs = list(_RequiredAttribs) + Writer.Schemas.GetRequiredAttribs(_Schema)
+        Seed = _SeedOverride
+        LastError = None
+        Models = [_Model] + self.GetFallbackModels(_Model)
+        for ModelIndex, Model in enumerate(Models):
+            if ModelIndex > 0:
+                await self.EscalateAsync(_Logger, Models[ModelIndex - 1], Model, "json")
+
+            for Attempt in range(1, Writer.Config.JSON_MAX_ATTEMPTS + 1):
+                MetricLabels = self.GetMetricLabels(Model)
+                try:
+                    Response = await self.ChatAndStreamResponseAsync(_Logger, _Messages, Model, Seed, Format, _MaxChars, RequiredAttribs)
+                except StreamValidationError as e:
+                    LastError = e
+                    _Logger.Log(f"JSON Error during generation (attempt {Attempt}/{Writer.Config.JSON_MAX_ATTEMPTS}), abandoned after {len(e.PartialText)} chars: {e}", 7)
+                    Writer.Metrics.Increment("llm_stream_aborts_total", {**MetricLabels, "reason": e.Reason})
+                    Writer.Metrics.Increment("llm_json_parse_failures_total", MetricLabels)
+                    Writer.Metrics.Increment("llm_retries_total", {**MetricLabels, "reason": e.Reason})
+                    Seed = random.randint(0, 99999)
+                    continue
 
-                # Now ensure it has the right attributes
-                for _Attrib in _RequiredAttribs:
-                    JSONResponse[_Attrib]
+                try:
 
-                # Now return the json
-                return Response, JSONResponse
+                    # Check that it returned valid json (or something close enough to repair)
+                    JSONResponse, Repaired = Writer.JSONRepair.ParseJSON(self.GetLastMessageText(Response), "{[")
 
-            except Exception as e:
-                _Logger.Log(f"JSON Error during parsing: {e}", 7)
-                del _Messages[-1] # Remove failed attempt
-                Response = self.ChatAndStreamResponse(_Logger, _Messages, _Model, random.randint(0, 99999), _Format = "JSON")
+                    # Now ensure it has the right attributes
+                    for _Attrib in _RequiredAttribs:
+                        JSONResponse[_Attrib]
+                    if _Schema is not None:
+                        Writer.Schemas.Validate(JSONResponse, _Schema)
+
+                    # Now return the json
+                    Writer.Metrics.Increment("llm_json_repairs_total", {**MetricLabels, "outcome": "repaired" if Repaired else "clean"})
+                    return Response, JSONResponse
+
+                except Exception as e:
+                    LastError = e
+                    Writer.Metrics.Increment("llm_json_repairs_total", {**MetricLabels, "outcome": "failed"})
+                    _Logger.Log(f"JSON Error during parsing (attempt {Attempt}/{Writer.Config.JSON_MAX_ATTEMPTS}): {e}", 7)
+                    Writer.Metrics.Increment("llm_json_parse_failures_total", MetricLabels)
+                    Writer.Metrics.Increment("llm_retries_total", {**MetricLabels, "reason": "json"})
+                    del _Messages[-1] # Remove failed attempt
+                    Seed = random.randint(0, 99999)
+
+        raise JSONGenerationError(
+            f"{', '.join(Models)} did not produce valid JSON in {Writer.Config.JSON_MAX_ATTEMPTS} attempt(s) each, last error: {LastError}"
+        )
+
+    def GetFallbackModels(self, _Model: str):
+        """
+        The models to escalate to, in order, once `_Model` has spent its retry budget ("*" covers models without their own entry).
+        """
+        Fallbacks = Writer.Config.FALLBACK_MODELS.get(_Model, Writer.Config.FALLBACK_MODELS.get("*", []))
+        return [Model for Model in Fallbacks if Model != _Model]
+
+    async def EscalateAsync(self, _Logger, _FromModel: str, _ToModel: str, _Reason: str):
+        if _ToModel not in self.Clients:
+            # Model checks block on this loop, so load from a worker thread
+            await asyncio.to_thread(self.LoadModels, [_ToModel])
+
+        MetricLabels = self.GetMetricLabels(_FromModel)
+        _Logger.Log(
+            f"'{_FromModel}' Spent Its Retry Budget In Stage '{MetricLabels['stage']}', Escalating To '{_ToModel}'", 6
+        )
+        self.CallStats.RecordEscalation(MetricLabels["stage"], self.GetCurrentCallStack(), _FromModel, _ToModel, _Reason)
+        Writer.Metrics.Increment("llm_escalations_total", {**MetricLabels, "to": _ToModel, "reason": _Reason})
 
 
 
-    def ChatAndStreamResponse(
+    @OnInterfaceLoop
+    async def ChatAndStreamResponseAsync(
         self,
         _Logger,
         _Messages,
         _Model: str = "llama3",
         _SeedOverride: int = -1,
         _Format: str = None,
+        _MaxChars: int = None,
+        _RequiredAttribs: list = None,
     ):
         Provider, ProviderModel, ModelHost, ModelOptions = self.GetModelAndProvider(
             _Model
@@ -201,12 +581,33 @@ class Interface:
             print("]")
             print("--------- Message History END --------")
 
-        StartGeneration = time.time()
+        # Check the response cache before spending any time on the model
+        CacheKey = None
+        if self.Cache is not None:
+            CacheKey = self.Cache.GetKey(
+                Provider, ProviderModel, ModelOptions, Seed, _Format, _Messages
+            )
+            CacheEntry = self.Cache.Get(CacheKey)
+            if CacheEntry is not None:
+                _Logger.Log(
+                    f"Response Cache Hit For '{ProviderModel}' from '{Provider}' (Key {CacheKey[:12]}, Saved ~{round(CacheEntry.get('GenerationTime', 0), 2)}s)",
+                    4,
+                )
+                _Messages.append(self.BuildAssistantQuery(CacheEntry["Response"]))
+                self.RecordCallStats(Provider, ProviderModel, ModelHost, 0, {}, True)
+                self.SaveLangchain(_Logger, _Messages)
+                return _Messages
+            _Logger.Log(f"Response Cache Miss (Key {CacheKey[:12]})", 4)
 
-        # Calculate estimated tokens
-        TotalChars = len(str(_Messages))
-        AvgCharsPerToken = 5  # estimated average chars per token
-        EstimatedTokens = TotalChars / AvgCharsPerToken
+        StartGeneration = time.time()
+        UsedHost = ModelHost
+        Usage: dict = {}
+        RetryStats: dict = {"Retries": 0, "BackoffTime": 0.0}
+
+        # Count prompt tokens (real tokenizer if one is configured, calibrated estimate otherwise)
+        EstimatedTokens = self.TokenCounter.CountMessages(ProviderModel, _Messages, _Logger.Log)
+        # What actually goes over the wire, tokenizer or not, so prompt growth shows up in the stats
+        PromptBytes: int = sum(len((Message["content"] or "").encode("utf-8")) for Message in _Messages)
         _Logger.Log(
             f"Using Model '{ProviderModel}' from '{Provider}@{ModelHost}' | (Est. ~{EstimatedTokens}tok Context Length) | MessageCount:{len(_Messages)}",
             4,
@@ -247,47 +648,109 @@ class Interface:
                 if key not in ValidParameters:
                     raise ValueError(f"Invalid parameter: {key}")
 
+            # Refuse prompts that can't fit the model's real window, rather than letting Ollama silently truncate them
+            Pool: HostPool = self.Clients[_Model]
+            ModelContextLength = await self.GetOllamaContextLength(Pool.Hosts, ProviderModel)
+            if ModelContextLength is not None and EstimatedTokens >= ModelContextLength:
+                raise ContextOverflowError(
+                    f"Prompt for '{ProviderModel}' needs ~{EstimatedTokens} tokens but its context window is only {ModelContextLength} tokens"
+                )
+
             # Set the default num_ctx if not set by args
             if "num_ctx" not in ModelOptions:
-                ModelOptions["num_ctx"] = Writer.Config.OLLAMA_CTX
+                if Writer.Config.OLLAMA_AUTO_CTX:
+                    # Size the KV cache to the request, but never shrink below the largest size already used for
+                    # this model, as any change to num_ctx makes Ollama reload the model
+                    ResponseReserve = int(ModelOptions.get("num_predict", -1))
+                    if ResponseReserve <= 0:
+                        ResponseReserve = Writer.Config.CONTEXT_RESPONSE_RESERVE
+                    ModelOptions["num_ctx"] = PickContextSize(
+                        EstimatedTokens,
+                        ResponseReserve,
+                        Writer.Config.OLLAMA_CTX_BUCKETS,
+                        ModelContextLength,
+                        self.ContextHighWater.get(ProviderModel, 0),
+                    )
+                    self.ContextHighWater[ProviderModel] = max(
+                        self.ContextHighWater.get(ProviderModel, 0), ModelOptions["num_ctx"]
+                    )
+                else:
+                    ModelOptions["num_ctx"] = Writer.Config.OLLAMA_CTX
+            else:
+                ModelOptions["num_ctx"] = int(ModelOptions["num_ctx"])
+                if EstimatedTokens >= ModelOptions["num_ctx"]:
+                    _Logger.Log(
+                        f"Warning, Prompt (~{EstimatedTokens}tok) Exceeds The Configured num_ctx Of {ModelOptions['num_ctx']} And Will Be Truncated",
+                        6,
+                    )
 
             _Logger.Log(f"Using Ollama Model Options: {ModelOptions}", 4)
 
-            if _Format == "json":
-                # Overwrite the format to JSON
-                ModelOptions["format"] = "json"
+            OllamaFormat = ""
+            if Writer.Schemas.IsJSONFormat(_Format):
+                # Constrain decoding to the schema when there is one (needs Ollama 0.5+), otherwise to any JSON
+                Schema = Writer.Schemas.GetSchema(_Format)
+                if Schema is not None and Writer.Config.OLLAMA_STRUCTURED_OUTPUTS:
+                    OllamaFormat = Schema
+                    _Logger.Log(f"Using Ollama Structured Output Schema '{Schema.get('title', 'Untitled')}'", 4)
+                else:
+                    OllamaFormat = "json"
+                    _Logger.Log("Using Ollama JSON Format", 4)
 
                 # if temperature is not set, set it to 0 for JSON mode
-                if "temperature" not in ModelOptions:
+                # (except on retries, which pass their own seed and need to sample something different)
+                if "temperature" not in ModelOptions and _SeedOverride == -1:
                     ModelOptions["temperature"] = 0
-                _Logger.Log("Using Ollama JSON Format", 4)
 
-            Stream = self.Clients[_Model].chat(
-                model=ProviderModel,
-                messages=_Messages,
-                stream=True,
-                options=ModelOptions,
-            )
-            MaxRetries = 3
+            # Route to the least busy healthy host, failing over to another one if the request dies.
+            # The pool's ejection is the circuit breaker here, so the retry policy only handles the backoff.
+            ScheduledModel = GetOllamaModelName(ProviderModel)
+            ChatOptions: dict = {}
+            if Writer.Config.OLLAMA_KEEP_ALIVE not in (None, ""):
+                ChatOptions["keep_alive"] = Writer.Config.OLLAMA_KEEP_ALIVE
+
+            async def OllamaAttempt():
+                nonlocal UsedHost
+                WarmHosts = None
+                if Writer.Config.OLLAMA_RESIDENCY_SCHEDULING:
+                    WarmHosts = self.Scheduler.GetWarmHosts(Pool.Hosts, ScheduledModel)
+                Host = await Pool.Acquire(WarmHosts)
+                UsedHost = Host
+                if len(Pool.Hosts) > 1:
+                    _Logger.Log(f"Routing Request To Ollama Host '{Host}' | Pool: {Pool.GetStatus()}", 4)
+
+                # Every host is ejected, so wait out this one's cooldown rather than hammering it
+                Wait = Pool.GetWaitTime(Host)
+                if Wait > 0:
+                    _Logger.Log(f"All Ollama Hosts Are Ejected, Waiting {round(Wait, 1)}s For '{Host}'", 6)
+                    RetryStats["BackoffTime"] += Wait
+                    await asyncio.sleep(Wait)
 
-            while True:
                 try:
-                    _Messages.append(self.StreamResponse(Stream, Provider))
-                    break
-                except Exception as e:
-                    if MaxRetries > 0:
-                        _Logger.Log(
-                            f"Exception During Generation '{e}', {MaxRetries} Retries Remaining",
-                            7,
+                    async with self.GetOllamaSlot(Host, ScheduledModel):
+                        Stream = await self.HostClients[Host].chat(
+                            model=ProviderModel,
+                            messages=_Messages,
+                            stream=True,
+                            options=ModelOptions,
+                            format=OllamaFormat,
+                            **ChatOptions,
                         )
-                        MaxRetries -= 1
-                    else:
-                        _Logger.Log(
-                            f"Max Retries Exceeded During Generation, Aborting!", 7
-                        )
-                        raise Exception(
-                            "Generation Failed, Max Retires Exceeded, Aborting"
+                        Result = await self.StreamResponse(
+                            Stream, Provider, StartGeneration, self.GetStreamValidators(_Format, _MaxChars, _RequiredAttribs)
                         )
+                except Exception as e:
+                    # Only count it against the host if it's a failure of the host, not of the request or response
+                    Pool.Release(Host, e if self.RetryPolicy.IsRetryable(e) else None)
+                    raise
+                Pool.Release(Host)
+                return Result
+
+            Message, Usage = await self.RetryPolicy.Run(OllamaAttempt, None, RetryStats, _Logger.Log)
+            self.TokenCounter.Calibrate(
+                ProviderModel, _Messages, Usage.get("prompt_eval_count"), _Logger.Log
+            )
+            _Messages.append(Message)
 
         elif Provider == "google":
 
@@ -308,12 +771,18 @@ class Interface:
                 if "role" in m and m["role"] == "system":
                     m["role"] = "user"
 
-            MaxRetries = 3
-            while True:
-                try:
-                    Stream = self.Clients[_Model].generate_content(
+            async def GoogleAttempt():
+                async with self.GetHostSemaphore(Provider):
+                    # The Google client is blocking, so drive it from a worker thread
+                    Stream = await asyncio.to_thread(
+                        self.Clients[_Model].generate_content,
                         contents=_Messages,
                         stream=True,
+                        generation_config=(
+                            {"response_mime_type": "application/json"}
+                            if Writer.Schemas.IsJSONFormat(_Format)
+                            else None
+                        ),
                         safety_settings={
                             HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
                             HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
@@ -321,22 +790,15 @@ class Interface:
                             HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
                         },
                     )
-                    _Messages.append(self.StreamResponse(Stream, Provider))
-                    break
-                except Exception as e:
-                    if MaxRetries > 0:
-                        _Logger.Log(
-                            f"Exception During Generation '{e}', {MaxRetries} Retries Remaining",
-                            7,
-                        )
-                        MaxRetries -= 1
-                    else:
-                        _Logger.Log(
-                            f"Max Retries Exceeded During Generation, Aborting!", 7
-                        )
-                        raise Exception(
-                            "Generation Failed, Max Retires Exceeded, Aborting"
-                        )
+                    return await self.StreamResponse(
+                        self.IterateInThread(Stream),
+                        Provider,
+                        StartGeneration,
+                        self.GetStreamValidators(_Format, _MaxChars, _RequiredAttribs),
+                    )
+
+            Message, Usage = await self.RetryPolicy.Run(GoogleAttempt, Provider, RetryStats, _Logger.Log)
+            _Messages.append(Message)
 
             # Replace "parts" back to "content" for generalization
             # and replace "model" with "assistant"
@@ -348,7 +810,39 @@ class Interface:
                     m["role"] = "assistant"
 
         elif Provider == "openai":
-            raise NotImplementedError("OpenAI API not supported")
+
+            Client = self.Clients[_Model]
+            UsedHost = ModelHost
+            ModelOptions = dict(ModelOptions) if ModelOptions is not None else {}
+            if Writer.Schemas.IsJSONFormat(_Format):
+                # Same as Ollama: deterministic JSON, except on retries, which need to sample something different
+                if "temperature" not in ModelOptions and _SeedOverride == -1:
+                    ModelOptions["temperature"] = 0
+            if len(ModelOptions) > 0:
+                _Logger.Log(f"Using OpenAI-Compatible Sampling Options: {ModelOptions}", 4)
+
+            async def OpenAIAttempt():
+                # The server batches concurrent requests itself, so the only limit is the host's semaphore
+                async with self.GetHostSemaphore(ModelHost):
+                    Stream = await asyncio.to_thread(
+                        Client.stream,
+                        messages=_Messages,
+                        seed=Seed,
+                        response_format=self.GetOpenAIResponseFormat(_Format),
+                        options=ModelOptions,
+                    )
+                    return await self.StreamResponse(
+                        self.IterateInThread(Stream),
+                        Provider,
+                        StartGeneration,
+                        self.GetStreamValidators(_Format, _MaxChars, _RequiredAttribs),
+                    )
+
+            Message, Usage = await self.RetryPolicy.Run(OpenAIAttempt, ModelHost, RetryStats, _Logger.Log)
+            self.TokenCounter.Calibrate(
+                ProviderModel, _Messages, Usage.get("prompt_eval_count"), _Logger.Log
+            )
+            _Messages.append(Message)
 
         elif Provider == "openrouter":
 
@@ -374,8 +868,41 @@ class Interface:
             Client.model = ProviderModel
             print(ProviderModel)
 
-            Response = Client.chat(messages=_Messages, seed=Seed)
-            _Messages.append({"role": "assistant", "content": Response})
+            async def OpenRouterAttempt():
+                async with self.GetHostSemaphore(Provider):
+                    # The client is blocking, so open the stream and read each event from a worker thread
+                    Stream = await asyncio.to_thread(
+                        Client.stream,
+                        messages=_Messages,
+                        seed=Seed,
+                        response_format=self.GetOpenAIResponseFormat(_Format),
+                    )
+                    return await self.StreamResponse(
+                        self.IterateInThread(Stream),
+                        Provider,
+                        StartGeneration,
+                        self.GetStreamValidators(_Format, _MaxChars, _RequiredAttribs),
+                    )
+
+            Message, Usage = await self.RetryPolicy.Run(OpenRouterAttempt, Provider, RetryStats, _Logger.Log)
+            _Messages.append(Message)
+
+        elif Provider == "mock":
+
+            Client = self.Clients[_Model]
+
+            async def MockAttempt():
+                # Mock "hosts" get the same concurrency limit a real server would
+                async with self.GetHostSemaphore(ModelHost or Provider):
+                    return await self.StreamResponse(
+                        Client.Chat(_Messages, _Format, Seed),
+                        Provider,
+                        StartGeneration,
+                        self.GetStreamValidators(_Format, _MaxChars, _RequiredAttribs),
+                    )
+
+            Message, Usage = await self.RetryPolicy.Run(MockAttempt, None, RetryStats, _Logger.Log)
+            _Messages.append(Message)
 
         elif Provider == "Anthropic":
             raise NotImplementedError("Anthropic API not supported")
@@ -385,42 +912,216 @@ class Interface:
 
         # Log the time taken to generate the response
         EndGeneration = time.time()
-        _Logger.Log(
-            f"Generated Response in {round(EndGeneration - StartGeneration, 2)}s (~{round(EstimatedTokens / (EndGeneration - StartGeneration), 2)}tok/s)",
-            4,
+        Usage = {**Usage, **RetryStats, "PromptBytes": PromptBytes}
+        Stats = self.RecordCallStats(
+            Provider, ProviderModel, UsedHost, EndGeneration - StartGeneration, Usage
         )
-        # Check if the response is empty and attempt regeneration if necessary
-        if _Messages[-1]["content"].strip() == "":
-            _Logger.Log("Model Returned Only Whitespace, Attempting Regeneration", 6)
-            _Messages.append(
-                self.BuildUserQuery(
-                    "Sorry, but you returned an empty string, please try again!"
-                )
+        _Logger.Log(self.CallStats.FormatRecord(Stats), 4)
+        if Stats["LoadDominated"]:
+            _Logger.Log(
+                f"Warning, Loading '{ProviderModel}' On '{UsedHost}' Took {round(Stats['LoadTime'], 2)}s Of This Call, Models May Be Swapping In And Out",
+                6,
+            )
+        # Empty responses are left for the caller to retry (SafeGenerateText does, within its budget), just never cached
+        IsEmpty: bool = (_Messages[-1]["content"] or "").strip() == ""
+        if IsEmpty:
+            _Logger.Log("Model Returned Only Whitespace", 6)
+
+        if CacheKey is not None and not IsEmpty:
+            self.Cache.Put(
+                CacheKey,
+                _Messages[-1]["content"],
+                EndGeneration - StartGeneration,
+                {"Provider": Provider, "Model": ProviderModel},
             )
-            return self.ChatAndStreamResponse(_Logger, _Messages, _Model, _SeedOverride)
 
-        CallStack: str = ""
-        for Frame in inspect.stack()[1:]:
-            CallStack += f"{Frame.function}."
-        CallStack = CallStack[:-1].replace("<module>", "Main")
-        _Logger.SaveLangchain(CallStack, _Messages)
+        self.SaveLangchain(_Logger, _Messages)
         return _Messages
 
-    def StreamResponse(self, _Stream, _Provider: str):
-        Response: str = ""
-        for chunk in _Stream:
+    def GetCurrentCallStack(self):
+        CallStack = CallStackContext.get()
+        if CallStack is None:
+            CallStack = self.GetCallStack()
+        return CallStack
+
+    def GetMetricLabels(self, _Model: str):
+        Labels = Writer.Metrics.GetModelLabels(_Model)
+        Labels["stage"] = self.GetCurrentCallStack().split(".")[0]
+        return Labels
+
+    def RecordCallStats(self, _Provider, _Model, _Host, _WallTime, _Usage, _Cached = False):
+        # The innermost pipeline function is the stage the call is attributed to
+        CallStack = self.GetCurrentCallStack()
+        Record = self.CallStats.Record(
+            CallStack.split(".")[0], CallStack, _Provider, _Model, _Host, _WallTime, _Usage, _Cached
+        )
+
+        MetricLabels = {
+            "provider": _Provider,
+            "model": _Model,
+            "host": _Host or "",
+            "stage": Record["Stage"],
+        }
+        Writer.Metrics.Increment("llm_calls_total", MetricLabels)
+        if _Cached:
+            Writer.Metrics.Increment("llm_cache_hits_total", MetricLabels)
+            return Record
+        Writer.Metrics.Observe("llm_call_latency_seconds", MetricLabels, _WallTime)
+        if Record["TimeToFirstToken"] is not None:
+            Writer.Metrics.Observe(
+                "llm_time_to_first_token_seconds",
+                MetricLabels,
+                Record["TimeToFirstToken"],
+                Writer.Metrics.TTFT_BUCKETS,
+            )
+        Writer.Metrics.Increment("llm_prompt_tokens_total", MetricLabels, Record["PromptTokens"])
+        Writer.Metrics.Increment("llm_prompt_bytes_total", MetricLabels, Record["PromptBytes"])
+        Writer.Metrics.Increment("llm_completion_tokens_total", MetricLabels, Record["EvalTokens"])
+        Writer.Metrics.Increment("llm_load_seconds_total", MetricLabels, Record["LoadTime"])
+        if Record["Retries"] > 0:
+            Writer.Metrics.Increment("llm_transport_retries_total", MetricLabels, Record["Retries"])
+        if Record["BackoffTime"] > 0:
+            Writer.Metrics.Increment("llm_backoff_seconds_total", MetricLabels, Record["BackoffTime"])
+        return Record
+
+    def SaveLangchain(self, _Logger, _Messages: list):
+        # Name the debug dump after the call stack that led to this generation
+        _Logger.SaveLangchain(self.GetCurrentCallStack(), _Messages)
+
+    async def IterateInThread(self, _Iterable):
+        # Adapts a blocking iterator (e.g. the Google stream) so each chunk is fetched off the event loop
+        Iterator = await asyncio.to_thread(iter, _Iterable)
+        Done = object()
+        try:
+            while True:
+                Chunk = await asyncio.to_thread(next, Iterator, Done)
+                if Chunk is Done:
+                    break
+                yield Chunk
+        finally:
+            # Closing early (e.g. a validator fired) has to reach the blocking iterator to drop its connection
+            if hasattr(Iterator, "close"):
+                await asyncio.to_thread(Iterator.close)
+
+    def GetOpenAIURL(self, _Host: str):
+        # Hosts are given as `host:port`, using https only for the standard TLS port
+        if _Host.startswith("http://") or _Host.startswith("https://"):
+            return _Host.rstrip("/") + "/v1/chat/completions"
+        Scheme = "https" if _Host.endswith(":443") else "http"
+        return f"{Scheme}://{_Host}/v1/chat/completions"
+
+    def GetOpenAIResponseFormat(self, _Format):
+        if not Writer.Schemas.IsJSONFormat(_Format):
+            return None
+        Schema = Writer.Schemas.GetSchema(_Format)
+        # OpenAI-style structured outputs only take schemas with an object at the root
+        if Schema is None or Schema.get("type") != "object":
+            return {"type": "json_object"}
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": Schema.get("title", "Response"), "schema": Schema},
+        }
+
+    def GetStreamValidators(self, _Format: str, _MaxChars: int = None, _RequiredAttribs: list = None):
+        if not Writer.Config.STREAM_VALIDATION:
+            return []
+        if _MaxChars is None:
+            IsJSON = Writer.Schemas.IsJSONFormat(_Format)
+            _MaxChars = Writer.Config.STREAM_MAX_CHARS_JSON if IsJSON else Writer.Config.STREAM_MAX_CHARS
+        return CreateStreamValidators(
+            _MaxChars,
+            Writer.Config.STREAM_REPEAT_NGRAM,
+            Writer.Config.STREAM_REPEAT_MAX,
+            Writer.Config.STREAM_REPEAT_WINDOW,
+            Writer.Config.STREAM_REFUSAL_PATTERNS,
+            _RequiredAttribs,
+        )
+
+    def CheckStreamValidators(self, _Validators: list, _Chunk: str, _TotalChars: int, _PartialText: str = ""):
+        for Validator in _Validators:
+            Problem = Validator.Feed(_Chunk, _TotalChars)
+            if Problem is not None:
+                raise StreamValidationError(Validator.Name, Problem, _PartialText)
+
+    async def StreamResponse(self, _Stream, _Provider: str, _StartTime: float = None, _Validators: list = []):
+        """
+        Streams the response to the output sink, returning the assistant message and the usage
+        counters the server attached to its final chunk (plus the time to first token).
+        If one of `_Validators` fires, the stream is closed and StreamValidationError raised. Once one
+        reports it's Complete (e.g. the JSON object closed), any further text is ignored, but the stream is
+        read to its end for the usage counters that follow, unless more than STREAM_TRAILING_CHARS of text
+        come after it (a model rambling on past the JSON), in which case it's closed there.
+        """
+        Output = self.OutputSink.Open(self.GetCurrentCallStack())
+        Chunks: list = []
+        TotalChars: int = 0
+        TrailingChars: int = 0
+        Complete: bool = False
+        Usage: dict = {}
+        async for chunk in _Stream:
             if _Provider == "ollama":
                 ChunkText = chunk["message"]["content"]
+                for Key in (
+                    "load_duration",
+                    "prompt_eval_count",
+                    "prompt_eval_duration",
+                    "eval_count",
+                    "eval_duration",
+                    "total_duration",
+                ):
+                    if Key in chunk and chunk[Key] is not None:
+                        Usage[Key] = chunk[Key]
+            elif _Provider in ("openrouter", "openai", "mock"):
+                Choices = chunk.get("choices") or []
+                Delta = (Choices[0].get("delta") or Choices[0].get("message") or {}) if len(Choices) > 0 else {}
+                ChunkText = Delta.get("content") or ""
+                # Token counts arrive on the last chunk
+                if chunk.get("usage"):
+                    Usage["prompt_eval_count"] = chunk["usage"].get("prompt_tokens", 0)
+                    Usage["eval_count"] = chunk["usage"].get("completion_tokens", 0)
             elif _Provider == "google":
                 ChunkText = chunk.text
+                Metadata = getattr(chunk, "usage_metadata", None)
+                if Metadata is not None:
+                    Usage["prompt_eval_count"] = getattr(Metadata, "prompt_token_count", 0)
+                    Usage["eval_count"] = getattr(Metadata, "candidates_token_count", 0)
             else:
                 raise ValueError(f"Unsupported provider: {_Provider}")
 
-            Response += ChunkText
-            print(ChunkText, end="", flush=True)
+            if Complete:
+                TrailingChars += len(ChunkText)
+                if TrailingChars > Writer.Config.STREAM_TRAILING_CHARS:
+                    await self.CloseStream(_Stream)
+                    break
+                continue
 
-        print("\n\n\n" if Writer.Config.DEBUG else "")
-        return {"role": "assistant", "content": Response}
+            if _StartTime is not None and ChunkText != "" and "TimeToFirstToken" not in Usage:
+                Usage["TimeToFirstToken"] = time.time() - _StartTime
+
+            Chunks.append(ChunkText)
+            TotalChars += len(ChunkText)
+            Output.Write(ChunkText)
+
+            try:
+                self.CheckStreamValidators(_Validators, ChunkText, TotalChars)
+            except StreamValidationError as e:
+                # Closing the stream drops the connection, which makes the server stop generating
+                Output.End()
+                await self.CloseStream(_Stream)
+                e.PartialText = "".join(Chunks)
+                raise
+
+            Complete = any(Validator.Complete for Validator in _Validators)
+
+        Output.End()
+        Response: str = "".join(Chunks)
+        for Validator in _Validators:
+            Response = Validator.Finish(Response)
+        return {"role": "assistant", "content": Response}, Usage
+
+    async def CloseStream(self, _Stream):
+        if hasattr(_Stream, "aclose"):
+            await _Stream.aclose()
 
     def BuildUserQuery(self, _Query: str):
         return {"role": "user", "content": _Query}
@@ -434,6 +1135,10 @@ class Interface:
     def GetLastMessageText(self, _Messages: list):
         return _Messages[-1]["content"]
 
+    def GetRewriteMaxChars(self, _Text: str):
+        # Cap for tasks that rewrite `_Text` (scrubbing, translating, editing), which shouldn't come out much longer than it
+        return int(len(_Text) * Writer.Config.STREAM_REWRITE_RATIO) + Writer.Config.STREAM_REWRITE_SLACK
+
     def GetModelAndProvider(self, _Model: str):
         # Format is `Provider://Model@Host?param1=value2&param2=value2`
         # default to ollama if no provider is specified
@@ -450,6 +1155,13 @@ class Interface:
                 Model = f"{parsed.netloc}{parsed.path}"
                 Host = None
 
+            elif Provider == "openai":
+                # Served models are often named like Hugging Face repos, e.g. `openai://Qwen/Qwen2.5-7B-Instruct@host:8000`
+                Model = f"{parsed.netloc}{parsed.path}"
+                Host = Writer.Config.OPENAI_HOST
+                if "@" in Model:
+                    Model, Host = Model.rsplit("@", 1)
+
             elif "ollama" in _Model:
                 if "@" in parsed.path:
                     Model = parsed.netloc + parsed.path.split("@")[0]
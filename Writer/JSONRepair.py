@@ -0,0 +1,197 @@
+import Writer.Config
+import Writer.Metrics
+import Writer.Prompts
+import Writer.Schemas
+
+import json
+
+
+# Quote characters that can open a string, and the characters that may close each one
+STRING_CLOSERS = {
+    '"': '"',
+    "'": "'",
+    "“": "”“\"",  # “ ... ”
+    "‘": "’'",  # ‘ ... ’
+}
+LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+
+def FindJSONStart(_Text: str, _Openers: str = "{"):
+    Positions = [_Text.find(Opener) for Opener in _Openers if Opener in _Text]
+    return min(Positions) if len(Positions) > 0 else None
+
+
+def RepairJSON(_Text: str):
+    """
+    Rewrites the JSON value at the start of `_Text` into something json.loads accepts, fixing the usual
+    LLM mistakes: smart or single quotes, Python literals, raw newlines in strings, trailing commas and
+    output that was cut off before its closing brackets. Anything after the value closes is dropped.
+    """
+    Output: list = []
+    Stack: list = []  # Per open container: [Bracket, OutputIndex where the current member starts, State]
+    Quote: str = None
+    Escape: bool = False
+
+    # Object member states: "key" (expecting a key), "keystr" (inside the key), "colon", "value", "done"
+    def StartValue():
+        if len(Stack) > 0 and Stack[-1][0] == "{" and Stack[-1][2] == "value":
+            Stack[-1][2] = "done"
+
+    i: int = 0
+    while i < len(_Text):
+        Character = _Text[i]
+
+        if Quote is not None:
+            if Escape:
+                Escape = False
+                Output.append("'" if Character == "'" else "\\" + Character)
+            elif Character == "\\":
+                Escape = True
+            elif Character in STRING_CLOSERS[Quote] and IsClosingQuote(_Text, i):
+                Quote = None
+                Output.append('"')
+                if len(Stack) > 0 and Stack[-1][0] == "{" and Stack[-1][2] == "keystr":
+                    Stack[-1][2] = "colon"
+            elif Character == '"':
+                # An unescaped quote that isn't followed by structure is part of the text
+                Output.append('\\"')
+            elif Character == "\n":
+                Output.append("\\n")
+            elif Character == "\r":
+                Output.append("\\r")
+            elif Character == "\t":
+                Output.append("\\t")
+            else:
+                Output.append(Character)
+            i += 1
+            continue
+
+        if Character in STRING_CLOSERS:
+            if len(Stack) > 0 and Stack[-1][0] == "{" and Stack[-1][2] == "key":
+                Stack[-1][2] = "keystr"
+            StartValue()
+            Quote = Character
+            Output.append('"')
+        elif Character in "{[":
+            StartValue()
+            Output.append(Character)
+            Stack.append([Character, len(Output), "key" if Character == "{" else "value"])
+        elif Character in "}]":
+            if len(Stack) == 0:
+                break
+            StripTrailingComma(Output)
+            Output.append("}" if Stack.pop()[0] == "{" else "]")
+            if len(Stack) == 0:
+                break
+        elif Character == ",":
+            if len(Stack) > 0 and Stack[-1][0] == "{":
+                Stack[-1][1] = len(Output)
+                Stack[-1][2] = "key"
+            Output.append(",")
+        elif Character == ":":
+            if len(Stack) > 0 and Stack[-1][0] == "{":
+                Stack[-1][2] = "value"
+            Output.append(":")
+        elif Character.isalpha():
+            End = i
+            while End < len(_Text) and (_Text[End].isalnum() or _Text[End] == "_"):
+                End += 1
+            Word = _Text[i:End]
+            StartValue()
+            Output.append(LITERALS.get(Word, Word))
+            i = End
+            continue
+        else:
+            if not Character.isspace():
+                StartValue()
+            Output.append(Character)
+        i += 1
+
+    # The response was cut off, so close whatever is still open
+    if Quote is not None:
+        if len(Stack) > 0 and Stack[-1][0] == "{" and Stack[-1][2] == "keystr":
+            del Output[Stack[-1][1] :]
+        else:
+            Output.append('"')
+    while len(Stack) > 0:
+        Bracket, MemberStart, State = Stack.pop()
+        if Bracket == "{" and State in ("keystr", "colon", "value"):
+            # Drop the member that never got its value
+            del Output[MemberStart:]
+        StripTrailingComma(Output)
+        Output.append("}" if Bracket == "{" else "]")
+
+    return "".join(Output)
+
+
+def IsClosingQuote(_Text: str, _Index: int):
+    # A quote only ends the string if the JSON structure carries on after it
+    Rest = _Text[_Index + 1 :].lstrip()
+    return Rest == "" or Rest[0] in ",:}]"
+
+
+def StripTrailingComma(_Output: list):
+    while len(_Output) > 0 and _Output[-1].isspace():
+        _Output.pop()
+    if len(_Output) > 0 and _Output[-1] == ",":
+        _Output.pop()
+
+
+def ParseJSON(_Text: str, _Openers: str = "{"):
+    """
+    Pulls the first JSON value (starting with one of `_Openers`) out of fenced or chatty output.
+    Returns (Value, WasRepaired), and raises ValueError if even the repaired text won't parse.
+    """
+    Start = FindJSONStart(_Text, _Openers)
+    if Start is None:
+        raise ValueError(f"No JSON found in response (expected it to start with one of {_Openers})")
+
+    try:
+        return json.JSONDecoder().raw_decode(_Text[Start:])[0], False
+    except ValueError as e:
+        Error = e
+
+    try:
+        return json.loads(RepairJSON(_Text[Start:])), True
+    except ValueError:
+        raise Error
+
+
+def ParseResponseJSON(Interface, _Logger, _Messages: list, _Model: str, _Stage: str, _Default, _Extract=None, _Format: str = "json"):
+    """
+    Parses the JSON the model wrote as the last message of `_Messages`, repairing it locally where possible.
+    The model is only asked to fix it when local repair fails, at most JSON_MAX_ATTEMPTS - 1 times, after
+    which `_Default` is returned. `_Extract` picks the wanted fields out of the JSON (raising if they're missing).
+    When `_Format` is a schema from Writer.Schemas, the JSON is validated against it too.
+    """
+    Schema = Writer.Schemas.GetSchema(_Format)
+    Openers: str = "[" if Schema is not None and Schema.get("type") == "array" else "{"
+
+    Iters: int = 0
+    while True:
+
+        try:
+            Iters += 1
+            Value, Repaired = ParseJSON(Interface.GetLastMessageText(_Messages), Openers)
+            if Schema is not None:
+                Writer.Schemas.Validate(Value, Schema)
+            Result = _Extract(Value) if _Extract is not None else Value
+            Writer.Metrics.RecordJSONRepair(_Stage, _Model, "repaired" if Repaired else "clean")
+            if Repaired:
+                _Logger.Log("Repaired Malformed JSON Written By LLM Locally", 6)
+            return Result
+        except Exception as E:
+            Writer.Metrics.RecordJSONRepair(_Stage, _Model, "failed")
+            GaveUp: bool = Iters >= Writer.Config.JSON_MAX_ATTEMPTS
+            Writer.Metrics.RecordJSONParseFailure(_Stage, _Model, GaveUp)
+            if GaveUp:
+                _Logger.Log("Critical Error Parsing JSON", 7)
+                return _Default
+            _Logger.Log("Error Parsing JSON Written By LLM, Asking For Edits", 7)
+            EditPrompt: str = Writer.Prompts.JSON_PARSE_ERROR.format(_Error=E)
+            _Messages.append(Interface.BuildUserQuery(EditPrompt))
+            _Logger.Log("Asking LLM TO Revise", 7)
+            _Messages = Interface.SafeGenerateText(
+                _Logger, _Messages, _Model, _Format=_Format, _MaxChars=Writer.Config.STREAM_MAX_CHARS_CHECK
+            )
+            _Logger.Log("Done Asking LLM TO Revise JSON", 6)
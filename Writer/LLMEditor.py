@@ -1,7 +1,7 @@
 import Writer.PrintUtils
 import Writer.Prompts
-
-import json
+import Writer.JSONRepair
+import Writer.Schemas
 
 
 def GetFeedbackOnOutline(Interface, _Logger, _Outline: str):
@@ -15,7 +15,7 @@ def GetFeedbackOnOutline(Interface, _Logger, _Outline: str):
     _Logger.Log("Prompting LLM To Critique Outline", 5)
     History.append(Interface.BuildUserQuery(StartingPrompt))
     History = Interface.SafeGenerateText(
-        _Logger, History, Writer.Config.REVISION_MODEL, _MinWordCount=70
+        _Logger, History, Writer.Config.REVISION_MODEL, _MinWordCount=70, _MaxChars=Writer.Config.STREAM_MAX_CHARS_CHECK
     )
     _Logger.Log("Finished Getting Outline Feedback", 5)
 
@@ -40,34 +40,22 @@ def GetOutlineRating(
 
     History.append(Interface.BuildUserQuery(StartingPrompt))
     History = Interface.SafeGenerateText(
-        _Logger, History, Writer.Config.EVAL_MODEL, _Format="json"
+        _Logger, History, Writer.Config.EVAL_MODEL, _Format=Writer.Schemas.IS_COMPLETE, _MaxChars=Writer.Config.STREAM_MAX_CHARS_CHECK
     )
     _Logger.Log("Finished Getting Review JSON", 5)
 
-    Iters: int = 0
-    while True:
-
-        RawResponse = Interface.GetLastMessageText(History)
-        RawResponse = RawResponse.replace("`", "")
-        RawResponse = RawResponse.replace("json", "")
-
-        try:
-            Iters += 1
-            Rating = json.loads(RawResponse)["IsComplete"]
-            _Logger.Log(f"Editor Determined IsComplete: {Rating}", 5)
-            return Rating
-        except Exception as E:
-            if Iters > 4:
-                _Logger.Log("Critical Error Parsing JSON", 7)
-                return False
-            _Logger.Log("Error Parsing JSON Written By LLM, Asking For Edits", 7)
-            EditPrompt: str = Writer.Prompts.JSON_PARSE_ERROR.format(_Error=E)
-            History.append(Interface.BuildUserQuery(EditPrompt))
-            _Logger.Log("Asking LLM TO Revise", 7)
-            History = Interface.SafeGenerateText(
-                _Logger, History, Writer.Config.EVAL_MODEL, _Format="json"
-            )
-            _Logger.Log("Done Asking LLM TO Revise JSON", 6)
+    Rating = Writer.JSONRepair.ParseResponseJSON(
+        Interface,
+        _Logger,
+        History,
+        Writer.Config.EVAL_MODEL,
+        "GetOutlineRating",
+        False,
+        lambda JSON: JSON["IsComplete"],
+        _Format=Writer.Schemas.IS_COMPLETE,
+    )
+    _Logger.Log(f"Editor Determined IsComplete: {Rating}", 5)
+    return Rating
 
 
 def GetFeedbackOnChapter(Interface, _Logger, _Chapter: str, _Outline: str):
@@ -88,7 +76,7 @@ def GetFeedbackOnChapter(Interface, _Logger, _Chapter: str, _Outline: str):
     _Logger.Log("Prompting LLM To Critique Chapter", 5)
     History.append(Interface.BuildUserQuery(StartingPrompt))
     Messages = Interface.SafeGenerateText(
-        _Logger, History, Writer.Config.REVISION_MODEL
+        _Logger, History, Writer.Config.REVISION_MODEL, _MaxChars=Writer.Config.STREAM_MAX_CHARS_CHECK
     )
     _Logger.Log("Finished Getting Chapter Feedback", 5)
 
@@ -109,32 +97,19 @@ def GetChapterRating(Interface, _Logger, _Chapter: str):
     _Logger.Log("Prompting LLM To Get Review JSON", 5)
     History.append(Interface.BuildUserQuery(StartingPrompt))
     History = Interface.SafeGenerateText(
-        _Logger, History, Writer.Config.EVAL_MODEL
+        _Logger, History, Writer.Config.EVAL_MODEL, _Format=Writer.Schemas.IS_COMPLETE, _MaxChars=Writer.Config.STREAM_MAX_CHARS_CHECK
     )
     _Logger.Log("Finished Getting Review JSON", 5)
 
-    Iters: int = 0
-    while True:
-
-        RawResponse = Interface.GetLastMessageText(History)
-        RawResponse = RawResponse.replace("`", "")
-        RawResponse = RawResponse.replace("json", "")
-
-        try:
-            Iters += 1
-            Rating = json.loads(RawResponse)["IsComplete"]
-            _Logger.Log(f"Editor Determined IsComplete: {Rating}", 5)
-            return Rating
-        except Exception as E:
-            if Iters > 4:
-                _Logger.Log("Critical Error Parsing JSON", 7)
-                return False
-
-            _Logger.Log("Error Parsing JSON Written By LLM, Asking For Edits", 7)
-            EditPrompt: str = Writer.Prompts.JSON_PARSE_ERROR.format(_Error=E)
-            History.append(Interface.BuildUserQuery(EditPrompt))
-            _Logger.Log("Asking LLM TO Revise", 7)
-            History = Interface.SafeGenerateText(
-                _Logger, History, Writer.Config.EVAL_MODEL
-            )
-            _Logger.Log("Done Asking LLM TO Revise JSON", 6)
+    Rating = Writer.JSONRepair.ParseResponseJSON(
+        Interface,
+        _Logger,
+        History,
+        Writer.Config.EVAL_MODEL,
+        "GetChapterRating",
+        False,
+        lambda JSON: JSON["IsComplete"],
+        _Format=Writer.Schemas.IS_COMPLETE,
+    )
+    _Logger.Log(f"Editor Determined IsComplete: {Rating}", 5)
+    return Rating
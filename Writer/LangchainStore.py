@@ -0,0 +1,128 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+class LangchainStore:
+    """
+    Content-addressed, append-only store for the message histories sent to the LLMs.
+
+    Revision loops resend the same history with one or two new messages each time, so instead of
+    dumping the whole chain per call, each distinct message is written once to `Messages.jsonl.gz`
+    and each call appends one line to `Calls.jsonl.gz` listing the hashes of its messages. When an
+    earlier call's history is a prefix of this one, the line just names that call as its `Parent`
+    and lists the hashes that follow it, so the index grows linearly too.
+    Every save appends a new gzip member, so a crash never corrupts what was already written.
+    """
+
+    MESSAGES_FILE = "Messages.jsonl.gz"
+    CALLS_FILE = "Calls.jsonl.gz"
+
+    def __init__(self, _Directory: str):
+        self.Directory = _Directory
+        os.makedirs(self.Directory, exist_ok=True)
+        self.MessagesPath = os.path.join(self.Directory, self.MESSAGES_FILE)
+        self.CallsPath = os.path.join(self.Directory, self.CALLS_FILE)
+
+        self.KnownHashes: set = set()
+        self.ChainIDs: dict = {}  # Digest of a call's full hash list -> that call's ID
+        self.NextID: int = 0
+        self.Lock = threading.Lock()
+
+    def GetMessageHash(self, _Message: dict):
+        Payload = json.dumps([_Message["role"], _Message["content"]], ensure_ascii=False)
+        return hashlib.sha256(Payload.encode("utf-8")).hexdigest()[:24]
+
+    def Save(self, _Name: str, _Messages: list):
+        """
+        Records one call's message history, returning the ID it was saved under.
+        """
+        with self.Lock:
+            Hashes: list = []
+            NewLines: list = []
+            for Message in _Messages:
+                Hash = self.GetMessageHash(Message)
+                Hashes.append(Hash)
+                if Hash not in self.KnownHashes:
+                    self.KnownHashes.add(Hash)
+                    NewLines.append(
+                        json.dumps(
+                            {"Hash": Hash, "Role": Message["role"], "Content": Message["content"]},
+                            ensure_ascii=False,
+                        )
+                    )
+
+            # Find the longest earlier history this one extends
+            Parent = None
+            ParentLength = 0
+            Digest = hashlib.sha256()
+            for i, Hash in enumerate(Hashes):
+                Digest.update(Hash.encode("ascii"))
+                PrefixDigest = Digest.hexdigest()
+                if PrefixDigest in self.ChainIDs:
+                    Parent = self.ChainIDs[PrefixDigest]
+                    ParentLength = i + 1
+
+            ID = self.NextID
+            self.NextID += 1
+            if len(Hashes) > 0:
+                self.ChainIDs[Digest.hexdigest()] = ID
+
+            Record = {"ID": ID, "Name": _Name, "Time": time.time(), "Messages": Hashes[ParentLength:]}
+            if Parent is not None:
+                Record["Parent"] = Parent
+
+            if len(NewLines) > 0:
+                with gzip.open(self.MessagesPath, "at", encoding="utf-8") as f:
+                    f.write("\n".join(NewLines) + "\n")
+            with gzip.open(self.CallsPath, "at", encoding="utf-8") as f:
+                f.write(json.dumps(Record) + "\n")
+            return ID
+
+
+def ReadJSONLines(_Path: str):
+    Items: list = []
+    if not os.path.exists(_Path):
+        return Items
+    try:
+        with gzip.open(_Path, "rt", encoding="utf-8") as f:
+            for Line in f:
+                if Line.strip() != "":
+                    Items.append(json.loads(Line))
+    except EOFError:
+        # The run was killed mid-write, keep everything up to the truncated member
+        pass
+    return Items
+
+
+def LoadLangchains(_Directory: str):
+    """
+    Reads a store back, returning the list of calls with their messages resolved.
+    """
+    Messages = {
+        Item["Hash"]: {"role": Item["Role"], "content": Item["Content"]}
+        for Item in ReadJSONLines(os.path.join(_Directory, LangchainStore.MESSAGES_FILE))
+    }
+    Calls = ReadJSONLines(os.path.join(_Directory, LangchainStore.CALLS_FILE))
+    CallsByID: dict = {}
+    for Call in Calls:
+        Call["Messages"] = [Messages[Hash] for Hash in Call["Messages"]]
+        if "Parent" in Call:
+            Call["Messages"] = CallsByID[Call.pop("Parent")]["Messages"] + Call["Messages"]
+        CallsByID[Call["ID"]] = Call
+    return Calls
+
+
+def GetLangchainTitle(_Call: dict):
+    return f"{_Call['ID']}_{_Call['Name']}"
+
+
+def RenderMarkdown(_Call: dict):
+    MarkdownVersion: str = f"# Debug LangChain {GetLangchainTitle(_Call)}\n**Note: '```' tags have been removed in this version.**\n"
+    for Message in _Call["Messages"]:
+        MarkdownVersion += f"\n\n\n# Role: {Message['role']}\n"
+        MarkdownVersion += f"```{Message['content'].replace('```', '')}```"
+    return MarkdownVersion
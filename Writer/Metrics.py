@@ -0,0 +1,175 @@
+import json
+import os
+import threading
+
+
+# Process-wide registry of counters and histograms for LLM calls and pipeline stages.
+# Everything is kept in memory and exported once at the end of a run, as a Prometheus textfile and as JSON.
+
+LATENCY_BUCKETS = [0.1, 0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600, 1800]
+TTFT_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60, 120]
+
+DESCRIPTIONS = {
+    "llm_calls_total": "LLM calls made (including cache hits)",
+    "llm_cache_hits_total": "LLM calls answered from the response cache",
+    "llm_retries_total": "LLM calls repeated because the previous response was unusable",
+    "llm_transport_retries_total": "LLM requests re-sent after a transport failure (connection error, 429, 5xx)",
+    "llm_backoff_seconds_total": "Time spent backing off between transport retries",
+    "llm_escalations_total": "Tasks handed to a fallback model after the original spent its retry budget",
+    "ollama_model_loads_total": "Requests started on an Ollama host that didn't have the model loaded",
+    "ollama_reloads_avoided_total": "Requests for a loaded model scheduled ahead of waiting requests for unloaded ones",
+    "llm_empty_responses_total": "LLM responses that were empty or whitespace",
+    "llm_short_responses_total": "LLM responses rejected for being under the minimum word count",
+    "llm_stream_aborts_total": "LLM responses abandoned mid-stream by a validator",
+    "llm_json_parse_failures_total": "LLM responses that could not be parsed as the expected JSON",
+    "llm_json_repairs_total": "JSON responses by local parse outcome (clean, repaired, failed)",
+    "llm_call_latency_seconds": "Wall time of each LLM call",
+    "llm_time_to_first_token_seconds": "Time until the first streamed token of each LLM call",
+    "llm_prompt_tokens_total": "Prompt tokens processed",
+    "llm_prompt_bytes_total": "Bytes of prompt text sent, counting the whole message history of every call",
+    "llm_completion_tokens_total": "Completion tokens generated",
+    "llm_load_seconds_total": "Time the server spent loading models",
+}
+
+Lock = threading.Lock()
+Counters: dict = {}  # Name -> {LabelTuple: Value}
+Histograms: dict = {}  # Name -> {LabelTuple: {"Buckets": [...], "Counts": [...], "Sum": float, "Count": int}}
+
+
+def GetLabelKey(_Labels: dict):
+    return tuple(sorted((str(Key), str(Value)) for Key, Value in _Labels.items()))
+
+
+def GetModelLabels(_Model: str):
+    """
+    Splits a `Provider://Model@Host?params` model string into provider/model/host labels.
+    """
+    Provider, Model = ("ollama", _Model) if "://" not in _Model else _Model.split("://", 1)
+    Model = Model.split("?")[0]
+    Host = ""
+    if "@" in Model:
+        Model, Host = Model.split("@", 1)
+    return {"provider": Provider, "model": Model, "host": Host}
+
+
+def Increment(_Name: str, _Labels: dict = {}, _Value: float = 1):
+    Key = GetLabelKey(_Labels)
+    with Lock:
+        Series = Counters.setdefault(_Name, {})
+        Series[Key] = Series.get(Key, 0) + _Value
+
+
+def Observe(_Name: str, _Labels: dict, _Value: float, _Buckets: list = LATENCY_BUCKETS):
+    Key = GetLabelKey(_Labels)
+    with Lock:
+        Series = Histograms.setdefault(_Name, {})
+        if Key not in Series:
+            Series[Key] = {
+                "Buckets": list(_Buckets),
+                "Counts": [0] * len(_Buckets),
+                "Sum": 0.0,
+                "Count": 0,
+            }
+        Histogram = Series[Key]
+        for i, Bound in enumerate(Histogram["Buckets"]):
+            if _Value <= Bound:
+                Histogram["Counts"][i] += 1
+        Histogram["Sum"] += _Value
+        Histogram["Count"] += 1
+
+
+def RecordJSONParseFailure(_Stage: str, _Model: str, _GaveUp: bool = False):
+    """
+    Counts a response that failed to parse in one of the pipeline's JSON re-ask loops.
+    """
+    Labels = GetModelLabels(_Model)
+    Labels["stage"] = _Stage
+    Increment("llm_json_parse_failures_total", Labels)
+    if not _GaveUp:
+        Increment("llm_retries_total", {**Labels, "reason": "json_reask"})
+
+
+def RecordJSONRepair(_Stage: str, _Model: str, _Outcome: str):
+    """
+    Counts how a JSON response fared with the local parser: "clean", "repaired" or "failed" (so the model is re-asked).
+    """
+    Labels = GetModelLabels(_Model)
+    Labels["stage"] = _Stage
+    Labels["outcome"] = _Outcome
+    Increment("llm_json_repairs_total", Labels)
+
+
+def Reset():
+    with Lock:
+        Counters.clear()
+        Histograms.clear()
+
+
+def FormatLabels(_Key: tuple, _Extra: dict = {}):
+    Pairs = list(_Key) + [(Name, str(Value)) for Name, Value in _Extra.items()]
+    if len(Pairs) == 0:
+        return ""
+    Escaped = []
+    for Name, Value in Pairs:
+        Value = Value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        Escaped.append(f'{Name}="{Value}"')
+    return "{" + ",".join(Escaped) + "}"
+
+
+def GetPrometheusText():
+    Lines: list = []
+    with Lock:
+        for Name in sorted(Counters):
+            Lines.append(f"# HELP {Name} {DESCRIPTIONS.get(Name, Name)}")
+            Lines.append(f"# TYPE {Name} counter")
+            for Key, Value in sorted(Counters[Name].items()):
+                Lines.append(f"{Name}{FormatLabels(Key)} {Value}")
+
+        for Name in sorted(Histograms):
+            Lines.append(f"# HELP {Name} {DESCRIPTIONS.get(Name, Name)}")
+            Lines.append(f"# TYPE {Name} histogram")
+            for Key, Histogram in sorted(Histograms[Name].items()):
+                for Bound, Count in zip(Histogram["Buckets"], Histogram["Counts"]):
+                    Lines.append(f"{Name}_bucket{FormatLabels(Key, {'le': Bound})} {Count}")
+                Lines.append(f"{Name}_bucket{FormatLabels(Key, {'le': '+Inf'})} {Histogram['Count']}")
+                Lines.append(f"{Name}_sum{FormatLabels(Key)} {Histogram['Sum']}")
+                Lines.append(f"{Name}_count{FormatLabels(Key)} {Histogram['Count']}")
+    return "\n".join(Lines) + "\n"
+
+
+def GetSummary():
+    """
+    Returns the metrics as plain JSON-friendly data, with histograms reduced to count/sum/mean.
+    """
+    Summary: dict = {"Counters": {}, "Histograms": {}}
+    with Lock:
+        for Name, Series in Counters.items():
+            Summary["Counters"][Name] = [
+                {"Labels": dict(Key), "Value": Value} for Key, Value in sorted(Series.items())
+            ]
+        for Name, Series in Histograms.items():
+            Summary["Histograms"][Name] = [
+                {
+                    "Labels": dict(Key),
+                    "Count": Histogram["Count"],
+                    "Sum": Histogram["Sum"],
+                    "Mean": Histogram["Sum"] / Histogram["Count"] if Histogram["Count"] > 0 else 0,
+                }
+                for Key, Histogram in sorted(Series.items())
+            ]
+    return Summary
+
+
+def WritePrometheusTextfile(_Path: str):
+    # Written to a temp file and renamed, as node_exporter may read the textfile at any moment
+    Directory = os.path.dirname(_Path)
+    if Directory != "":
+        os.makedirs(Directory, exist_ok=True)
+    with open(_Path + ".tmp", "w") as f:
+        f.write(GetPrometheusText())
+    os.replace(_Path + ".tmp", _Path)
+
+
+def WriteJSONSummary(_Path: str):
+    with open(_Path, "w") as f:
+        json.dump(GetSummary(), f, indent=4)
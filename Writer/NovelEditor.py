@@ -1,35 +1,52 @@
+import Writer.Checkpoint
 import Writer.PrintUtils
 import Writer.Config
 import Writer.Prompts
+import Writer.Statistics
 
 
-def EditNovel(Interface, _Logger, _Chapters: list, _Outline: str, _TotalChapters: int):
+def EditChapter(Interface, _Logger, _Chapters: list, _Outline: str, _ChapterNum: int, _Checkpoint=Writer.Checkpoint.DISABLED):
+    """
+    Edits chapter `_ChapterNum` in place, given the novel as it stands so far (`_Chapters`, with the
+    chapters before it already edited).
+    """
+
+    Name: str = f"Edited/Chapter_{_ChapterNum:03}"
+    SavedChapter: str = _Checkpoint.Load(Name)
+    if SavedChapter is not None:
+        return SavedChapter
+
+    NovelText: str = ""
+    for Chapter in _Chapters:
+        NovelText += Chapter
+
+    Prompt: str = Writer.Prompts.CHAPTER_EDIT_PROMPT.format(
+        _Outline=_Outline, NovelText=NovelText, i=_ChapterNum
+    )
+
+    _Logger.Log(
+        f"Prompting LLM To Perform Chapter {_ChapterNum} Second Pass In-Place Edit", 5
+    )
+    Messages = []
+    Messages.append(Interface.BuildUserQuery(Prompt))
+    Messages = Interface.SafeGenerateText(
+        _Logger, Messages, Writer.Config.CHAPTER_REVISION_WRITER_MODEL, _MaxChars=Interface.GetRewriteMaxChars(_Chapters[_ChapterNum - 1])
+    )
+    _Logger.Log(f"Finished Chapter {_ChapterNum} Second Pass In-Place Edit", 5)
+
+    NewChapter = Interface.GetLastMessageText(Messages)
+    _Checkpoint.Save(Name, NewChapter)
+    ChapterWordCount = Writer.Statistics.GetWordCount(NewChapter)
+    _Logger.Log(f"New Chapter Word Count: {ChapterWordCount}", 3)
+
+    return NewChapter
+
+
+def EditNovel(Interface, _Logger, _Chapters: list, _Outline: str, _TotalChapters: int, _Checkpoint=Writer.Checkpoint.DISABLED):
 
     EditedChapters = _Chapters
 
     for i in range(1, _TotalChapters + 1):
-
-        NovelText: str = ""
-        for Chapter in EditedChapters:
-            NovelText += Chapter
-
-        Prompt: str = Writer.Prompts.CHAPTER_EDIT_PROMPT.format(
-            _Chapter=EditedChapters[i], NovelText=NovelText, i=i
-        )
-
-        _Logger.Log(
-            f"Prompting LLM To Perform Chapter {i} Second Pass In-Place Edit", 5
-        )
-        Messages = []
-        Messages.append(Interface.BuildUserQuery(Prompt))
-        Messages = Interface.SafeGenerateText(
-            _Logger, Messages, Writer.Config.CHAPTER_WRITER_MODEL
-        )
-        _Logger.Log(f"Finished Chapter {i} Second Pass In-Place Edit", 5)
-
-        NewChapter = Interface.GetLastMessageText(Messages)
-        EditedChapters[i] = NewChapter
-        ChapterWordCount = Writer.Statistics.GetWordCount(NewChapter)
-        _Logger.Log(f"New Chapter Word Count: {ChapterWordCount}", 3)
+        EditedChapters[i - 1] = EditChapter(Interface, _Logger, EditedChapters, _Outline, i, _Checkpoint)
 
     return EditedChapters
@@ -1,54 +1,63 @@
+import Writer.Checkpoint
 import Writer.LLMEditor
 import Writer.PrintUtils
 import Writer.Config
 import Writer.Outline.StoryElements
 import Writer.Prompts
+import Writer.Schemas
 
 
 # We should probably do outline generation in stages, allowing us to go back and add foreshadowing, etc back to previous segments
 
 
-def GenerateOutline(Interface, _Logger, _OutlinePrompt, _QualityThreshold: int = 85):
+def GenerateOutline(Interface, _Logger, _OutlinePrompt, _QualityThreshold: int = 85, _Checkpoint=Writer.Checkpoint.DISABLED):
 
     # Get any important info about the base prompt to pass along
-    Prompt: str = Writer.Prompts.GET_IMPORTANT_BASE_PROMPT_INFO.format(
-        _Prompt = _OutlinePrompt
-    )
-
-
-    _Logger.Log(f"Extracting Important Base Context", 4)
-    Messages = [Interface.BuildUserQuery(Prompt)]
-    Messages = Interface.SafeGenerateText(
-        _Logger, Messages, Writer.Config.INITIAL_OUTLINE_WRITER_MODEL
-    )
-    BaseContext: str = Interface.GetLastMessageText(Messages)
-    _Logger.Log(f"Done Extracting Important Base Context", 4)
+    BaseContext: str = _Checkpoint.Load("BaseContext")
+    if BaseContext is None:
+        Prompt: str = Writer.Prompts.GET_IMPORTANT_BASE_PROMPT_INFO.format(
+            _Prompt = _OutlinePrompt
+        )
+
+        _Logger.Log(f"Extracting Important Base Context", 4)
+        Messages = [Interface.BuildUserQuery(Prompt)]
+        Messages = Interface.SafeGenerateText(
+            _Logger, Messages, Writer.Config.INITIAL_OUTLINE_WRITER_MODEL, _MaxChars=Writer.Config.STREAM_MAX_CHARS_CHECK
+        )
+        BaseContext = Interface.GetLastMessageText(Messages)
+        _Checkpoint.Save("BaseContext", BaseContext)
+        _Logger.Log(f"Done Extracting Important Base Context", 4)
 
 
     # Generate Story Elements
-    StoryElements: str = Writer.Outline.StoryElements.GenerateStoryElements(
-        Interface, _Logger, _OutlinePrompt
-    )
-
-
-    # Now, Generate Initial Outline
-    Prompt: str = Writer.Prompts.INITIAL_OUTLINE_PROMPT.format(
-        StoryElements=StoryElements, _OutlinePrompt=_OutlinePrompt
-    )
-
-
-    _Logger.Log(f"Generating Initial Outline", 4)
-    Messages = [Interface.BuildUserQuery(Prompt)]
-    Messages = Interface.SafeGenerateText(
-        _Logger, Messages, Writer.Config.INITIAL_OUTLINE_WRITER_MODEL, _MinWordCount=250
-    )
-    Outline: str = Interface.GetLastMessageText(Messages)
-    _Logger.Log(f"Done Generating Initial Outline", 4)
+    StoryElements: str = _Checkpoint.Load("StoryElements")
+    if StoryElements is None:
+        StoryElements = Writer.Outline.StoryElements.GenerateStoryElements(
+            Interface, _Logger, _OutlinePrompt
+        )
+        _Checkpoint.Save("StoryElements", StoryElements)
+
+
+    # Now, Generate Initial Outline (or pick up the revision loop where a previous run left it)
+    State: dict = _Checkpoint.Load("OutlineRevision")
+    if State is None:
+        Prompt: str = Writer.Prompts.INITIAL_OUTLINE_PROMPT.format(
+            StoryElements=StoryElements, _OutlinePrompt=_OutlinePrompt
+        )
+
+        _Logger.Log(f"Generating Initial Outline", 4)
+        Messages = [Interface.BuildUserQuery(Prompt)]
+        Messages = Interface.SafeGenerateText(
+            _Logger, Messages, Writer.Config.INITIAL_OUTLINE_WRITER_MODEL, _MinWordCount=250, _MaxChars=Writer.Config.STREAM_MAX_CHARS_OUTLINE
+        )
+        State = {"Outline": Interface.GetLastMessageText(Messages), "Iterations": 0}
+        _Checkpoint.Save("OutlineRevision", State)
+        _Logger.Log(f"Done Generating Initial Outline", 4)
+    Outline: str = State["Outline"]
 
     _Logger.Log(f"Entering Feedback/Revision Loop", 3)
-    WritingHistory = Messages
     Rating: int = 0
-    Iterations: int = 0
+    Iterations: int = State["Iterations"]
     while True:
         Iterations += 1
         Feedback = Writer.LLMEditor.GetFeedbackOnOutline(Interface, _Logger, Outline)
@@ -61,7 +70,8 @@ def GenerateOutline(Interface, _Logger, _OutlinePrompt, _QualityThreshold: int =
         if (Iterations > Writer.Config.OUTLINE_MIN_REVISIONS) and (Rating == True):
             break
 
-        Outline = ReviseOutline(Interface, _Logger, Outline, Feedback)
+        Outline, _ = ReviseOutline(Interface, _Logger, Outline, Feedback, [])
+        _Checkpoint.Save("OutlineRevision", {"Outline": Outline, "Iterations": Iterations})
 
     _Logger.Log(f"Quality Standard Met, Exiting Feedback/Revision Loop", 4)
 
@@ -87,7 +97,7 @@ def ReviseOutline(Interface, _Logger, _Outline, _Feedback, _History: list = []):
     Messages = _History
     Messages.append(Interface.BuildUserQuery(RevisionPrompt))
     Messages = Interface.SafeGenerateText(
-        _Logger, Messages, Writer.Config.INITIAL_OUTLINE_WRITER_MODEL, _MinWordCount=250
+        _Logger, Messages, Writer.Config.INITIAL_OUTLINE_WRITER_MODEL, _MinWordCount=250, _MaxChars=Writer.Config.STREAM_MAX_CHARS_OUTLINE
     )
     SummaryText: str = Interface.GetLastMessageText(Messages)
     _Logger.Log(f"Done Revising Outline", 2)
@@ -105,9 +115,74 @@ def GeneratePerChapterOutline(Interface, _Logger, _Chapter, _Outline:str, _Histo
     Messages = _History
     Messages.append(Interface.BuildUserQuery(RevisionPrompt))
     Messages = Interface.SafeGenerateText(
-        _Logger, Messages, Writer.Config.CHAPTER_OUTLINE_WRITER_MODEL, _MinWordCount=50
+        _Logger, Messages, Writer.Config.CHAPTER_OUTLINE_WRITER_MODEL, _MinWordCount=50, _MaxChars=Writer.Config.STREAM_MAX_CHARS_OUTLINE
     )
     SummaryText: str = Interface.GetLastMessageText(Messages)
     _Logger.Log("Done Generating Outline For Chapter " + str(_Chapter), 5)
 
     return SummaryText, Messages
+
+
+def GenerateChapterSynopses(Interface, _Logger, _Outline: str, _TotalChapters: int):
+    """
+    Returns a one or two sentence synopsis of each chapter in the outline, used to give independently
+    generated chapter outlines a compact view of the chapters around them.
+    """
+
+    Prompt: str = Writer.Prompts.CHAPTER_SYNOPSES_PROMPT.format(
+        _Outline=_Outline, _TotalChapters=_TotalChapters
+    )
+    _Logger.Log("Summarizing Outline Chapter By Chapter", 5)
+    Messages = [Interface.BuildUserQuery(Prompt)]
+    _, Response = Interface.SafeGenerateJSON(
+        _Logger, Messages, Writer.Config.CHAPTER_OUTLINE_WRITER_MODEL, _Schema=Writer.Schemas.CHAPTER_SYNOPSES,
+        _MaxChars=Writer.Config.STREAM_MAX_CHARS_OUTLINE,
+    )
+
+    # The model doesn't always give exactly one per chapter, missing ones are left blank
+    Synopses: list = [str(Synopsis) for Synopsis in Response["Synopses"]][:_TotalChapters]
+    if len(Synopses) != _TotalChapters:
+        _Logger.Log(f"Got {len(Synopses)} Chapter Synopses For {_TotalChapters} Chapter(s)", 6)
+    Synopses += [""] * (_TotalChapters - len(Synopses))
+    _Logger.Log("Done Summarizing Outline Chapter By Chapter", 5)
+
+    return Synopses
+
+
+def GetNeighbouringSynopsis(_Synopses: list, _Chapter: int, _Window: int):
+
+    Lines: list = []
+    for i in range(max(_Chapter - _Window, 1), min(_Chapter + _Window, len(_Synopses)) + 1):
+        if _Synopses[i - 1] == "":
+            continue
+        Marker: str = " (this chapter)" if i == _Chapter else ""
+        Lines.append(f"Chapter {i}{Marker}: {_Synopses[i - 1]}")
+    return "\n".join(Lines)
+
+
+def GenerateIndependentChapterOutline(Interface, _Logger, _Chapter: int, _Outline: str, _Synopses: list):
+    """
+    Like GeneratePerChapterOutline, but in a conversation of its own: instead of the outlines of every
+    chapter before it, the prompt carries a synopsis of the chapters within CHAPTER_OUTLINE_SYNOPSIS_WINDOW
+    of this one, so each chapter's prompt stays the same size and they can all be generated at once.
+    """
+
+    Prompt: str = Writer.Prompts.CHAPTER_OUTLINE_PROMPT.format(
+        _Chapter=_Chapter,
+        _Outline=_Outline
+    )
+    Synopsis: str = GetNeighbouringSynopsis(_Synopses, _Chapter, Writer.Config.CHAPTER_OUTLINE_SYNOPSIS_WINDOW)
+    if Synopsis != "":
+        Prompt += Writer.Prompts.CHAPTER_OUTLINE_NEIGHBOURS_PROMPT.format(
+            _Chapter=_Chapter, _Synopsis=Synopsis
+        )
+
+    _Logger.Log("Generating Outline For Chapter " + str(_Chapter), 5)
+    Messages = [Interface.BuildUserQuery(Prompt)]
+    Messages = Interface.SafeGenerateText(
+        _Logger, Messages, Writer.Config.CHAPTER_OUTLINE_WRITER_MODEL, _MinWordCount=50, _MaxChars=Writer.Config.STREAM_MAX_CHARS_OUTLINE
+    )
+    SummaryText: str = Interface.GetLastMessageText(Messages)
+    _Logger.Log("Done Generating Outline For Chapter " + str(_Chapter), 5)
+
+    return SummaryText
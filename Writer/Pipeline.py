@@ -0,0 +1,187 @@
+import concurrent.futures
+import json
+import threading
+import time
+
+
+class TaskFailedError(Exception):
+    """
+    Raised for tasks that never ran because one of their inputs failed.
+    """
+
+    pass
+
+
+class Task:
+    def __init__(self, _Name: str, _Function, _Inputs: list):
+        self.Name = _Name
+        self.Function = _Function
+        self.Inputs = _Inputs
+        self.Dependents: list = []
+        self.Done = threading.Event()
+        self.Result = None
+        self.Error: Exception = None
+
+        self.AddTime: float = time.time()
+        self.ReadyTime: float = None  # When the last input finished, so it could have started
+        self.StartTime: float = None
+        self.EndTime: float = None
+
+    def GetDuration(self):
+        if self.StartTime is None or self.EndTime is None:
+            return 0.0
+        return self.EndTime - self.StartTime
+
+
+class Pipeline:
+    """
+    Runs the stages of a story as a graph of named tasks, each starting as soon as the tasks it takes as
+    inputs have finished, with at most `_MaxConcurrency` running at once.
+
+    Tasks can be added while the pipeline runs (e.g. one per chapter once the chapters are counted), as
+    long as their inputs were added before them. A task's function is called with its inputs' results,
+    in the order the inputs are listed. If a task fails, nothing new is started and `Join` raises its
+    error once the tasks already running have finished.
+    """
+
+    def __init__(self, _Logger, _MaxConcurrency: int = 4):
+        self.Logger = _Logger
+        self.Executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(_MaxConcurrency, 1), thread_name_prefix="Pipeline")
+        self.Lock = threading.Lock()
+        self.Tasks: dict = {}
+        self.Error: Exception = None
+        self.StartTime: float = time.time()
+
+    def Add(self, _Name: str, _Function, _Inputs: list = []):
+        with self.Lock:
+            if _Name in self.Tasks:
+                raise ValueError(f"Pipeline task '{_Name}' was added twice")
+            for Input in _Inputs:
+                if Input not in self.Tasks:
+                    raise KeyError(f"Pipeline task '{_Name}' needs '{Input}', which hasn't been added")
+
+            NewTask = Task(_Name, _Function, list(_Inputs))
+            self.Tasks[_Name] = NewTask
+            for Input in _Inputs:
+                self.Tasks[Input].Dependents.append(NewTask)
+            self.ScheduleIfReady(NewTask)
+        return NewTask
+
+    def ScheduleIfReady(self, _Task: Task):
+        # Called with the lock held
+        Inputs = [self.Tasks[Input] for Input in _Task.Inputs]
+        if not all(Input.Done.is_set() for Input in Inputs):
+            return
+        _Task.ReadyTime = max([Input.EndTime for Input in Inputs], default=_Task.AddTime)
+
+        Failed = [Input for Input in Inputs if Input.Error is not None]
+        if len(Failed) > 0:
+            self.Finish(_Task, None, TaskFailedError(f"'{_Task.Name}' skipped, its input '{Failed[0].Name}' failed"))
+        elif self.Error is not None:
+            self.Finish(_Task, None, TaskFailedError(f"'{_Task.Name}' skipped after an earlier task failed"))
+        else:
+            self.Executor.submit(self.RunTask, _Task, [Input.Result for Input in Inputs])
+
+    def RunTask(self, _Task: Task, _InputResults: list):
+        _Task.StartTime = time.time()
+        try:
+            Result = _Task.Function(*_InputResults)
+        except Exception as e:
+            self.Logger.Log(f"Pipeline Task '{_Task.Name}' Failed: {e}", 7)
+            with self.Lock:
+                if self.Error is None:
+                    self.Error = e
+                self.Finish(_Task, None, e)
+            return
+        with self.Lock:
+            self.Finish(_Task, Result, None)
+
+    def Finish(self, _Task: Task, _Result, _Error: Exception):
+        # Called with the lock held
+        _Task.Result = _Result
+        _Task.Error = _Error
+        _Task.EndTime = time.time()
+        _Task.Done.set()
+        for Dependent in _Task.Dependents:
+            self.ScheduleIfReady(Dependent)
+
+    def Wait(self, _Name: str):
+        """
+        Blocks until task `_Name` has finished and returns its result. If it failed (or was skipped
+        because something before it failed), raises the first error the pipeline hit.
+        """
+        Waited = self.Tasks[_Name]
+        Waited.Done.wait()
+        if Waited.Error is not None:
+            raise self.Error if self.Error is not None else Waited.Error
+        return Waited.Result
+
+    def Join(self):
+        """
+        Waits for every task added so far, then raises the first failure, if any.
+        """
+        while True:
+            with self.Lock:
+                Pending = [Item for Item in self.Tasks.values() if not Item.Done.is_set()]
+            if len(Pending) == 0:
+                break
+            Pending[0].Done.wait()
+        self.Executor.shutdown(wait=True)
+        if self.Error is not None:
+            raise self.Error
+
+    def GetResults(self):
+        return {Name: Item.Result for Name, Item in self.Tasks.items()}
+
+    def GetCriticalPath(self):
+        """
+        The chain of tasks that set the run's length: starting from the task that finished last, step
+        back to whichever of its inputs finished last (the one it was actually waiting for).
+        """
+        Finished = [Item for Item in self.Tasks.values() if Item.EndTime is not None]
+        if len(Finished) == 0:
+            return []
+        Path = [max(Finished, key=lambda Candidate: Candidate.EndTime)]
+        while len(Path[-1].Inputs) > 0:
+            Path.append(max((self.Tasks[Input] for Input in Path[-1].Inputs), key=lambda Candidate: Candidate.EndTime))
+        return list(reversed(Path))
+
+    def LogSummary(self):
+        Ran = [Item for Item in self.Tasks.values() if Item.StartTime is not None]
+        if len(Ran) == 0:
+            return
+        WallTime = max(Item.EndTime for Item in Ran) - self.StartTime
+        BusyTime = sum(Item.GetDuration() for Item in Ran)
+        self.Logger.Log(
+            f"Pipeline: {len(Ran)} Task(s), {round(BusyTime, 1)}s Of Work In {round(WallTime, 1)}s ({round(BusyTime / WallTime, 2) if WallTime > 0 else 0}x Parallelism)",
+            4,
+        )
+
+        Path = self.GetCriticalPath()
+        PathTime = sum(Step.GetDuration() for Step in Path)
+        self.Logger.Log(f"Critical Path: {len(Path)} Task(s), {round(PathTime, 1)}s Running Of {round(WallTime, 1)}s", 4)
+        for Step in Path:
+            Line = f" - {Step.Name}: {round(Step.GetDuration(), 2)}s"
+            # Time between the inputs being ready and the task starting was spent waiting for a free worker
+            if Step.StartTime is not None and Step.ReadyTime is not None and Step.StartTime - Step.ReadyTime > 0.1:
+                Line += f" (Waited {round(Step.StartTime - Step.ReadyTime, 2)}s For A Worker)"
+            self.Logger.Log(Line, 4)
+
+    def Save(self, _Path: str):
+        Path = [Step.Name for Step in self.GetCriticalPath()]
+        Data = {
+            "CriticalPath": Path,
+            "Tasks": {
+                Name: {
+                    "Inputs": Item.Inputs,
+                    "Ready": Item.ReadyTime - self.StartTime if Item.ReadyTime is not None else None,
+                    "Start": Item.StartTime - self.StartTime if Item.StartTime is not None else None,
+                    "End": Item.EndTime - self.StartTime if Item.EndTime is not None else None,
+                    "Duration": Item.GetDuration(),
+                    "Error": str(Item.Error) if Item.Error is not None else None,
+                }
+                for Name, Item in self.Tasks.items()
+            },
+        }
+        with open(_Path, "w") as f:
+            json.dump(Data, f, indent=4)
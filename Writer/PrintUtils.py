@@ -1,7 +1,15 @@
 import termcolor
 import datetime
 import os
-import json
+import atexit
+import collections
+import queue
+import sys
+import threading
+import time
+
+import Writer.Config
+import Writer.LangchainStore
 
 
 def PrintMessageHistory(_Messages):
@@ -13,7 +21,7 @@ def PrintMessageHistory(_Messages):
 
 class Logger:
 
-    def __init__(self, _LogfilePrefix="Logs"):
+    def __init__(self, _LogfilePrefix="Logs", _ConsoleLevel:int=None):
 
         # Make Paths For Log
         LogDirPath = _LogfilePrefix + "/Generation_" + datetime.datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
@@ -23,33 +31,27 @@ class Logger:
         self.LogDirPrefix = LogDirPath
         self.LogPath = LogDirPath + "/Main.log"
         self.File = open(self.LogPath, "a")
-        self.LangchainID = 0
+        self.LangchainStore = Writer.LangchainStore.LangchainStore(LogDirPath + "/LangchainDebug")
+
+        # Only the most recent entries are kept in memory, the full log is in the file
+        self.LogItems = collections.deque(maxlen=Writer.Config.LOG_ITEMS_LIMIT)
+        self.ConsoleLevel = _ConsoleLevel if _ConsoleLevel is not None else Writer.Config.CONSOLE_LOG_LEVEL
 
-        self.LogItems = []
+        # Entries are formatted and written by a background thread, so callers (from any thread) only pay for a queue put
+        self.Queue = queue.Queue()
+        self.Closed = False
+        self.WriterThread = threading.Thread(target=self.WriterLoop, name="LogWriter", daemon=True)
+        self.WriterThread.start()
+        atexit.register(self.Close)
 
 
-    # Helper function that saves the entire language chain object as both json and markdown for debugging later
+    # Helper function that records the language chain in the deduplicated debug store (see Tools/LangchainViewer.py to read it back)
     def SaveLangchain(self, _LangChainID:str, _LangChain:list):
 
-        # Calculate Filepath For This Langchain
-        ThisLogPathJSON:str = self.LogDirPrefix + f"/LangchainDebug/{self.LangchainID}_{_LangChainID}.json"
-        ThisLogPathMD:str = self.LogDirPrefix + f"/LangchainDebug/{self.LangchainID}_{_LangChainID}.md"
-        LangChainDebugTitle:str = f"{self.LangchainID}_{_LangChainID}"
-        self.LangchainID += 1
-
-        # Generate and Save JSON Version
-        with open(ThisLogPathJSON, "w") as f:
-            f.write(json.dumps(_LangChain, indent=4, sort_keys=True))
-        
-        # Now, Save Markdown Version
-        with open(ThisLogPathMD, "w") as f:
-            MarkdownVersion:str = f"# Debug LangChain {LangChainDebugTitle}\n**Note: '```' tags have been removed in this version.**\n"
-            for Message in _LangChain:
-                MarkdownVersion += f"\n\n\n# Role: {Message['role']}\n"
-                MarkdownVersion += f"```{Message['content'].replace('```', '')}```"
-            f.write(MarkdownVersion)
-        
-        self.Log(f"Wrote This Language Chain ({LangChainDebugTitle}) To Debug File {ThisLogPathMD}", 5)
+        ID:int = self.LangchainStore.Save(_LangChainID, _LangChain)
+        LangChainDebugTitle:str = f"{ID}_{_LangChainID}"
+
+        self.Log(f"Wrote This Language Chain ({LangChainDebugTitle}) To Debug Store {self.LangchainStore.Directory}", 5)
 
 
     # Saves the given story to disk
@@ -62,36 +64,100 @@ class Logger:
 
 
     # Logs an item
-    def Log(self, _Item, _Level:int):
+    # _Item may be a string, a format string filled in with _Args, or a function returning the string, and is only formatted by the writer thread
+    def Log(self, _Item, _Level:int, *_Args):
+        self.Queue.put((time.time(), _Level, _Item, _Args))
+
+
+    # Blocks until everything logged so far has been written
+    def Flush(self):
+        if not self.Closed:
+            self.Queue.join()
+
 
-        # Create Log Entry
-        LogEntry = f"[{str(_Level).ljust(2)}] [{datetime.datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}] {_Item}"
+    # Writes out anything still queued and stops the writer thread
+    def Close(self):
+        if self.Closed:
+            return
+        self.Queue.put(None)
+        self.WriterThread.join()
+        self.Closed = True
+        self.File.close()
 
-        # Write it to file
-        self.File.write(LogEntry + "\n")
-        self.LogItems.append(LogEntry)
 
-        # Now color and print it
+    def FormatEntry(self, _Time:float, _Level:int, _Item, _Args:tuple):
+
+        if callable(_Item):
+            Text = str(_Item())
+        elif len(_Args) > 0:
+            Text = str(_Item).format(*_Args)
+        else:
+            Text = str(_Item)
+
+        return f"[{str(_Level).ljust(2)}] [{datetime.datetime.fromtimestamp(_Time).strftime('%Y-%m-%d_%H-%M-%S')}] {Text}"
+
+
+    def ColorEntry(self, _LogEntry:str, _Level:int):
+
         if (_Level == 0):
-            LogEntry = termcolor.colored(LogEntry, "white")
+            return termcolor.colored(_LogEntry, "white")
         elif (_Level == 1):
-            LogEntry = termcolor.colored(LogEntry, "grey")
+            return termcolor.colored(_LogEntry, "grey")
         elif (_Level == 2):
-            LogEntry = termcolor.colored(LogEntry, "blue")
+            return termcolor.colored(_LogEntry, "blue")
         elif (_Level == 3):
-            LogEntry = termcolor.colored(LogEntry, "cyan")
+            return termcolor.colored(_LogEntry, "cyan")
         elif (_Level == 4):
-            LogEntry = termcolor.colored(LogEntry, "magenta")
+            return termcolor.colored(_LogEntry, "magenta")
         elif (_Level == 5):
-            LogEntry = termcolor.colored(LogEntry, "green")
+            return termcolor.colored(_LogEntry, "green")
         elif (_Level == 6):
-            LogEntry = termcolor.colored(LogEntry, "yellow")
+            return termcolor.colored(_LogEntry, "yellow")
         elif (_Level == 7):
-            LogEntry = termcolor.colored(LogEntry, "red")
-
-        print(LogEntry)
+            return termcolor.colored(_LogEntry, "red")
+        return _LogEntry
+
+
+    def WriterLoop(self):
+
+        Running:bool = True
+        while Running:
+
+            # Wait for one entry, then take whatever else has queued up so it all goes out in one write
+            Batch:list = [self.Queue.get()]
+            while len(Batch) < Writer.Config.LOG_BATCH_SIZE:
+                try:
+                    Batch.append(self.Queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            FileLines:list = []
+            ConsoleLines:list = []
+            for Entry in Batch:
+                if Entry is None:
+                    Running = False
+                    continue
+                try:
+                    LogEntry = self.FormatEntry(*Entry)
+                except Exception as e:
+                    LogEntry = f"[{str(Entry[1]).ljust(2)}] Could not format log entry {Entry[2]!r} ({e})"
+                FileLines.append(LogEntry + "\n")
+                self.LogItems.append(LogEntry)
+                if Entry[1] >= self.ConsoleLevel:
+                    ConsoleLines.append(self.ColorEntry(LogEntry, Entry[1]) + "\n")
+
+            try:
+                if len(FileLines) > 0:
+                    self.File.writelines(FileLines)
+                    self.File.flush()
+                if len(ConsoleLines) > 0:
+                    sys.stdout.write("".join(ConsoleLines))
+                    sys.stdout.flush()
+            finally:
+                for _ in Batch:
+                    self.Queue.task_done()
 
 
 
     def __del__(self):
-        self.File.close()
\ No newline at end of file
+        self.Close()
@@ -490,6 +490,33 @@ Again, don't write the chapter itself, just create a detailed outline of the cha
 Make sure your chapter has a markdown-formatted name!
 """
 
+CHAPTER_SYNOPSES_PROMPT = """
+<OUTLINE>
+{_Outline}
+</OUTLINE>
+
+The above outline describes a story of {_TotalChapters} chapters.
+Please summarize what happens in each chapter in one or two sentences, in order, so that there is exactly one summary per chapter.
+
+Respond in JSON, with a list of {_TotalChapters} strings like so:
+
+{{
+    "Synopses": ["Chapter 1 summary", "Chapter 2 summary", ...]
+}}
+
+Don't include any other text, just the JSON.
+"""
+
+CHAPTER_OUTLINE_NEIGHBOURS_PROMPT = """
+For context, here is a short synopsis of chapter {_Chapter} and the chapters around it:
+
+<SYNOPSIS>
+{_Synopsis}
+</SYNOPSIS>
+
+Only outline chapter {_Chapter}, but use the synopsis so that it picks up where the chapter before it ends and leads into the chapter after it.
+"""
+
 CHAPTER_SCRUB_PROMPT = """
 <CHAPTER>
 {_Chapter}
@@ -582,13 +609,15 @@ I need to convert the following scene-by-scene outline into a JSON formatted lis
 # OBJECTIVE #
 Create a JSON list of each of scene from the provided outline where each element in the list contains the content for that scene.
 Ex:
-[
-    "scene 1 content...",
-    "scene 2 content...",
-    "etc."
-]
+{{
+    "Scenes": [
+        "scene 1 content...",
+        "scene 2 content...",
+        "etc."
+    ]
+}}
 
-Don't include any other json fields, just make it a simple list of strings.
+Don't include any other json fields, just put a simple list of strings under "Scenes".
 ###############
 
 # STYLE #
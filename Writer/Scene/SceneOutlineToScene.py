@@ -15,7 +15,7 @@ def SceneOutlineToScene(Interface, _Logger, _ThisSceneOutline:str, _Outline:str,
     MesssageHistory.append(Interface.BuildSystemQuery(Writer.Prompts.DEFAULT_SYSTEM_PROMPT))
     MesssageHistory.append(Interface.BuildUserQuery(Writer.Prompts.SCENE_OUTLINE_TO_SCENE.format(_SceneOutline=_ThisSceneOutline, _Outline=_Outline)))
 
-    Response = Interface.SafeGenerateText(_Logger, MesssageHistory, Writer.Config.CHAPTER_STAGE1_WRITER_MODEL, _MinWordCount=100)
+    Response = Interface.SafeGenerateText(_Logger, MesssageHistory, Writer.Config.CHAPTER_STAGE1_WRITER_MODEL, _MinWordCount=100, _MaxChars=Writer.Config.STREAM_MAX_CHARS_CHAPTER)
     _Logger.Log(f"Finished SceneOutline->Scene", 5)
 
     return Interface.GetLastMessageText(Response)
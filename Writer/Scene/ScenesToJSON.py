@@ -3,6 +3,7 @@ import Writer.PrintUtils
 import Writer.Config
 import Writer.Chapter.ChapterGenSummaryCheck
 import Writer.Prompts
+import Writer.Schemas
 
 
 def ScenesToJSON(Interface, _Logger, _Scenes:str):
@@ -14,7 +15,8 @@ def ScenesToJSON(Interface, _Logger, _Scenes:str):
     MesssageHistory.append(Interface.BuildSystemQuery(Writer.Prompts.DEFAULT_SYSTEM_PROMPT))
     MesssageHistory.append(Interface.BuildUserQuery(Writer.Prompts.SCENES_TO_JSON.format(_Scenes=_Scenes)))
 
-    _, SceneList = Interface.SafeGenerateJSON(_Logger, MesssageHistory, Writer.Config.CHECKER_MODEL)
+    _, Response = Interface.SafeGenerateJSON(_Logger, MesssageHistory, Writer.Config.CHECKER_MODEL, _Schema=Writer.Schemas.SCENE_LIST, _MaxChars=Writer.Config.STREAM_MAX_CHARS_OUTLINE)
+    SceneList: list = Response["Scenes"]
     _Logger.Log(f"Finished ChapterScenes->JSON ({len(SceneList)} Scenes Found)", 5)
 
     return SceneList
@@ -0,0 +1,178 @@
+# JSON schemas for every structured LLM call.
+# Pass one as `_Format` to SafeGenerateText/SafeGenerateJSON: Ollama gets it as its structured `format`, OpenRouter as a
+# `json_schema` response_format, and the response is validated against it locally either way (for providers and
+# servers that don't enforce it).
+
+
+def Object(_Title: str, _Properties: dict, _Required: list = None):
+    return {
+        "title": _Title,
+        "type": "object",
+        "properties": _Properties,
+        "required": list(_Properties) if _Required is None else _Required,
+    }
+
+
+VERDICT = {"type": "string", "enum": ["A", "B", "Tie"]}
+
+
+IS_COMPLETE = Object("IsComplete", {"IsComplete": {"type": "boolean"}})
+
+CHAPTER_COUNT = Object("ChapterCount", {"TotalChapters": {"type": "integer", "minimum": 1}})
+
+SUMMARY_CHECK = Object(
+    "SummaryCheck",
+    {
+        "Suggestions": {"type": "string"},
+        "DidFollowOutline": {"type": "boolean"},
+    },
+)
+
+SCENE_LIST = Object(
+    "SceneList",
+    {"Scenes": {"type": "array", "items": {"type": "string"}, "minItems": 1}},
+)
+
+CHAPTER_SYNOPSES = Object(
+    "ChapterSynopses",
+    {"Synopses": {"type": "array", "items": {"type": "string"}, "minItems": 1}},
+)
+
+STORY_INFO = Object(
+    "StoryInfo",
+    {
+        "Title": {"type": "string"},
+        "Summary": {"type": "string"},
+        "Tags": {"type": "string"},
+        "OverallRating": {"type": "number"},
+    },
+)
+
+OUTLINE_EVALUATION = Object(
+    "OutlineEvaluation",
+    {
+        "Thoughts": {"type": "string"},
+        "Reasoning": {"type": "string"},
+        "Plot": VERDICT,
+        "PlotExplanation": {"type": "string"},
+        "Style": VERDICT,
+        "StyleExplanation": {"type": "string"},
+        "Chapters": VERDICT,
+        "ChaptersExplanation": {"type": "string"},
+        "Tropes": VERDICT,
+        "TropesExplanation": {"type": "string"},
+        "Genre": VERDICT,
+        "GenreExplanation": {"type": "string"},
+        "Narrative": VERDICT,
+        "NarrativeExplanation": {"type": "string"},
+        "OverallWinner": VERDICT,
+    },
+)
+
+CHAPTER_EVALUATION = Object(
+    "ChapterEvaluation",
+    {
+        "Plot": VERDICT,
+        "PlotExplanation": {"type": "string"},
+        "Style": VERDICT,
+        "StyleExplanation": {"type": "string"},
+        "Dialogue": VERDICT,
+        "DialogueExplanation": {"type": "string"},
+        "Tropes": VERDICT,
+        "TropesExplanation": {"type": "string"},
+        "Genre": VERDICT,
+        "GenreExplanation": {"type": "string"},
+        "Narrative": VERDICT,
+        "NarrativeExplanation": {"type": "string"},
+        "OverallWinner": VERDICT,
+    },
+)
+
+
+SCHEMAS = {
+    Schema["title"]: Schema
+    for Schema in (
+        IS_COMPLETE,
+        CHAPTER_COUNT,
+        SUMMARY_CHECK,
+        SCENE_LIST,
+        CHAPTER_SYNOPSES,
+        STORY_INFO,
+        OUTLINE_EVALUATION,
+        CHAPTER_EVALUATION,
+    )
+}
+
+
+class SchemaError(ValueError):
+    pass
+
+
+def IsJSONFormat(_Format):
+    """
+    True for any JSON `_Format`: "json" in any case, or a schema.
+    """
+    return isinstance(_Format, dict) or (isinstance(_Format, str) and _Format.lower() == "json")
+
+
+def GetSchema(_Format):
+    """
+    Returns the schema for a `_Format` (a schema dict, or the title of a registered one), or None for plain JSON/text.
+    """
+    if isinstance(_Format, dict):
+        return _Format
+    if isinstance(_Format, str):
+        return SCHEMAS.get(_Format)
+    return None
+
+
+def GetRequiredAttribs(_Schema: dict):
+    if _Schema is None or _Schema.get("type") != "object":
+        return []
+    return list(_Schema.get("required", []))
+
+
+TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "boolean": bool,
+    "number": (int, float),
+    "integer": int,
+    "null": type(None),
+}
+
+
+def Validate(_Value, _Schema: dict, _Path: str = "$"):
+    """
+    Checks a parsed value against the subset of JSON Schema used above (type, properties, required, items,
+    enum, minimum, minItems), raising SchemaError at the first mismatch.
+    """
+    Type = _Schema.get("type")
+    if Type is not None:
+        # bool is a subclass of int in Python, but not a number in JSON
+        IsBool = isinstance(_Value, bool)
+        if not isinstance(_Value, TYPES[Type]) or (IsBool and Type in ("number", "integer")):
+            raise SchemaError(f"{_Path} should be of type {Type}, got {type(_Value).__name__}")
+
+    if "enum" in _Schema and _Value not in _Schema["enum"]:
+        raise SchemaError(f"{_Path} should be one of {_Schema['enum']}, got {_Value!r}")
+    if "minimum" in _Schema and _Value < _Schema["minimum"]:
+        raise SchemaError(f"{_Path} should be at least {_Schema['minimum']}, got {_Value}")
+
+    if isinstance(_Value, dict):
+        for Key in _Schema.get("required", []):
+            if Key not in _Value:
+                raise SchemaError(f"{_Path} is missing required attribute '{Key}'")
+        for Key, PropertySchema in _Schema.get("properties", {}).items():
+            if Key in _Value:
+                Validate(_Value[Key], PropertySchema, f"{_Path}.{Key}")
+
+    if isinstance(_Value, list):
+        if len(_Value) < _Schema.get("minItems", 0):
+            raise SchemaError(f"{_Path} should have at least {_Schema['minItems']} item(s), got {len(_Value)}")
+        if "items" in _Schema:
+            for i, Item in enumerate(_Value):
+                Validate(Item, _Schema["items"], f"{_Path}[{i}]")
+
+    return _Value
@@ -1,27 +1,40 @@
+import Writer.Checkpoint
 import Writer.PrintUtils
 import Writer.Prompts
+import Writer.Statistics
 
 
-def ScrubNovel(Interface, _Logger, _Chapters: list, _TotalChapters: int):
+def ScrubChapter(Interface, _Logger, _Chapter: str, _ChapterNum: int, _Checkpoint=Writer.Checkpoint.DISABLED):
+
+    Name: str = f"Scrubbed/Chapter_{_ChapterNum:03}"
+    SavedChapter: str = _Checkpoint.Load(Name)
+    if SavedChapter is not None:
+        return SavedChapter
+
+    Prompt: str = Writer.Prompts.CHAPTER_SCRUB_PROMPT.format(
+        _Chapter=_Chapter
+    )
+    _Logger.Log(f"Prompting LLM To Perform Chapter {_ChapterNum} Scrubbing Edit", 5)
+    Messages = []
+    Messages.append(Interface.BuildUserQuery(Prompt))
+    Messages = Interface.SafeGenerateText(
+        _Logger, Messages, Writer.Config.SCRUB_MODEL, _MaxChars=Interface.GetRewriteMaxChars(_Chapter)
+    )
+    _Logger.Log(f"Finished Chapter {_ChapterNum} Scrubbing Edit", 5)
+
+    NewChapter = Interface.GetLastMessageText(Messages)
+    _Checkpoint.Save(Name, NewChapter)
+    ChapterWordCount = Writer.Statistics.GetWordCount(NewChapter)
+    _Logger.Log(f"Scrubbed Chapter Word Count: {ChapterWordCount}", 3)
+
+    return NewChapter
+
+
+def ScrubNovel(Interface, _Logger, _Chapters: list, _TotalChapters: int, _Checkpoint=Writer.Checkpoint.DISABLED):
 
     EditedChapters = _Chapters
 
     for i in range(_TotalChapters):
-
-        Prompt: str = Writer.Prompts.CHAPTER_SCRUB_PROMPT.format(
-            _Chapter=EditedChapters[i]
-        )
-        _Logger.Log(f"Prompting LLM To Perform Chapter {i+1} Scrubbing Edit", 5)
-        Messages = []
-        Messages.append(Interface.BuildUserQuery(Prompt))
-        Messages = Interface.SafeGenerateText(
-            _Logger, Messages, Writer.Config.SCRUB_MODEL
-        )
-        _Logger.Log(f"Finished Chapter {i+1} Scrubbing Edit", 5)
-
-        NewChapter = Interface.GetLastMessageText(Messages)
-        EditedChapters[i] = NewChapter
-        ChapterWordCount = Writer.Statistics.GetWordCount(NewChapter)
-        _Logger.Log(f"Scrubbed Chapter Word Count: {ChapterWordCount}", 3)
+        EditedChapters[i] = ScrubChapter(Interface, _Logger, EditedChapters[i], i + 1, _Checkpoint)
 
     return EditedChapters
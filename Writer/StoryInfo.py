@@ -1,5 +1,6 @@
 import Writer.Config
-import json
+import Writer.JSONRepair
+import Writer.Schemas
 
 
 def GetStoryInfo(Interface, _Logger, _Messages: list):
@@ -10,32 +11,16 @@ def GetStoryInfo(Interface, _Logger, _Messages: list):
     Messages = _Messages
     Messages.append(Interface.BuildUserQuery(Prompt))
     Messages = Interface.SafeGenerateText(
-        _Logger, Messages, Writer.Config.INFO_MODEL, _Format="json"
+        _Logger, Messages, Writer.Config.INFO_MODEL, _Format=Writer.Schemas.STORY_INFO, _MaxChars=Writer.Config.STREAM_MAX_CHARS_CHECK
     )
     _Logger.Log("Finished Getting Stats Feedback", 5)
 
-    Iters: int = 0
-    while True:
-
-        RawResponse = Interface.GetLastMessageText(Messages)
-        RawResponse = RawResponse.replace("`", "")
-        RawResponse = RawResponse.replace("json", "")
-
-        try:
-            Iters += 1
-            Dict = json.loads(RawResponse)
-            return Dict
-        except Exception as E:
-            if Iters > 4:
-                _Logger.Log("Critical Error Parsing JSON", 7)
-                return {}
-            _Logger.Log("Error Parsing JSON Written By LLM, Asking For Edits", 7)
-            EditPrompt: str = (
-                f"Please revise your JSON. It encountered the following error during parsing: {E}. Remember that your entire response is plugged directly into a JSON parser, so don't write **anything** except pure json."
-            )
-            Messages.append(Interface.BuildUserQuery(EditPrompt))
-            _Logger.Log("Asking LLM TO Revise", 7)
-            Messages = Interface.SafeGenerateText(
-                _Logger, Messages, Writer.Config.INFO_MODEL, _Format="json"
-            )
-            _Logger.Log("Done Asking LLM TO Revise JSON", 6)
+    return Writer.JSONRepair.ParseResponseJSON(
+        Interface,
+        _Logger,
+        Messages,
+        Writer.Config.INFO_MODEL,
+        "GetStoryInfo",
+        {},
+        _Format=Writer.Schemas.STORY_INFO,
+    )
@@ -1,6 +1,8 @@
+import Writer.Checkpoint
 import Writer.PrintUtils
 import Writer.Config
 import Writer.Prompts
+import Writer.Statistics
 
 
 def TranslatePrompt(Interface, _Logger, _Prompt: str, _Language: str = "French"):
@@ -12,35 +14,48 @@ def TranslatePrompt(Interface, _Logger, _Prompt: str, _Language: str = "French")
     Messages = []
     Messages.append(Interface.BuildUserQuery(Prompt))
     Messages = Interface.SafeGenerateText(
-        _Logger, Messages, Writer.Config.TRANSLATOR_MODEL, _MinWordCount=50
+        _Logger, Messages, Writer.Config.TRANSLATOR_MODEL, _MinWordCount=50, _MaxChars=Interface.GetRewriteMaxChars(_Prompt)
     )
     _Logger.Log(f"Finished Prompt Translation", 5)
 
     return Interface.GetLastMessageText(Messages)
 
 
+def TranslateChapter(
+    Interface, _Logger, _Chapter: str, _ChapterNum: int, _Language: str = "French", _Checkpoint=Writer.Checkpoint.DISABLED
+):
+
+    Name: str = f"Translated/Chapter_{_ChapterNum:03}"
+    SavedChapter: str = _Checkpoint.Load(Name)
+    if SavedChapter is not None:
+        return SavedChapter
+
+    Prompt: str = Writer.Prompts.CHAPTER_TRANSLATE_PROMPT.format(
+        _Chapter=_Chapter, _Language=_Language
+    )
+    _Logger.Log(f"Prompting LLM To Perform Chapter {_ChapterNum} Translation", 5)
+    Messages = []
+    Messages.append(Interface.BuildUserQuery(Prompt))
+    Messages = Interface.SafeGenerateText(
+        _Logger, Messages, Writer.Config.TRANSLATOR_MODEL, _MaxChars=Interface.GetRewriteMaxChars(_Chapter)
+    )
+    _Logger.Log(f"Finished Chapter {_ChapterNum} Translation", 5)
+
+    NewChapter = Interface.GetLastMessageText(Messages)
+    _Checkpoint.Save(Name, NewChapter)
+    ChapterWordCount = Writer.Statistics.GetWordCount(NewChapter)
+    _Logger.Log(f"Translation Chapter Word Count: {ChapterWordCount}", 3)
+
+    return NewChapter
+
+
 def TranslateNovel(
-    Interface, _Logger, _Chapters: list, _TotalChapters: int, _Language: str = "French"
+    Interface, _Logger, _Chapters: list, _TotalChapters: int, _Language: str = "French", _Checkpoint=Writer.Checkpoint.DISABLED
 ):
 
     EditedChapters = _Chapters
 
     for i in range(_TotalChapters):
-
-        Prompt: str = Writer.Prompts.CHAPTER_TRANSLATE_PROMPT.format(
-            _Chapter=EditedChapters[i], _Language=_Language
-        )
-        _Logger.Log(f"Prompting LLM To Perform Chapter {i+1} Translation", 5)
-        Messages = []
-        Messages.append(Interface.BuildUserQuery(Prompt))
-        Messages = Interface.SafeGenerateText(
-            _Logger, Messages, Writer.Config.TRANSLATOR_MODEL
-        )
-        _Logger.Log(f"Finished Chapter {i+1} Translation", 5)
-
-        NewChapter = Interface.GetLastMessageText(Messages)
-        EditedChapters[i] = NewChapter
-        ChapterWordCount = Writer.Statistics.GetWordCount(NewChapter)
-        _Logger.Log(f"Translation Chapter Word Count: {ChapterWordCount}", 3)
+        EditedChapters[i] = TranslateChapter(Interface, _Logger, EditedChapters[i], i + 1, _Language, _Checkpoint)
 
     return EditedChapters